@@ -54,6 +54,65 @@ class Config:
     
     # Zona horaria
     TIMEZONE = 'America/Bogota'
+    
+    # Segundos entre resincronizaciones del índice de ocupación de mesas
+    MESAS_OCUPACION_TTL = 30
+    
+    # Reservas: horas que ocupa una mesa si la reserva no indica duración,
+    # minutos de cada franja bloqueada (`reserva_franjas`) y segundos que se
+    # reutiliza el índice de disponibilidad de una fecha
+    RESERVA_DURACION_HORAS = 2
+    RESERVA_FRANJA_MINUTOS = 30
+    RESERVAS_DISPONIBILIDAD_TTL = 30
+    
+    # Listados paginados (utils/paginacion.py): filas por página si no se
+    # indica `limit` y máximo permitido
+    PAGINACION_LIMITE = 300
+    PAGINACION_LIMITE_MAX = 1000
+    
+    # Segundos que se reutiliza el menú público antes de volver a consultarlo
+    MENU_CACHE_TTL = 300
+    
+    # Estadísticas del dashboard: segundos máximos que se reutilizan y
+    # segundos mínimos entre recálculos cuando hay cambios
+    DASHBOARD_STATS_TTL = 60
+    DASHBOARD_STATS_MIN = 2
+    
+    # Segundos entre comparaciones completas de la cola de cocina con la BD
+    COCINA_COLA_TTL = 15
+    
+    # Caché de usuarios autenticados de la API: segundos de vida y tamaño máximo
+    PRINCIPAL_CACHE_TTL = 60
+    PRINCIPAL_CACHE_MAX = 1024
+    
+    # bcrypt en la API: factor de coste de los hashes nuevos, hilos del pool
+    # y operaciones en cola antes de responder 503
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', 4))
+    BCRYPT_MAX_PENDIENTES = int(os.environ.get('BCRYPT_MAX_PENDIENTES', 64))
+    
+    # Cola de mensajes de Socket.IO para repartir eventos entre procesos
+    # (varios workers de Flask y la API FastAPI). Sin definir: un solo proceso.
+    # Ej.: redis://localhost:6379/0 o local://127.0.0.1:6380 (ver utils/cola_mensajes.py)
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_CHANNEL = os.environ.get('SOCKETIO_CHANNEL', 'boodfood')
+    
+    # Stream SSE de la API (/api/v1/stream): mensajes guardados para
+    # reconexiones con Last-Event-ID, mensajes en cola por cliente antes de
+    # cortarlo por lento y segundos entre heartbeats
+    STREAM_BUFFER = 1000
+    STREAM_COLA_MAX = 100
+    STREAM_HEARTBEAT = 15
+    
+    # FastAPI: usar SQLAlchemy asyncio (aiomysql) en lugar de la sesión
+    # síncrona de Flask-SQLAlchemy, para no bloquear el event loop
+    FASTAPI_ASYNC_DB = os.environ.get('FASTAPI_ASYNC_DB', '').lower() in ('1', 'true', 'yes')
+    # URL del engine asíncrono; si no se define se deriva de SQLALCHEMY_DATABASE_URI
+    SQLALCHEMY_ASYNC_DATABASE_URI = os.environ.get('SQLALCHEMY_ASYNC_DATABASE_URI')
+    
+    # Serializadores (utils/serializacion.py): lanzar `CargaPerezosa` si
+    # un `to_dict` dispara una carga perezosa no declarada en su `Forma`
+    SERIALIZACION_ESTRICTA = os.environ.get('SERIALIZACION_ESTRICTA', '').lower() in ('1', 'true', 'yes')
 
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,140 @@
+"""
+Migraciones de esquema versionadas.
+
+`db.create_all()` crea las tablas que faltan pero nunca modifica las que
+ya existen, así que los índices y columnas nuevos de tablas en producción
+se añaden con una migración en `migrations/versions/`, al estilo Alembic:
+cada archivo define `revision`, `down_revision`, `upgrade(conexion)` y
+`downgrade(conexion)`, y se aplican en orden con `scripts/migrar.py`.
+
+Las revisiones aplicadas se registran en la tabla `schema_migraciones`;
+cada migración corre en su propia transacción y se registra en ella.
+Las operaciones comprueban antes si el índice existe, de modo que aplicar
+una migración sobre una base creada con `create_all` no falla.
+
+En MySQL (InnoDB) cada clave ajena necesita un índice que empiece por sus
+columnas; al crear uno compuesto que las cubre, InnoDB borra el que había
+creado por su cuenta, y el nuevo ya no se puede borrar (error 1553).
+`borrar_indice` crea antes un índice simple para la clave ajena.
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, MetaData, String, Table, inspect, select
+
+from . import versions
+
+# Fuera de `db.metadata`: `create_all` no la crea, la crean las migraciones
+_tabla = Table(
+    'schema_migraciones', MetaData(),
+    Column('revision', String(32), primary_key=True),
+    Column('aplicada_en', DateTime, nullable=False),
+)
+
+
+def _indice(tabla, nombre, columnas):
+    tabla = Table(tabla, MetaData(), *(Column(columna) for columna in columnas))
+    return Index(nombre, *(tabla.c[columna] for columna in columnas))
+
+
+def crear_indice(conexion, tabla, nombre, *columnas):
+    """`CREATE INDEX nombre ON tabla (columnas)` si aún no existe."""
+    _indice(tabla, nombre, columnas).create(conexion, checkfirst=True)
+
+
+def indice_clave_ajena(conexion, tabla, nombre, columnas):
+    """`(nombre, columnas)` del índice que necesitaría una clave ajena de
+    `tabla` si se borrara el índice `nombre`, o `None` si no hace falta."""
+    inspector = inspect(conexion)
+    restantes = [indice['column_names'] for indice in inspector.get_indexes(tabla) if indice['name'] != nombre]
+    restantes.append(inspector.get_pk_constraint(tabla)['constrained_columns'])
+    for clave in inspector.get_foreign_keys(tabla):
+        fk = clave['constrained_columns']
+        if list(columnas[:len(fk)]) != fk:
+            continue
+        if not any(indice[:len(fk)] == fk for indice in restantes):
+            # InnoDB nombra el índice automático como la restricción
+            return clave.get('name') or f'fk_{tabla}_{"_".join(fk)}', fk
+    return None
+
+
+def borrar_indice(conexion, tabla, nombre, *columnas):
+    """`DROP INDEX nombre` si existe, sin dejar una clave ajena sin índice en MySQL."""
+    if conexion.dialect.name in ('mysql', 'mariadb') and nombre in {
+            indice['name'] for indice in inspect(conexion).get_indexes(tabla)}:
+        necesario = indice_clave_ajena(conexion, tabla, nombre, columnas)
+        if necesario is not None:
+            crear_indice(conexion, tabla, necesario[0], *necesario[1])
+    _indice(tabla, nombre, columnas).drop(conexion, checkfirst=True)
+
+
+def versiones():
+    """Módulos de `migrations/versions` en el orden de `down_revision`."""
+    modulos = {}
+    for info in pkgutil.iter_modules(versions.__path__):
+        modulo = importlib.import_module(f'{versions.__name__}.{info.name}')
+        modulos[modulo.down_revision] = modulo
+    ordenadas, anterior = [], None
+    while anterior in modulos:
+        modulo = modulos.pop(anterior)
+        ordenadas.append(modulo)
+        anterior = modulo.revision
+    if modulos:
+        sueltas = ', '.join(sorted(m.revision for m in modulos.values()))
+        raise RuntimeError(f'Migraciones fuera de la cadena de down_revision: {sueltas}')
+    return ordenadas
+
+
+def aplicadas(conexion):
+    """Revisiones registradas en `schema_migraciones`."""
+    _tabla.create(conexion, checkfirst=True)
+    return set(conexion.scalars(select(_tabla.c.revision)))
+
+
+def _posicion(migraciones, revision):
+    revisiones = [m.revision for m in migraciones]
+    if revision not in revisiones:
+        raise ValueError(f'Revisión desconocida: {revision}')
+    return revisiones.index(revision)
+
+
+def actualizar(engine, hasta=None):
+    """Aplicar las migraciones pendientes (hasta `hasta` incluida).
+
+    Devuelve las migraciones aplicadas, en orden.
+    """
+    migraciones = versiones()
+    if hasta is not None:
+        migraciones = migraciones[:_posicion(migraciones, hasta) + 1]
+    with engine.begin() as conexion:
+        hechas = aplicadas(conexion)
+    aplicadas_ahora = []
+    for migracion in migraciones:
+        if migracion.revision in hechas:
+            continue
+        with engine.begin() as conexion:
+            migracion.upgrade(conexion)
+            conexion.execute(_tabla.insert().values(revision=migracion.revision, aplicada_en=datetime.utcnow()))
+        aplicadas_ahora.append(migracion)
+    return aplicadas_ahora
+
+
+def revertir(engine, hasta=None):
+    """Deshacer las migraciones posteriores a `hasta` (todas si es `None`).
+
+    Devuelve las migraciones revertidas, de la más nueva a la más vieja.
+    """
+    migraciones = versiones()
+    conservar = 0 if hasta is None else _posicion(migraciones, hasta) + 1
+    with engine.begin() as conexion:
+        hechas = aplicadas(conexion)
+    revertidas = []
+    for migracion in reversed(migraciones[conservar:]):
+        if migracion.revision not in hechas:
+            continue
+        with engine.begin() as conexion:
+            migracion.downgrade(conexion)
+            conexion.execute(_tabla.delete().where(_tabla.c.revision == migracion.revision))
+        revertidas.append(migracion)
+    return revertidas
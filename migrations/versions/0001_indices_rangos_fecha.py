@@ -0,0 +1,36 @@
+"""Índices para filtrar pedidos y reservas por rangos de fecha
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Los filtros por día usan rangos UTC semiabiertos sobre `fecha_pedido`
+(`utils.fechas.rango_utc`) en lugar de `DATE(fecha_pedido)`; con estos
+índices son búsquedas por rango.
+
+Tras aplicarla, reconstruir `ventas_diarias` (los días pasan a ser días
+locales de `Config.TIMEZONE`):
+
+    python scripts/reconstruir_ventas_diarias.py
+"""
+from migrations import borrar_indice, crear_indice
+
+revision = '0001'
+down_revision = None
+
+INDICES = [
+    ('pedidos', 'ix_pedidos_fecha_pedido', ('fecha_pedido',)),
+    ('pedidos', 'ix_pedidos_estado_fecha_pedido', ('estado', 'fecha_pedido')),
+    ('pedidos', 'ix_pedidos_mesa_id_estado', ('mesa_id', 'estado')),
+    ('reservas', 'ix_reservas_usuario_id_created_at', ('usuario_id', 'created_at')),
+]
+
+
+def upgrade(conexion):
+    for tabla, nombre, columnas in INDICES:
+        crear_indice(conexion, tabla, nombre, *columnas)
+
+
+def downgrade(conexion):
+    for tabla, nombre, columnas in reversed(INDICES):
+        borrar_indice(conexion, tabla, nombre, *columnas)
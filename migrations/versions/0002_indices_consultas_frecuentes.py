@@ -0,0 +1,34 @@
+"""Índices de las consultas frecuentes de repositorios y servicios
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+- `reservas.fecha`: disponibilidad y estadísticas de reservas por fecha.
+- `pedidos (usuario_id, fecha_pedido)`: "mis pedidos", ya ordenados.
+- `pedido_items.menu_item_id` y `recetas.menu_item_id`: top de productos y
+  descuento de stock (la clave de `pedido_items` empieza por `pedido_id`).
+
+`pedidos.estado` y `pedidos.mesa_id` ya encabezan los índices de 0001.
+"""
+from migrations import borrar_indice, crear_indice
+
+revision = '0002'
+down_revision = '0001'
+
+INDICES = [
+    ('reservas', 'ix_reservas_fecha', ('fecha',)),
+    ('pedidos', 'ix_pedidos_usuario_id_fecha_pedido', ('usuario_id', 'fecha_pedido')),
+    ('pedido_items', 'ix_pedido_items_menu_item_id', ('menu_item_id',)),
+    ('recetas', 'ix_recetas_menu_item_id', ('menu_item_id',)),
+]
+
+
+def upgrade(conexion):
+    for tabla, nombre, columnas in INDICES:
+        crear_indice(conexion, tabla, nombre, *columnas)
+
+
+def downgrade(conexion):
+    for tabla, nombre, columnas in reversed(INDICES):
+        borrar_indice(conexion, tabla, nombre, *columnas)
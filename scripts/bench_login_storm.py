@@ -0,0 +1,81 @@
+"""
+Benchmark de "tormenta de logins": latencia del event loop mientras se
+verifican muchas contraseñas bcrypt a la vez.
+
+Compara `bcrypt.checkpw` ejecutado dentro del loop (comportamiento previo)
+con `password_hasher` (pool de hilos acotado). No usa la base de datos.
+
+    python scripts/bench_login_storm.py
+    python scripts/bench_login_storm.py --logins 40 --rounds 12 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(root_dir, 'src'))
+sys.path.insert(0, root_dir)
+
+import bcrypt
+
+from fastapi_app.hashing import PasswordHasher
+
+INTERVALO = 0.005
+
+
+async def _medir_lag(parar, muestras):
+    """Cuánto se retrasa un `sleep(INTERVALO)` respecto a lo pedido."""
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(INTERVALO)
+        muestras.append(time.perf_counter() - inicio - INTERVALO)
+
+
+async def _tormenta(verificar, logins):
+    parar, muestras = asyncio.Event(), []
+    sonda = asyncio.create_task(_medir_lag(parar, muestras))
+    await asyncio.sleep(INTERVALO * 2)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(verificar() for _ in range(logins)))
+    total = time.perf_counter() - inicio
+    parar.set()
+    await sonda
+    return total, muestras
+
+
+def _informe(nombre, total, muestras):
+    muestras = sorted(muestras) or [0.0]
+    p99 = muestras[min(len(muestras) - 1, int(len(muestras) * 0.99))]
+    print(f'{nombre:<10} total {total * 1000:8.1f} ms | lag loop: '
+          f'mediana {statistics.median(muestras) * 1000:6.1f} ms, '
+          f'p99 {p99 * 1000:6.1f} ms, máx {muestras[-1] * 1000:6.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latencia del event loop durante logins concurrentes')
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    password = b'turno-de-la-manana'
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=args.rounds))
+    hasher = PasswordHasher(max_workers=args.workers, max_pendientes=args.logins, rounds=args.rounds)
+
+    async def en_loop():
+        return bcrypt.checkpw(password, hashed)
+
+    async def en_pool():
+        return await hasher.verificar(password.decode(), hashed)
+
+    print(f'{args.logins} logins, coste {args.rounds}, {args.workers} hilos')
+    _informe('en loop', *asyncio.run(_tormenta(en_loop, args.logins)))
+    _informe('pool', *asyncio.run(_tormenta(en_pool, args.logins)))
+    hasher.cerrar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark de serialización: qué parte del tiempo de `GET /api/v1/pedidos`
+(100 pedidos con sus items) se va en convertir la respuesta a JSON.
+
+Mide la petición completa (TestClient, SQLite en memoria) y, por separado,
+cada forma de serializar la misma página:
+
+- `response_model`: validar los dicts con `PedidoResponse` y volcarlos con
+  Pydantic (lo que hace FastAPI cuando la ruta devuelve datos).
+- `jsonable+json`: `jsonable_encoder` + `json.dumps` (`JSONResponse`).
+- `directo`: `json_rapido.dumps` sin validar (modo actual del listado).
+- Flask: `to_dict()` + `jsonify` con el proveedor por defecto y con
+  `ProveedorJSON`.
+
+    python scripts/bench_serializacion.py
+    python scripts/bench_serializacion.py --pedidos 100 --items 4 --repeticiones 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(root_dir, 'src'))
+sys.path.insert(0, root_dir)
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.pool import StaticPool
+
+from app.models import MenuItem, Pedido, PedidoItem, Usuario, db
+from app.utils import json_rapido
+from app.utils.paginacion import Parametros
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.dependencies import create_access_token, get_session
+from fastapi_app.routers import pedidos as pedidos_router
+from fastapi_app.schemas import PedidoResponse
+from fastapi_app.services.pedidos_service import obtener_pagina_pedidos
+
+
+def _poblar(session, pedidos, items):
+    usuario = Usuario(nombre='Ana', apellido='A', email='ana@example.com', password_hash='x', rol='admin')
+    platos = [MenuItem(restaurante_id=1, nombre=f'Plato {i}', precio=Decimal('8.50') + i) for i in range(items)]
+    session.add_all([usuario] + platos)
+    session.flush()
+    inicio = datetime(2026, 1, 1, 12)
+    for i in range(pedidos):
+        pedido = Pedido(usuario_id=usuario.id, restaurante_id=1, codigo_pedido=f'PED{i:06d}', subtotal=Decimal('0'),
+                        total=Decimal('0'), estado='pendiente', metodo_pago='efectivo', tipo_servicio='mesa',
+                        fecha_pedido=inicio + timedelta(minutes=i))
+        for plato in platos:
+            pedido.items.append(PedidoItem(menu_item_id=plato.id, nombre_item=plato.nombre, cantidad=2,
+                                           precio_unitario=plato.precio, subtotal=plato.precio * 2))
+        pedido.calcular_total()
+        session.add(pedido)
+    session.commit()
+    return usuario
+
+
+def _medir(funcion, repeticiones):
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peso de la serialización en el listado de pedidos')
+    parser.add_argument('--pedidos', type=int, default=100)
+    parser.add_argument('--items', type=int, default=4)
+    parser.add_argument('--repeticiones', type=int, default=200)
+    args = parser.parse_args()
+    # Clave JWT corta del entorno local: no interesa aquí
+    warnings.filterwarnings('ignore', module='jwt')
+
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    db.metadata.create_all(engine)
+    session = Session(engine)
+    usuario = _poblar(session, args.pedidos, args.items)
+
+    app = FastAPI()
+    app.include_router(pedidos_router.router, prefix='/api/v1')
+    app.dependency_overrides[get_session] = lambda: SyncSessionAdapter(session)
+    client = TestClient(app)
+    auth = {'Authorization': f'Bearer {create_access_token({"user_id": usuario.id, "rol": "admin"})}'}
+    url = f'/api/v1/pedidos?limit={args.pedidos}'
+    assert len(client.get(url, headers=auth).json()) == args.pedidos
+
+    peticion = _medir(lambda: client.get(url, headers=auth), args.repeticiones)
+    pagina = asyncio.run(obtener_pagina_pedidos(
+        SyncSessionAdapter(session), usuario, Parametros(args.pedidos, None, None, False)))
+    dicts = pagina.items
+    adaptador = TypeAdapter(List[PedidoResponse])
+
+    serializadores = {
+        'response_model': lambda: adaptador.dump_json(adaptador.validate_python(dicts)),
+        'jsonable+json': lambda: json.dumps(jsonable_encoder(dicts), ensure_ascii=False, separators=(',', ':')).encode(),
+        'directo': lambda: json_rapido.dumps(dicts),
+    }
+    tiempos = {nombre: _medir(funcion, args.repeticiones) for nombre, funcion in serializadores.items()}
+    # La petición medida ya incluye `directo`: el resto es consulta + framework
+    resto = peticion - tiempos['directo']
+
+    print(f'GET {url}: {args.pedidos} pedidos x {args.items} items, '
+          f'{len(json_rapido.dumps(dicts)) / 1024:.0f} KiB, motor {json_rapido.MOTOR}')
+    print(f'{"petición (directo)":<22} {peticion * 1000:8.2f} ms')
+    for nombre, segundos in tiempos.items():
+        total = resto + segundos
+        print(f'{nombre:<22} {segundos * 1000:8.2f} ms  -> {segundos / total:6.1%} de una petición de {total * 1000:.2f} ms')
+
+    pedidos = list(session.scalars(select(Pedido).options(selectinload(Pedido.items).selectinload(PedidoItem.menu_item))
+                                   .order_by(Pedido.id).limit(args.pedidos)))
+    flask_app = Flask(__name__)
+    with flask_app.app_context():
+        for nombre, proveedor in (('flask por defecto', DefaultJSONProvider), ('flask ProveedorJSON', json_rapido.ProveedorJSON)):
+            flask_app.json = proveedor(flask_app)
+            segundos = _medir(lambda: jsonify([p.to_dict() for p in pedidos]).get_data(), args.repeticiones)
+            print(f'{nombre:<22} {segundos * 1000:8.2f} ms (to_dict + jsonify)')
+    session.close()
+
+
+if __name__ == '__main__':
+    main()
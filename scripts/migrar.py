@@ -0,0 +1,106 @@
+"""
+Script para aplicar, revertir y crear migraciones de `migrations/versions`.
+
+Las revisiones aplicadas se guardan en `schema_migraciones`. Cada migración
+comprueba lo que ya existe, así que sobre una base creada con
+`db.create_all()` sólo queda registrada.
+
+    python scripts/migrar.py                    # aplicar las pendientes
+    python scripts/migrar.py --hasta 0001       # aplicar hasta una revisión
+    python scripts/migrar.py --estado           # listar aplicadas y pendientes
+    python scripts/migrar.py --revertir 0001    # deshacer las posteriores (base = todas)
+    python scripts/migrar.py --nueva "indice inventario"
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import date
+
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(root_dir, 'src'))
+sys.path.insert(0, root_dir)
+
+from app.app import create_app
+from app.models import db
+from migrations import actualizar, aplicadas, revertir, versiones
+
+PLANTILLA = '''"""{mensaje}
+
+Revision ID: {revision}
+Revises: {anterior}
+Create Date: {fecha}
+"""
+from migrations import borrar_indice, crear_indice
+
+revision = '{revision}'
+down_revision = {down_revision}
+
+
+def upgrade(conexion):
+    pass
+
+
+def downgrade(conexion):
+    pass
+'''
+
+
+def _titulo(migracion):
+    return migracion.__doc__.strip().splitlines()[0]
+
+
+def nueva(mensaje):
+    """Crear el archivo de la siguiente revisión y devolver su ruta."""
+    migraciones = versiones()
+    anterior = migraciones[-1].revision if migraciones else None
+    revision = f'{int(anterior or 0) + 1:04d}'
+    nombre = re.sub(r'[^a-z0-9]+', '_', mensaje.lower()).strip('_')
+    ruta = os.path.join(root_dir, 'migrations', 'versions', f'{revision}_{nombre}.py')
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.write(PLANTILLA.format(
+            mensaje=mensaje, revision=revision, anterior=anterior or '', fecha=date.today().isoformat(),
+            down_revision=repr(anterior),
+        ))
+    return ruta
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migraciones de esquema')
+    parser.add_argument('--hasta', help='Última revisión a aplicar')
+    parser.add_argument('--revertir', metavar='REVISION', help='Deshacer las posteriores a REVISION ("base" = todas)')
+    parser.add_argument('--estado', action='store_true', help='Listar revisiones aplicadas y pendientes')
+    parser.add_argument('--nueva', metavar='MENSAJE', help='Crear una migración vacía')
+    parser.add_argument('--config', default='default', help='Configuración de create_app')
+    args = parser.parse_args()
+
+    if args.nueva:
+        print(f'✅ Creada {nueva(args.nueva)}')
+        return
+
+    app = create_app(args.config)
+    with app.app_context():
+        try:
+            if args.estado:
+                with db.engine.begin() as conexion:
+                    hechas = aplicadas(conexion)
+                for migracion in versiones():
+                    marca = '✅' if migracion.revision in hechas else '⏳'
+                    print(f'{marca} {migracion.revision}: {_titulo(migracion)}')
+            elif args.revertir:
+                hasta = None if args.revertir == 'base' else args.revertir
+                for migracion in revertir(db.engine, hasta):
+                    print(f'↩️  {migracion.revision}: {_titulo(migracion)}')
+            else:
+                migraciones = actualizar(db.engine, args.hasta)
+                for migracion in migraciones:
+                    print(f'✅ {migracion.revision}: {_titulo(migracion)}')
+                if not migraciones:
+                    print('✅ Sin migraciones pendientes')
+        except Exception as e:
+            print(f'❌ Error: {e}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
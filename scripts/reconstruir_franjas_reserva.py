@@ -0,0 +1,53 @@
+"""
+Script para reconstruir `reserva_franjas` a partir de las reservas activas.
+
+Ejecutarlo una vez tras desplegar la tabla (backfill) o si se cambia
+`RESERVA_FRANJA_MINUTOS`. Las reservas antiguas que se solapan en la misma
+mesa se listan para revisarlas a mano: sólo la primera queda bloqueada.
+
+    python scripts/reconstruir_franjas_reserva.py
+    python scripts/reconstruir_franjas_reserva.py --desde 2026-01-01
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(root_dir, 'src'))
+sys.path.insert(0, root_dir)
+
+from app.app import create_app
+from app.models import db
+from app.utils import franjas_reserva
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Fecha inválida: {valor} (use YYYY-MM-DD)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconstruir la tabla reserva_franjas')
+    parser.add_argument('--desde', type=_fecha, help='Primer día incluido (YYYY-MM-DD)')
+    parser.add_argument('--config', default='default', help='Configuración de create_app')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        try:
+            filas, conflictos = franjas_reserva.reconstruir(db.session, args.desde)
+            db.session.commit()
+            print(f'✅ reserva_franjas reconstruida: {filas} franjas')
+            if conflictos:
+                print(f'⚠️  Reservas solapadas sin bloquear (revisar): {", ".join(map(str, conflictos))}')
+        except Exception as e:
+            db.session.rollback()
+            print(f'❌ Error: {e}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Script para reconstruir el rollup `ventas_diarias` a partir de `pedidos`.
+
+Ejecutarlo una vez tras desplegar la tabla (backfill) o cuando se sospeche
+que el rollup quedó desalineado, p. ej. tras cargas masivas por SQL directo.
+
+    python scripts/reconstruir_ventas_diarias.py
+    python scripts/reconstruir_ventas_diarias.py --desde 2025-01-01 --hasta 2025-02-01
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(root_dir, 'src'))
+sys.path.insert(0, root_dir)
+
+from app.app import create_app
+from app.models import db
+from app.utils import ventas_diarias
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Fecha inválida: {valor} (use YYYY-MM-DD)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconstruir la tabla ventas_diarias')
+    parser.add_argument('--desde', type=_fecha, help='Primer día incluido (YYYY-MM-DD)')
+    parser.add_argument('--hasta', type=_fecha, help='Día final, excluido (YYYY-MM-DD)')
+    parser.add_argument('--config', default='default', help='Configuración de create_app')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        try:
+            filas = ventas_diarias.reconstruir(db.session, args.desde, args.hasta)
+            db.session.commit()
+            print(f'✅ ventas_diarias reconstruida: {filas} filas')
+        except Exception as e:
+            db.session.rollback()
+            print(f'❌ Error: {e}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
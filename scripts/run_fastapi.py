@@ -1,5 +1,5 @@
 """
-Ejecutar solo el servidor FastAPI con contexto de Flask
+Ejecutar solo el servidor FastAPI (no necesita la app Flask)
 """
 import sys
 import os
@@ -8,7 +8,6 @@ import os
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
 import uvicorn
-from app import create_app as create_flask_app
 from fastapi_app import create_fastapi_app
 
 if __name__ == '__main__':
@@ -22,10 +21,6 @@ if __name__ == '__main__':
     print("="*70)
     print()
     
-    # IMPORTANTE: Crear contexto de Flask ANTES de FastAPI
-    flask_app = create_flask_app('development')
-    print("✅ Contexto de Flask creado")
-    
     app = create_fastapi_app()
     print("✅ FastAPI creado")
     
@@ -40,7 +40,9 @@ from sqlalchemy.exc import OperationalError, InterfaceError
 
 # Importar desde dentro del módulo (importes relativos)
 from .models import db, Usuario
-from .socket_events import socketio  # Importar la instancia de SocketIO
+from .socket_events import socketio, registrar_despachador  # Importar la instancia de SocketIO
+from .utils.cola_mensajes import crear_gestor
+from .utils.json_rapido import ProveedorJSON
 
 # Importar blueprints
 from .routes.auth import auth_bp
@@ -61,6 +63,8 @@ def create_app(config_name='default'):
     from config.config import config
     
     app = Flask(__name__)
+    # `jsonify` con orjson: Decimal y fechas sin conversión previa
+    app.json = ProveedorJSON(app)
     # Configuración para subir imágenes (mover aquí evita usar `app` antes de definirla)
     app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, MENU_UPLOADS)  # Por defecto usa la carpeta del menú
     app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
@@ -75,11 +79,19 @@ def create_app(config_name='default'):
     # Inicializar extensiones
     db.init_app(app)
     # Inicializar SocketIO con la app (usa init_app para instancias globales)
+    opciones_socketio = {'cors_allowed_origins': '*'}
+    if app.config.get('SOCKETIO_MESSAGE_QUEUE'):
+        # Varios workers: cada uno reenvía a sus clientes lo que publican los demás.
+        # Fuera del try: una cola mal configurada debe impedir el arranque
+        opciones_socketio['client_manager'] = crear_gestor(
+            app.config['SOCKETIO_MESSAGE_QUEUE'], channel=app.config['SOCKETIO_CHANNEL'])
     try:
-        socketio.init_app(app, cors_allowed_origins='*')
+        socketio.init_app(app, **opciones_socketio)
     except Exception:
         # Fallback: si ya estaba inicializado, ignorar
         pass
+    # Empujar a las salas de Socket.IO los cambios de pedidos, reservas y mesas
+    registrar_despachador()
     
     # Configurar Flask-Login
     login_manager = LoginManager()
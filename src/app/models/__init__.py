@@ -72,15 +72,11 @@ class Mesa(db.Model):
     tipo = db.Column(db.Enum('interior', 'terraza', 'vip'), default='interior')
     
     def to_dict(self):
-        # Determinar si la mesa está ocupada por pedidos activos
+        # Determinar si la mesa está ocupada por pedidos activos (índice en memoria)
         ocupada = False
         try:
-            from models import Pedido
-            pedido_activo = Pedido.query.filter(
-                Pedido.mesa_id == self.id,
-                Pedido.estado.in_(['pendiente', 'preparando', 'enviado'])
-            ).first()
-            ocupada = pedido_activo is not None
+            from ..utils.ocupacion_mesas import ocupacion_mesas
+            ocupada = ocupacion_mesas.esta_ocupada(db.object_session(self) or db.session, self.id)
         except Exception:
             pass
         
@@ -211,6 +207,12 @@ class Servicio(db.Model):
 class Reserva(db.Model):
     """Modelo de reserva"""
     __tablename__ = 'reservas'
+    __table_args__ = (
+        # "Mis reservas": por usuario, más recientes primero
+        db.Index('ix_reservas_usuario_id_created_at', 'usuario_id', 'created_at'),
+        # Disponibilidad y estadísticas por fecha
+        db.Index('ix_reservas_fecha', 'fecha'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
@@ -254,9 +256,36 @@ class Reserva(db.Model):
         }
 
 
+class ReservaFranja(db.Model):
+    """Franja de `RESERVA_FRANJA_MINUTOS` ocupada por una reserva activa.
+
+    La clave primaria `(mesa, fecha, franja)` impide a nivel de base de datos
+    que dos reservas ocupen la misma mesa a la vez, aunque se creen en
+    paralelo. `franja` es el número de franja del día (minuto de inicio
+    dividido por el tamaño de franja). Se mantiene desde
+    `utils.franjas_reserva` y se puede reconstruir con
+    `scripts/reconstruir_franjas_reserva.py`.
+    """
+    __tablename__ = 'reserva_franjas'
+    
+    mesa = db.Column(db.String(50), primary_key=True)
+    fecha = db.Column(db.Date, primary_key=True)
+    franja = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    reserva_id = db.Column(db.Integer, db.ForeignKey('reservas.id', ondelete='CASCADE'), nullable=False, index=True)
+
+
 class Pedido(db.Model):
     """Modelo de pedido"""
     __tablename__ = 'pedidos'
+    __table_args__ = (
+        # Rangos por día (`utils.fechas.rango_utc`), también filtrando por estado
+        db.Index('ix_pedidos_fecha_pedido', 'fecha_pedido'),
+        db.Index('ix_pedidos_estado_fecha_pedido', 'estado', 'fecha_pedido'),
+        # Pedidos abiertos de una mesa
+        db.Index('ix_pedidos_mesa_id_estado', 'mesa_id', 'estado'),
+        # "Mis pedidos", en el orden del listado
+        db.Index('ix_pedidos_usuario_id_fecha_pedido', 'usuario_id', 'fecha_pedido'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
@@ -320,6 +349,10 @@ class Pedido(db.Model):
 class PedidoItem(db.Model):
     """Modelo de item de pedido"""
     __tablename__ = 'pedido_items'
+    __table_args__ = (
+        # La clave primaria empieza por pedido_id: búsquedas por producto
+        db.Index('ix_pedido_items_menu_item_id', 'menu_item_id'),
+    )
     
     pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos.id'), nullable=False, primary_key=True)
     menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_items.id'), primary_key=True)  # Ahora también es parte de la clave primaria
@@ -345,6 +378,39 @@ class PedidoItem(db.Model):
         }
 
 
+class VentaDiaria(db.Model):
+    """Resumen diario de pedidos (rollup) para las estadísticas.
+
+    Una fila por día y combinación de estado / método de pago / tipo de
+    servicio. Se mantiene de forma incremental desde `utils.ventas_diarias`
+    y se puede reconstruir con `scripts/reconstruir_ventas_diarias.py`.
+    Los valores nulos se guardan como cadena vacía para que la clave única
+    funcione igual en MySQL y SQLite.
+    """
+    __tablename__ = 'ventas_diarias'
+    __table_args__ = (
+        db.UniqueConstraint('fecha', 'estado', 'metodo_pago', 'tipo_servicio', name='uq_ventas_diarias_clave'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    fecha = db.Column(db.Date, nullable=False)
+    estado = db.Column(db.String(20), nullable=False, default='')
+    metodo_pago = db.Column(db.String(20), nullable=False, default='')
+    tipo_servicio = db.Column(db.String(20), nullable=False, default='')
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'fecha': self.fecha.isoformat() if self.fecha else None,
+            'estado': self.estado or None,
+            'metodo_pago': self.metodo_pago or None,
+            'tipo_servicio': self.tipo_servicio or None,
+            'cantidad': self.cantidad,
+            'total': float(self.total)
+        }
+
+
 # Nota: Las tablas de Factura e Inventario no existen en la base de datos actual
 # por lo que han sido removidas de este archivo. Si necesitas estas funcionalidades,
 # deberás crear las tablas correspondientes en la base de datos.
@@ -409,6 +475,9 @@ class InventarioMovimiento(db.Model):
 class Receta(db.Model):
     """Define los ingredientes necesarios para cada plato del menú"""
     __tablename__ = 'recetas'
+    __table_args__ = (
+        db.Index('ix_recetas_menu_item_id', 'menu_item_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_items.id'), nullable=False)
@@ -426,4 +495,14 @@ class Receta(db.Model):
             'inventario_id': self.inventario_id,
             'cantidad_usada': float(self.cantidad_usada),
             'ingrediente': self.inventario.to_dict() if self.inventario else None
-        }
\ No newline at end of file
+        }
+
+
+# Listeners de sesión que mantienen los datos derivados de `Pedido` y
+# `Reserva` (ocupación de mesas, rollup de ventas diarias, disponibilidad de
+# reservas) y publican los eventos de dominio tras cada commit.
+from ..utils import ocupacion_mesas as _ocupacion_mesas  # noqa: E402,F401
+from ..utils import ventas_diarias as _ventas_diarias  # noqa: E402,F401
+from ..utils import disponibilidad_reservas as _disponibilidad_reservas  # noqa: E402,F401
+from ..utils import franjas_reserva as _franjas_reserva  # noqa: E402,F401
+from ..utils import eventos as _eventos  # noqa: E402,F401
@@ -12,14 +12,26 @@ from flask import Blueprint, render_template, request, jsonify
 from werkzeug.utils import secure_filename
 from flask_login import login_required, current_user
 from functools import wraps
-from datetime import datetime, date, timedelta
+from datetime import datetime, timedelta
 from decimal import Decimal
 from flask import current_app
-from sqlalchemy import func
+from sqlalchemy import func, select
 from ..models import db, MenuItem, Categoria, Usuario, Mesa, Mesero, Servicio, Pedido, PedidoItem, Reserva, Inventario, InventarioMovimiento
+from ..utils.estadisticas import estadisticas_dashboard
+from ..utils.fechas import hoy_local
+from ..utils.franjas_reserva import MesaOcupada
+from ..utils.menu_cache import menu_cache
+from ..utils.principales import principales
+from ..utils.serializacion import PEDIDO
+from ..utils import inventario as stock
+from ..utils.paginacion import pagina_json
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
+# Orden de los listados paginados (ver utils/paginacion.py)
+ORDEN_PEDIDOS = [(Pedido.fecha_pedido, True), (Pedido.id, True)]
+ORDEN_RESERVAS = [(Reserva.id, True)]
+
 
 def admin_required(f):
     """Decorador para verificar que el usuario es administrador"""
@@ -44,10 +56,10 @@ def panel_admin():
 
     # ✅ AÑADIDO: estado_inicial con datos reales para evitar el error de Undefined
     try:
-        pedidos = Pedido.query.order_by(Pedido.fecha_pedido.desc()).limit(20).all()
-        pedidos_data = [p.to_dict() for p in pedidos]
+        pedidos = PEDIDO.consulta(Pedido.query.order_by(Pedido.fecha_pedido.desc())).limit(20).all()
+        pedidos_data = PEDIDO.lista(pedidos)
         
-        hoy = date.today()
+        hoy = hoy_local()
         reservas = Reserva.query.filter(Reserva.fecha >= hoy).order_by(Reserva.fecha, Reserva.hora).limit(10).all()
         reservas_data = [r.to_dict() for r in reservas]
         
@@ -83,103 +95,7 @@ def panel_admin():
 def dashboard_stats():
     """Estadísticas completas para el dashboard"""
     try:
-        hoy = date.today()
-        inicio_mes = date(hoy.year, hoy.month, 1)
-        hace_7_dias = hoy - timedelta(days=7)
-        hace_30_dias = hoy - timedelta(days=30)
-        
-        # Pedidos de hoy
-        pedidos_hoy = Pedido.query.filter(
-            func.date(Pedido.fecha_pedido) == hoy
-        ).all()
-        
-        # Reservas de hoy
-        reservas_hoy = Reserva.query.filter(Reserva.fecha == hoy).count()
-        
-        # Ventas de hoy
-        ventas_hoy = sum(float(p.total) for p in pedidos_hoy)
-        
-        # Mesas
-        total_mesas = Mesa.query.filter_by(disponible=True).count()
-        
-        # Mesas ocupadas: contar mesas con pedidos activos
-        pedidos_activos = Pedido.query.filter(
-            Pedido.mesa_id.isnot(None),
-            Pedido.estado.in_(['pendiente', 'preparando', 'enviado'])
-        ).all()
-        mesas_ocupadas_ids = set(p.mesa_id for p in pedidos_activos if p.mesa_id)
-        mesas_ocupadas = len(mesas_ocupadas_ids)
-        
-        # Pedidos pendientes
-        pedidos_pendientes = Pedido.query.filter(Pedido.estado == 'pendiente').count()
-        
-        # Usuarios totales
-        total_usuarios = Usuario.query.count()
-        
-        # Inventario bajo stock
-        inventario_bajo = Inventario.query.filter(
-            Inventario.cantidad <= Inventario.stock_minimo
-        ).count()
-        
-        # Ventas del mes
-        pedidos_mes = Pedido.query.filter(
-            func.date(Pedido.fecha_pedido) >= inicio_mes
-        ).all()
-        ventas_mes = sum(float(p.total) for p in pedidos_mes)
-        
-        # Pedidos por estado (últimos 30 días)
-        pedidos_30d = Pedido.query.filter(
-            func.date(Pedido.fecha_pedido) >= hace_30_dias
-        ).all()
-        
-        estados_count = {}
-        for p in pedidos_30d:
-            estados_count[p.estado] = estados_count.get(p.estado, 0) + 1
-        
-        # Ventas por día (últimos 7 días)
-        ventas_por_dia = {}
-        for i in range(7):
-            dia = hoy - timedelta(days=i)
-            pedidos_dia = Pedido.query.filter(
-                func.date(Pedido.fecha_pedido) == dia
-            ).all()
-            ventas_por_dia[dia.strftime('%Y-%m-%d')] = sum(float(p.total) for p in pedidos_dia)
-        
-        # Top productos más vendidos
-        from models import PedidoItem
-        productos_vendidos = db.session.query(
-            PedidoItem.menu_item_id,
-            func.sum(PedidoItem.cantidad).label('total_vendido')
-        ).join(Pedido).filter(
-            func.date(Pedido.fecha_pedido) >= hace_30_dias
-        ).group_by(PedidoItem.menu_item_id).order_by(
-            func.sum(PedidoItem.cantidad).desc()
-        ).limit(5).all()
-        
-        top_productos = []
-        for item_id, cantidad in productos_vendidos:
-            menu_item = MenuItem.query.get(item_id)
-            if menu_item:
-                top_productos.append({
-                    'nombre': menu_item.nombre,
-                    'cantidad': int(cantidad)
-                })
-        
-        return jsonify({
-            'pedidos_hoy': len(pedidos_hoy),
-            'reservas_hoy': reservas_hoy,
-            'ventas_hoy': ventas_hoy,
-            'mesas_ocupadas': mesas_ocupadas,
-            'total_mesas': total_mesas,
-            'pedidos_pendientes': pedidos_pendientes,
-            'total_usuarios': total_usuarios,
-            'inventario_bajo': inventario_bajo,
-            'ventas_mes': ventas_mes,
-            'pedidos_mes': len(pedidos_mes),
-            'estados_pedidos': estados_count,
-            'ventas_por_dia': ventas_por_dia,
-            'top_productos': top_productos
-        })
+        return jsonify(estadisticas_dashboard.obtener(db.session))
     except Exception as e:
         current_app.logger.error(f'Error en dashboard_stats: {e}')
         return jsonify({'error': str(e)}), 500
@@ -277,9 +193,8 @@ def toggle_disponibilidad_mesa(mesa_id):
 @login_required
 @admin_required
 def api_usuarios():
-    """Devuelve todos los usuarios"""
-    usuarios = Usuario.query.all()
-    return jsonify([u.to_dict() for u in usuarios])
+    """Devuelve los usuarios, paginados por id (`limit`, `cursor`, `fields`, `count`)"""
+    return pagina_json(db.session, select(Usuario), Usuario, [(Usuario.id, False)], Usuario.to_dict)
 
 @admin_bp.route('/api/usuarios/crear', methods=['POST'])
 @login_required
@@ -368,6 +283,7 @@ def cambiar_estado_usuario(user_id):
     try:
         usuario.activo = data['activo']
         db.session.commit()
+        principales.invalidar(user_id)
         return jsonify(usuario.to_dict()), 200
     except Exception as e:
         db.session.rollback()
@@ -391,6 +307,7 @@ def cambiar_rol(user_id):
         
     usuario.rol = nuevo_rol
     db.session.commit()
+    principales.invalidar(user_id)
     
     return jsonify(usuario.to_dict())
 
@@ -407,6 +324,7 @@ def eliminar_usuario_admin(user_id):
     try:
         db.session.delete(usuario)
         db.session.commit()
+        principales.invalidar(user_id)
         return jsonify({'message': f'Usuario {user_id} eliminado exitosamente'}), 200
     except Exception as e:
         db.session.rollback()
@@ -432,16 +350,19 @@ def api_pedidos():
     Nota: El modelo Pedido no tiene un campo 'tipo', por lo que el filtrado
     de tipo (mesa/domicilio) se realiza en el frontend a partir de si el
     pedido tiene o no 'direccion_entrega'.
+
+    Se paginan del más reciente al más antiguo (`limit`, `cursor`, `fields`,
+    `count`); los items y sus platos (forma `PEDIDO`) se cargan con una
+    consulta adicional por página.
     """
     estado = request.args.get('estado')
 
-    query = Pedido.query.order_by(Pedido.fecha_pedido.desc())
+    query = select(Pedido)
 
     if estado:
-        query = query.filter(Pedido.estado == estado)
+        query = query.where(Pedido.estado == estado)
 
-    pedidos = query.all()
-    return jsonify([p.to_dict() for p in pedidos])
+    return pagina_json(db.session, query, Pedido, ORDEN_PEDIDOS, PEDIDO, opciones=PEDIDO.opciones())
 
 
 @admin_bp.route('/api/pedidos/<int:pedido_id>')
@@ -608,9 +529,8 @@ def api_reservas():
             db.session.rollback()
             return jsonify({'error': f'Error al crear la reserva: {str(e)}'}), 500
     else: # GET
-        # Limitar a las últimas 300 reservas para mejor rendimiento
-        reservas = Reserva.query.order_by(Reserva.id.desc()).limit(300).all()
-        return jsonify([r.to_dict() for r in reservas])
+        # Páginas de PAGINACION_LIMITE reservas, de la más reciente a la más antigua
+        return pagina_json(db.session, select(Reserva), Reserva, ORDEN_RESERVAS, Reserva.to_dict)
 
 @admin_bp.route('/api/reservas/<int:reserva_id>/estado', methods=['PUT'])
 @login_required
@@ -629,7 +549,12 @@ def update_reserva_estado(reserva_id):
         return jsonify({'error': f'Estado inválido: {nuevo_estado}'}), 400
         
     reserva.estado = nuevo_estado
-    db.session.commit()
+    try:
+        db.session.commit()
+    except MesaOcupada as e:
+        # Reactivar una reserva cuya franja ya tomó otra
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 409
     
     try:
         from app import socketio
@@ -732,6 +657,9 @@ def actualizar_reserva(reserva_id):
             pass
         
         return jsonify({'success': True, 'reserva': reserva.to_dict()})
+    except MesaOcupada as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -775,6 +703,9 @@ def asignar_mesa_reserva(reserva_id):
             pass
         
         return jsonify({'success': True, 'reserva': reserva.to_dict()})
+    except MesaOcupada as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -835,8 +766,7 @@ def api_inventario():
             db.session.rollback()
             return jsonify({'error': f'Error al crear el item: {str(e)}'}), 500
     else: # GET
-        items = Inventario.query.all()
-        return jsonify([i.to_dict() for i in items])
+        return pagina_json(db.session, select(Inventario), Inventario, [(Inventario.id, False)], Inventario.to_dict)
 
 @admin_bp.route('/api/inventario/<int:item_id>/movimiento', methods=['POST'])
 @login_required
@@ -864,12 +794,13 @@ def registrar_movimiento(item_id):
         )
         db.session.add(nuevo_movimiento)
         
+        # Suma/resta atómica en la base de datos (sin leer-modificar-escribir)
         if tipo == 'entrada':
-            item.cantidad += cantidad_movimiento
+            stock.reponer(db.session, item.id, cantidad_movimiento)
         elif tipo == 'salida':
-            if item.cantidad < cantidad_movimiento:
+            if stock.descontar(db.session, {item.id: cantidad_movimiento}):
+                db.session.rollback()
                 return jsonify({'error': 'Stock insuficiente para esta salida'}), 400
-            item.cantidad -= cantidad_movimiento
             
         db.session.commit()
         
@@ -967,9 +898,6 @@ def registrar_movimiento_inventario(item_id):
         if tipo not in ['entrada', 'salida']:
             return jsonify({'error': 'Tipo de movimiento inválido'}), 400
         
-        if tipo == 'salida' and item.cantidad < cantidad:
-            return jsonify({'error': 'Cantidad insuficiente en inventario'}), 400
-        
         movimiento = InventarioMovimiento(
             inventario_id=item.id,
             tipo=tipo,
@@ -978,10 +906,12 @@ def registrar_movimiento_inventario(item_id):
             notas=data.get('notas', '')
         )
         
+        # Suma/resta atómica en la base de datos (sin leer-modificar-escribir)
         if tipo == 'entrada':
-            item.cantidad += cantidad
-        else:
-            item.cantidad -= cantidad
+            stock.reponer(db.session, item.id, cantidad)
+        elif stock.descontar(db.session, {item.id: cantidad}):
+            db.session.rollback()
+            return jsonify({'error': 'Cantidad insuficiente en inventario'}), 400
         
         db.session.add(movimiento)
         db.session.commit()
@@ -1019,6 +949,7 @@ def crear_menu_item():
         )
         db.session.add(nuevo_item)
         db.session.commit()
+        menu_cache.invalidar()
         return jsonify({'success': True, 'item': nuevo_item.to_dict()}), 201
     except Exception as e:
         db.session.rollback()
@@ -1049,6 +980,7 @@ def actualizar_menu_item(item_id):
             item.disponible = data['disponible']
         
         db.session.commit()
+        menu_cache.invalidar()
         return jsonify({'success': True, 'item': item.to_dict()})
     except Exception as e:
         db.session.rollback()
@@ -1064,6 +996,7 @@ def eliminar_menu_item(item_id):
         item = MenuItem.query.get_or_404(item_id)
         db.session.delete(item)
         db.session.commit()
+        menu_cache.invalidar()
         return jsonify({'success': True, 'message': 'Item eliminado'})
     except Exception as e:
         db.session.rollback()
@@ -1083,9 +1016,16 @@ def api_categorias_lista():
 @login_required
 @admin_required
 def api_menu_items():
-    """Devuelve todos los items del menú"""
-    items = MenuItem.query.all()
-    return jsonify([i.to_dict() for i in items])
+    """Devuelve los items del menú, paginados por id"""
+    return pagina_json(db.session, select(MenuItem), MenuItem, [(MenuItem.id, False)], MenuItem.to_dict)
+
+
+@admin_bp.route('/api/menu/cache')
+@login_required
+@admin_required
+def api_menu_cache_stats():
+    """Estadísticas de la caché del menú público (hits, misses, tamaño)"""
+    return jsonify(menu_cache.estadisticas())
 
 
 # Nueva ruta para cargar contenido dinámico del menú
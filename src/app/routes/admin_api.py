@@ -5,6 +5,8 @@ Incluye endpoints para estadísticas, actividad y alertas.
 from flask import Blueprint, jsonify, request
 from flask_login import login_required, current_user
 from ..models import db, Pedido, Reserva, Mesa, Servicio, Usuario, Inventario
+from ..utils import ventas_diarias
+from ..utils.fechas import ahora_utc, hoy_local
 from datetime import datetime, timedelta
 import functools
 
@@ -25,17 +27,12 @@ def admin_required(f):
 def get_dashboard_stats():
     """Obtiene las estadísticas principales para el dashboard"""
     try:
-        today = datetime.now().date()
+        today = hoy_local()
         
-        # Pedidos de hoy
-        pedidos_hoy = Pedido.query.filter(
-            db.func.date(Pedido.fecha_pedido) == today
-        ).count()
-        
-        # Ventas de hoy
-        ventas_hoy = db.session.query(db.func.sum(Pedido.total)).filter(
-            db.func.date(Pedido.fecha_pedido) == today
-        ).scalar() or 0
+        # Pedidos y ventas de hoy (una sola consulta agregada)
+        pedidos_hoy, ventas_hoy = ventas_diarias.agregar(
+            db.session, today, today + timedelta(days=1), (), hoy=today
+        ).get((), (0, 0.0))
         
         # Reservas de hoy
         reservas_hoy = Reserva.query.filter_by(
@@ -62,38 +59,33 @@ def get_ventas_stats():
     """Obtiene estadísticas detalladas de ventas"""
     try:
         periodo = request.args.get('periodo', 'hoy')
+        hoy = hoy_local()
         
         if periodo == 'hoy':
-            fecha_inicio = datetime.now().date()
+            fecha_inicio = hoy
             fecha_fin = fecha_inicio + timedelta(days=1)
         elif periodo == 'semana':
-            fecha_inicio = datetime.now().date() - timedelta(days=7)
-            fecha_fin = datetime.now().date() + timedelta(days=1)
+            fecha_inicio = hoy - timedelta(days=7)
+            fecha_fin = hoy + timedelta(days=1)
         elif periodo == 'mes':
-            fecha_inicio = datetime.now().date().replace(day=1)
+            fecha_inicio = hoy.replace(day=1)
             fecha_fin = (fecha_inicio + timedelta(days=32)).replace(day=1)
         else:
             return jsonify({'error': 'Periodo no válido'}), 400
         
-        # Ventas por estado
-        ventas_por_estado = db.session.query(
-            Pedido.estado,
-            db.func.count(Pedido.id),
-            db.func.sum(Pedido.total)
-        ).filter(
-            db.func.date(Pedido.fecha_pedido) >= fecha_inicio,
-            db.func.date(Pedido.fecha_pedido) < fecha_fin
-        ).group_by(Pedido.estado).all()
-        
-        # Ventas por método de pago
-        ventas_por_metodo = db.session.query(
-            Pedido.metodo_pago,
-            db.func.count(Pedido.id),
-            db.func.sum(Pedido.total)
-        ).filter(
-            db.func.date(Pedido.fecha_pedido) >= fecha_inicio,
-            db.func.date(Pedido.fecha_pedido) < fecha_fin
-        ).group_by(Pedido.metodo_pago).all()
+        # Días cerrados desde el rollup `ventas_diarias`, hoy en vivo
+        ventas_por_estado = [
+            (estado, cantidad, total)
+            for (estado,), (cantidad, total) in ventas_diarias.agregar(
+                db.session, fecha_inicio, fecha_fin, ('estado',), hoy=hoy
+            ).items()
+        ]
+        ventas_por_metodo = [
+            (metodo, cantidad, total)
+            for (metodo,), (cantidad, total) in ventas_diarias.agregar(
+                db.session, fecha_inicio, fecha_fin, ('metodo_pago',), hoy=hoy
+            ).items()
+        ]
         
         return jsonify({
             'periodo': periodo,
@@ -124,12 +116,13 @@ def get_reservas_stats():
     try:
         periodo = request.args.get('periodo', 'hoy')
         
+        hoy = hoy_local()
         if periodo == 'hoy':
-            fecha = datetime.now().date()
+            fecha = hoy
         elif periodo == 'semana':
-            fecha = datetime.now().date() - timedelta(days=7)
+            fecha = hoy - timedelta(days=7)
         elif periodo == 'mes':
-            fecha = datetime.now().date().replace(day=1)
+            fecha = hoy.replace(day=1)
         else:
             return jsonify({'error': 'Periodo no válido'}), 400
         
@@ -190,7 +183,7 @@ def get_alertas():
             })
         
         # Pedidos atrasados
-        limite_tiempo = datetime.now() - timedelta(hours=1)
+        limite_tiempo = ahora_utc() - timedelta(hours=1)
         pedidos_atrasados = Pedido.query.filter(
             Pedido.estado.in_(['pendiente', 'preparando']),
             Pedido.fecha_pedido <= limite_tiempo
@@ -208,7 +201,7 @@ def get_alertas():
         # Reservas sin confirmar
         reservas_pendientes = Reserva.query.filter(
             Reserva.estado == 'pendiente',
-            Reserva.fecha <= datetime.now().date() + timedelta(days=1)
+            Reserva.fecha <= hoy_local() + timedelta(days=1)
         ).all()
         
         for reserva in reservas_pendientes:
@@ -230,7 +223,7 @@ def get_actividad():
     """Obtiene el registro de actividad reciente"""
     try:
         actividad = []
-        limite = datetime.now() - timedelta(days=1)
+        limite = ahora_utc() - timedelta(days=1)
         
         # Pedidos recientes
         pedidos = Pedido.query.filter(
@@ -247,7 +240,7 @@ def get_actividad():
         
         # Reservas recientes
         reservas = Reserva.query.filter(
-            Reserva.fecha >= datetime.now().date()
+            Reserva.fecha >= hoy_local()
         ).order_by(Reserva.fecha.desc()).limit(20).all()
         
         for reserva in reservas:
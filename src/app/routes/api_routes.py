@@ -1,7 +1,13 @@
 from flask import Blueprint, jsonify, request
-from sqlalchemy import text
+from sqlalchemy import inspect as sa_inspect, select, text
 from datetime import datetime, timedelta
 from ..models import db, Categoria, Inventario, MenuItem, Mesa, Mesero, Pedido, PedidoItem, Reserva, Servicio, Usuario
+from ..utils import ventas_diarias
+from ..utils.fechas import ahora_utc, hoy_local
+from ..utils.http_cache import json_cacheado
+from ..utils.menu_cache import menu_cache
+from ..utils.paginacion import pagina_json
+from ..utils.serializacion import PEDIDO
 from flask_login import login_required, current_user
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -11,8 +17,9 @@ api_bp = Blueprint('api', __name__, url_prefix='/api')
 def get_menu_items():
     """Obtener todos los items del menú disponibles"""
     try:
-        items = MenuItem.query.filter_by(disponible=True).all()
-        return jsonify([item.to_dict() for item in items])
+        return json_cacheado(('api.menu_items',), lambda: [
+            item.to_dict() for item in menu_cache.items(db.session, disponible=True)
+        ])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -106,24 +113,19 @@ def get_reserva_detail(reserva_id):
 def get_dashboard_stats():
     """Obtener estadísticas para el dashboard"""
     try:
-        from datetime import datetime, timedelta
-        today = datetime.now().date()
+        from datetime import timedelta
+        today = hoy_local()
         
-        # Pedidos de hoy
-        pedidos_hoy = Pedido.query.filter(
-            db.func.date(Pedido.fecha_pedido) == today
-        ).count()
+        # Pedidos y ventas de hoy (una sola consulta agregada)
+        pedidos_hoy, ventas_hoy = ventas_diarias.agregar(
+            db.session, today, today + timedelta(days=1), (), hoy=today
+        ).get((), (0, 0.0))
         
         # Reservas de hoy
         reservas_hoy = Reserva.query.filter_by(
             fecha=today.strftime('%Y-%m-%d')
         ).count()
         
-        # Ventas de hoy
-        ventas_hoy = db.session.query(db.func.sum(Pedido.total)).filter(
-            db.func.date(Pedido.fecha_pedido) == today
-        ).scalar() or 0
-        
         # Estado de mesas
         total_mesas = Mesa.query.count()
         mesas_ocupadas = Mesa.query.filter_by(estado='ocupada').count()
@@ -143,10 +145,10 @@ def get_dashboard_stats():
 def get_dashboard_actividad():
     """Obtener actividad reciente para el dashboard"""
     try:
-        from datetime import datetime, timedelta
+        from datetime import timedelta
         
         # Últimas 24 horas
-        desde = datetime.now() - timedelta(days=1)
+        desde = ahora_utc() - timedelta(days=1)
         
         # Obtener últimos pedidos
         pedidos = Pedido.query.filter(
@@ -207,7 +209,7 @@ def get_dashboard_alertas():
         # Verificar pedidos atrasados
         pedidos_atrasados = Pedido.query.filter(
             Pedido.estado.in_(['pendiente', 'preparando']),
-            Pedido.fecha_pedido <= datetime.now() - timedelta(hours=1)
+            Pedido.fecha_pedido <= ahora_utc() - timedelta(hours=1)
         ).all()
         
         for pedido in pedidos_atrasados:
@@ -225,12 +227,13 @@ def get_dashboard_alertas():
 @api_bp.route('/data/<model_name>', methods=['GET'])
 def get_data(model_name):
     try:
-        model = globals()[model_name.capitalize()]
-        if not model:
+        model = globals().get(model_name.capitalize())
+        if not (isinstance(model, type) and issubclass(model, db.Model)):
             return jsonify({'error': 'Modelo no encontrado'}), 404
 
-        items = model.query.all()
-        return jsonify([item.to_dict() for item in items])
+        # Paginado por clave primaria (`limit`, `cursor`, `fields`, `count`)
+        orden = [(columna, False) for columna in sa_inspect(model).primary_key]
+        return pagina_json(db.session, select(model), model, orden, model.to_dict)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -306,8 +309,11 @@ def delete_data(model_name, item_id):
 @api_bp.route('/cocina/pedidos', methods=['GET'])
 def get_pedidos_cocina():
     try:
-        pedidos = Pedido.query.filter(Pedido.estado.in_(['pendiente', 'preparando', 'enviado'])).all()
-        return jsonify([p.to_dict() for p in pedidos])
+        # Items y platos de todos los pedidos en una consulta, no una por línea
+        pedidos = PEDIDO.consulta(Pedido.query).filter(
+            Pedido.estado.in_(['pendiente', 'preparando', 'enviado'])
+        ).all()
+        return jsonify(PEDIDO.lista(pedidos))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -454,8 +460,11 @@ def get_pedidos_piscina():
         # Asumiendo que los pedidos de piscina se gestionan de forma similar a cocina
         # y están relacionados con el modelo Pedido o un modelo similar.
         # Si hay un modelo específico para pedidos de piscina, se debería usar ese.
-        pedidos = Pedido.query.filter(Pedido.estado.in_(['pendiente', 'preparando', 'enviado'])).all()
-        return jsonify([p.to_dict() for p in pedidos])
+        # Items y platos de todos los pedidos en una consulta, no una por línea
+        pedidos = PEDIDO.consulta(Pedido.query).filter(
+            Pedido.estado.in_(['pendiente', 'preparando', 'enviado'])
+        ).all()
+        return jsonify(PEDIDO.lista(pedidos))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
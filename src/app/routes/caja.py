@@ -6,6 +6,7 @@ from flask_login import login_required, current_user
 from functools import wraps
 from datetime import datetime
 from ..models import db, Pedido, Mesa
+from ..utils.serializacion import PEDIDO
 try:
     from models import Factura
 except ImportError:
@@ -64,12 +65,12 @@ def facturas_pendientes():
 @cajero_required
 def pedidos_piscina():
     """Obtener pedidos desde la piscina"""
-    pedidos = Pedido.query.filter_by(
-        tipo='piscina',
+    pedidos = PEDIDO.consulta(Pedido.query).filter_by(
+        tipo_servicio='piscina',
         estado='pendiente'
     ).order_by(Pedido.fecha_pedido.asc()).all()
     
-    return jsonify([pedido.to_dict() for pedido in pedidos])
+    return jsonify(PEDIDO.lista(pedidos))
 
 
 @caja_bp.route('/api/pedido/<int:pedido_id>/despachar', methods=['POST'])
@@ -139,7 +140,7 @@ def pagar_factura(factura_id):
 def obtener_cuenta_mesa(mesa_id):
     """Obtener la cuenta total de una mesa"""
     # Obtener todos los pedidos activos de la mesa
-    pedidos = Pedido.query.filter_by(
+    pedidos = PEDIDO.consulta(Pedido.query).filter_by(
         mesa_id=mesa_id,
         estado='listo'
     ).all()
@@ -149,7 +150,7 @@ def obtener_cuenta_mesa(mesa_id):
     return jsonify({
         'mesa_id': mesa_id,
         'total': total,
-        'pedidos': [pedido.to_dict() for pedido in pedidos]
+        'pedidos': PEDIDO.lista(pedidos)
     })
 
 
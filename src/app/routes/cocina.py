@@ -5,6 +5,7 @@ from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required, current_user
 from functools import wraps
 from ..models import db, Pedido
+from ..utils.cola_cocina import cola_cocina
 
 cocina_bp = Blueprint('cocina', __name__, url_prefix='/cocina')
 
@@ -32,12 +33,19 @@ def panel_cocina():
 @cocina_required
 def pedidos_pendientes():
     """Obtener pedidos pendientes para la cocina"""
-    pedidos = Pedido.query.filter(
-        Pedido.tipo.in_(['mesa', 'domicilio']),
-        Pedido.estado.in_(['pendiente', 'preparando'])
-    ).order_by(Pedido.fecha_pedido.asc()).all()
-    
-    return jsonify([pedido.to_dict() for pedido in pedidos])
+    return jsonify(cola_cocina.tickets(db.session))
+
+
+@cocina_bp.route('/api/cola')
+@login_required
+@cocina_required
+def cola():
+    """Cola de cocina incremental.
+
+    Con `?since=<version>` devuelve sólo los tickets agregados o modificados
+    y los ids retirados desde esa versión; sin ella, la cola completa.
+    """
+    return jsonify(cola_cocina.cambios(db.session, request.args.get('since')))
 
 
 @cocina_bp.route('/api/pedido/<int:pedido_id>/estado', methods=['POST'])
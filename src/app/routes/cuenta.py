@@ -8,6 +8,7 @@ from werkzeug.security import generate_password_hash
 from datetime import datetime
 import os
 from ..models import db, Usuario, Pedido, Reserva
+from ..utils.serializacion import PEDIDO
 
 cuenta_bp = Blueprint('cuenta', __name__, url_prefix='/cuenta')
 
@@ -29,13 +30,13 @@ def mi_cuenta():
 def obtener_mis_pedidos():
     """API para obtener los pedidos del usuario"""
     try:
-        pedidos = Pedido.query.filter_by(usuario_id=current_user.id)\
+        pedidos = PEDIDO.consulta(Pedido.query.filter_by(usuario_id=current_user.id))\
             .order_by(Pedido.fecha_pedido.desc())\
             .all()
         
         return jsonify({
             'success': True,
-            'pedidos': [p.to_dict() for p in pedidos]
+            'pedidos': PEDIDO.lista(pedidos)
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -3,7 +3,10 @@ Rutas principales de la aplicación
 """
 from flask import Blueprint, render_template, request, jsonify
 from flask_login import current_user
-from ..models import db, MenuItem, Categoria, Servicio, Mesero, Mesa
+from ..models import db, Servicio, Mesero, Mesa
+from ..utils.http_cache import json_cacheado
+from ..utils.menu_cache import menu_cache
+from ..utils.ocupacion_mesas import ocupacion_mesas
 from datetime import datetime
 
 main_bp = Blueprint('main', __name__)
@@ -14,16 +17,11 @@ def index():
     """Página principal"""
     try:
         # Obtener items destacados para mostrar en la página principal
-        items_destacados = MenuItem.query.filter_by(
-            disponible=True,
-            destacado=True
-        ).order_by(MenuItem.orden).limit(6).all()
+        items_destacados = menu_cache.items(db.session, disponible=True, destacado=True)[:6]
         
         # Si no hay items destacados, tomar los primeros 6 disponibles
         if not items_destacados:
-            items_destacados = MenuItem.query.filter_by(
-                disponible=True
-            ).order_by(MenuItem.orden).limit(6).all()
+            items_destacados = menu_cache.items(db.session, disponible=True)[:6]
         
         return render_template('index.html', items_destacados=items_destacados)
     except Exception as e:
@@ -35,8 +33,8 @@ def index():
 def menu():
     """Página del menú"""
     try:
-        categorias = Categoria.query.order_by(Categoria.orden).all()
-        items = MenuItem.query.filter_by(disponible=True).all()
+        categorias = menu_cache.categorias(db.session)
+        items = menu_cache.items(db.session, disponible=True)
         
         # Organizar items por categoría
         # Se pasa la lista plana de items y las categorías para permitir el filtrado por JS
@@ -85,8 +83,8 @@ def reservas():
 def domicilios():
     """Página de domicilios"""
     try:
-        categorias = Categoria.query.order_by(Categoria.orden).all()
-        items = MenuItem.query.filter_by(disponible=True).all()
+        categorias = menu_cache.categorias(db.session)
+        items = menu_cache.items(db.session, disponible=True)
         
         return render_template('domicilios.html', categorias=categorias, items=items)
     except Exception as e:
@@ -98,9 +96,9 @@ def domicilios():
 @main_bp.route('/api/menu')
 def api_menu():
     """API para obtener el menú completo"""
-    try:
-        categorias = Categoria.query.order_by(Categoria.orden).all()
-        items = MenuItem.query.filter_by(disponible=True).all()
+    def construir():
+        categorias = menu_cache.categorias(db.session)
+        items = menu_cache.items(db.session, disponible=True)
         
         menu_data = []
         for categoria in categorias:
@@ -110,8 +108,10 @@ def api_menu():
                     'categoria': categoria.to_dict(),
                     'items': categoria_items
                 })
-        
-        return jsonify(menu_data)
+        return menu_data
+    
+    try:
+        return json_cacheado(('main.api_menu',), construir)
     except Exception as e:
         print(f"Error en /api/menu: {e}")
         return jsonify([])
@@ -121,27 +121,13 @@ def api_menu():
 def api_mesas():
     """API para obtener mesas disponibles (excluyendo las ocupadas por otros usuarios)"""
     try:
-        from models import Pedido
-        
         # Obtener todas las mesas disponibles
         mesas = Mesa.query.filter_by(disponible=True).all()
         
-        # Si el usuario está autenticado, obtener pedidos activos de OTROS usuarios
-        if current_user.is_authenticated:
-            pedidos_activos = Pedido.query.filter(
-                Pedido.mesa_id.isnot(None),
-                Pedido.estado.in_(['pendiente', 'preparando', 'enviado']),
-                Pedido.usuario_id != current_user.id  # Excluir pedidos del usuario actual
-            ).all()
-        else:
-            # Si no está autenticado, mostrar todas las mesas ocupadas
-            pedidos_activos = Pedido.query.filter(
-                Pedido.mesa_id.isnot(None),
-                Pedido.estado.in_(['pendiente', 'preparando', 'enviado'])
-            ).all()
-        
-        # IDs de mesas ocupadas por otros
-        mesas_ocupadas_ids = set(p.mesa_id for p in pedidos_activos if p.mesa_id)
+        # Mesas ocupadas según el índice en memoria. Si el usuario está
+        # autenticado, sus propios pedidos no bloquean la mesa.
+        excluir_usuario_id = current_user.id if current_user.is_authenticated else None
+        mesas_ocupadas_ids = ocupacion_mesas.mesas_ocupadas(db.session, excluir_usuario_id)
         
         # Filtrar mesas que no estén ocupadas por otros
         mesas_disponibles = [
@@ -159,8 +145,9 @@ def api_mesas():
 def api_meseros():
     """API para obtener meseros disponibles"""
     try:
-        meseros = Mesero.query.filter_by(disponible=True).all()
-        return jsonify([mesero.to_dict() for mesero in meseros])
+        return json_cacheado(('main.api_meseros',), lambda: [
+            mesero.to_dict() for mesero in Mesero.query.filter_by(disponible=True).all()
+        ])
     except Exception as e:
         print(f"Error en /api/meseros: {e}")
         return jsonify([])
@@ -170,8 +157,9 @@ def api_meseros():
 def api_servicios():
     """API para obtener servicios disponibles"""
     try:
-        servicios_list = Servicio.query.filter_by(disponible=True).all()
-        return jsonify([servicio.to_dict() for servicio in servicios_list])
+        return json_cacheado(('main.api_servicios',), lambda: [
+            servicio.to_dict() for servicio in Servicio.query.filter_by(disponible=True).all()
+        ])
     except Exception as e:
         print(f"Error en /api/servicios: {e}")
         return jsonify([])
@@ -1,18 +1,23 @@
 # routes/pedidos.py
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
-from ..models import db, Pedido, PedidoItem, MenuItem, Inventario, InventarioMovimiento
-try:
-    from models import Receta
-except ImportError:
-    Receta = None
+from ..models import db, Pedido, PedidoItem, MenuItem
 from datetime import datetime
 import uuid
 from ..utils.pedido_utils import add_or_update_pedido_item
+from ..utils import stock_pedido
 
 pedidos_bp = Blueprint('pedidos', __name__, url_prefix='/pedidos')
 
 
+def _id_menu_item(item_data):
+    """Id numérico de una línea del carrito, o None (p. ej. productos de piscina)."""
+    try:
+        return int(item_data['id'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
 @pedidos_bp.route('/crear', methods=['POST'])
 @login_required
 def crear_pedido():
@@ -67,10 +72,13 @@ def crear_pedido():
         db.session.add(nuevo_pedido)
         db.session.flush()
         
-        # Verificar stock antes de crear el pedido
-        movimientos_inventario = []
+        # Cargar todos los platos del carrito en una sola consulta
+        menu_items = stock_pedido.cargar_menu_items(
+            db.session, (_id_menu_item(item_data) for item_data in data['items'])
+        )
+        lineas = []
         for item_data in data['items']:
-            menu_item = MenuItem.query.get(item_data['id'])
+            menu_item = menu_items.get(_id_menu_item(item_data))
             if not menu_item:
                 # Fallback para pedidos de piscina: crear MenuItem "ligero" si no existe
                 if data.get('tipo') == 'piscina':
@@ -89,51 +97,28 @@ def crear_pedido():
                     db.session.flush()
                 else:
                     continue
+            lineas.append((menu_item, item_data))
 
-            # Verificar recetas (ingredientes necesarios)
-            if Receta is None:
-                return jsonify({'error': 'Funcionalidad de recetas no disponible en el sistema'}), 500
-            recetas = Receta.query.filter_by(menu_item_id=menu_item.id).all()
-            cantidad_pedido = item_data['cantidad']
-            
-            # Verificar stock suficiente para cada ingrediente
-            for receta in recetas:
-                inventario_item = Inventario.query.get(receta.inventario_id)
-                if inventario_item:
-                    cantidad_necesaria = float(receta.cantidad_usada) * cantidad_pedido
-                    if inventario_item.cantidad < cantidad_necesaria:
-                        return jsonify({
-                            'error': f'Stock insuficiente de "{inventario_item.nombre}" para el plato "{menu_item.nombre}"'
-                        }), 400
-            
-            # Agregar o actualizar item del pedido (centralizado en helper)
-            pedido_item = add_or_update_pedido_item(
-                nuevo_pedido.id,
-                menu_item,
-                cantidad_pedido,
-                item_data['precio']
+        # Verificar stock de todos los ingredientes (recetas e inventario en dos
+        # consultas) y descontarlo con UPDATE condicionales atómicos
+        try:
+            plan = stock_pedido.planificar(
+                db.session, [(menu_item, item_data['cantidad']) for menu_item, item_data in lineas]
             )
-            
-            # Registrar movimientos de inventario (salidas)
-            for receta in recetas:
-                inventario_item = Inventario.query.get(receta.inventario_id)
-                if inventario_item:
-                    cantidad_salida = float(receta.cantidad_usada) * cantidad_pedido
-                    inventario_item.cantidad -= cantidad_salida
-                    
-                    # Registrar movimiento
-                    movimiento = InventarioMovimiento(
-                        inventario_id=inventario_item.id,
-                        tipo='salida',
-                        cantidad=cantidad_salida,
-                        usuario_id=current_user.id,
-                        notas=f'Pedido {codigo} - {menu_item.nombre} x{cantidad_pedido}'
-                    )
-                    movimientos_inventario.append(movimiento)
-        
-        # Agregar todos los movimientos de inventario
-        for movimiento in movimientos_inventario:
-            db.session.add(movimiento)
+
+            for menu_item, item_data in lineas:
+                # Agregar o actualizar item del pedido (centralizado en helper)
+                add_or_update_pedido_item(
+                    nuevo_pedido.id,
+                    menu_item,
+                    item_data['cantidad'],
+                    item_data['precio']
+                )
+
+            stock_pedido.aplicar(db.session, plan, current_user.id, codigo)
+        except stock_pedido.StockInsuficiente as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
         
         db.session.commit()
         
@@ -7,6 +7,8 @@ from datetime import datetime
 import random
 import string
 from ..models import db, Reserva, Mesa, Mesero, Servicio
+from ..utils.disponibilidad_reservas import disponibilidad_reservas
+from ..utils.franjas_reserva import MesaOcupada
 import json
 from decimal import Decimal
 
@@ -70,22 +72,9 @@ def crear_reserva():
         fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
         hora = datetime.strptime(data['hora'], '%H:%M').time()
         
-        # Validar disponibilidad de mesa si se especifica (para servicios de billar, etc.)
-        # Solo verificar conflictos con reservas de OTROS usuarios
-        if data.get('mesa_id'):
-            mesa_id_str = str(data.get('mesa_id'))
-            # Verificar que no haya reservas activas de otros usuarios para esa mesa en la misma fecha
-            reserva_existente = Reserva.query.filter(
-                Reserva.mesa_asignada == mesa_id_str,
-                Reserva.fecha == fecha,
-                Reserva.estado.in_(['pendiente', 'confirmada']),
-                Reserva.usuario_id != current_user.id  # Permitir al mismo usuario
-            ).first()
-            
-            if reserva_existente:
-                return jsonify({
-                    'error': f'La mesa {mesa_id_str} ya está reservada por otro cliente para el {fecha.strftime("%d/%m/%Y")}'
-                }), 400
+        # La mesa (número, o varios separados por comas) se bloquea al
+        # confirmar: si otra reserva ya ocupa esa franja, MesaOcupada -> 409
+        mesa = data.get('mesa_asignada') or data.get('mesa_id')
 
         # Preparar notas_especiales con metadatos del servicio
         notas_payload = {}
@@ -114,7 +103,7 @@ def crear_reserva():
             notas_especiales=notas_especiales,
             codigo_reserva=generar_codigo_reserva(),
             estado='pendiente',
-            mesa_asignada=str(data.get('mesa_id')) if data.get('mesa_id') else None,
+            mesa_asignada=str(mesa) if mesa else None,
             zona_mesa=data.get('zona_mesa') or 'interior'
         )
 
@@ -175,6 +164,9 @@ def crear_reserva():
             'reserva': nueva_reserva.to_dict()
         }), 201
         
+    except MesaOcupada as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -223,34 +215,42 @@ def cancelar_reserva(reserva_id):
 
 @reservas_bp.route('/disponibilidad', methods=['GET'])
 def verificar_disponibilidad():
-    """Verificar disponibilidad de mesas en una fecha"""
+    """Mesas libres para una fecha y, opcionalmente, hora y número de personas.
+
+    Parámetros: `fecha` (YYYY-MM-DD, obligatoria), `hora` (HH:MM),
+    `personas` y `duracion` (horas). Sin `hora`, una mesa con cualquier
+    reserva ese día cuenta como reservada.
+    """
     try:
         fecha_str = request.args.get('fecha')
         
         if not fecha_str:
             return jsonify({'error': 'Fecha requerida'}), 400
         
-        fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-        
-        # Obtener reservas para esa fecha
-        reservas_fecha = Reserva.query.filter(
-            Reserva.fecha == fecha,
-            Reserva.estado.in_(['pendiente', 'confirmada'])
-        ).all()
+        try:
+            fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+            hora = datetime.strptime(request.args['hora'], '%H:%M').time() if request.args.get('hora') else None
+            personas = request.args.get('personas', type=int)
+            duracion = request.args.get('duracion', type=float)
+        except ValueError:
+            return jsonify({'error': 'Fecha u hora inválida'}), 400
         
-        mesas_reservadas = [r.mesa_asignada for r in reservas_fecha if r.mesa_asignada]
+        # Franjas reservadas de la fecha (índice en memoria, una consulta por fecha)
+        mesas_reservadas = disponibilidad_reservas.mesas_reservadas(db.session, fecha, hora, duracion)
         
         # Obtener mesas disponibles
-        mesas_disponibles = Mesa.query.filter(
-            Mesa.disponible == True
-        ).all()
+        consulta = Mesa.query.filter(Mesa.disponible == True)
+        if personas:
+            consulta = consulta.filter(Mesa.capacidad >= personas)
+        mesas = consulta.order_by(Mesa.numero).all()
         
         # Filtrar las que no están reservadas
-        mesas_libres = [mesa for mesa in mesas_disponibles if str(mesa.numero) not in mesas_reservadas]
+        mesas_libres = [mesa for mesa in mesas if str(mesa.numero) not in mesas_reservadas]
         
         return jsonify({
             'disponibles': [mesa.to_dict() for mesa in mesas_libres],
-            'reservadas': mesas_reservadas
+            'reservadas': sorted(mesas_reservadas),
+            'mesas_ocupadas': [mesa.id for mesa in mesas if str(mesa.numero) in mesas_reservadas]
         })
         
     except Exception as e:
@@ -1,9 +1,12 @@
 """
 Configuración y eventos de WebSocket para BoodFood
 """
+from functools import partial
+
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_login import current_user
 from flask import request
+from .utils import eventos
 
 # Inicializar SocketIO
 socketio = SocketIO()
@@ -14,6 +17,50 @@ ROOM_CAJA = 'caja'
 ROOM_ADMIN = 'admin'
 ROOM_MESAS = 'mesas'
 
+# Nombre del evento Socket.IO para cada entidad del bus de dominio
+EVENTOS_SOCKET = {
+    'pedido': 'pedido_actualizado',
+    'reserva': 'reserva_actualizada',
+    'mesa': 'mesa_actualizada',
+}
+
+
+def salas_evento(evento):
+    """Salas que deben recibir un evento de dominio."""
+    entidad = evento['entidad']
+    if entidad == 'pedido':
+        salas = [ROOM_COCINA, ROOM_CAJA, ROOM_ADMIN]
+    elif entidad == 'reserva':
+        salas = [ROOM_CAJA, ROOM_ADMIN]
+    else:
+        salas = [ROOM_MESAS, ROOM_ADMIN]
+    mesa_id = evento['id'] if entidad == 'mesa' else evento.get('mesa_id')
+    if mesa_id:
+        salas.append(f'mesa_{mesa_id}')
+    return salas
+
+
+def despachar_evento(evento, emisor=None):
+    """Reenviar un evento de dominio (ya confirmado en BD) a sus salas.
+
+    Se emite una sola vez a la lista de salas: un cliente que está en
+    varias (p. ej. admin) lo recibe una vez. `emisor` es un client manager
+    de solo escritura para procesos sin servidor Socket.IO (la API FastAPI);
+    por defecto se usa `socketio`, que con cola de mensajes también
+    reparte el evento a los demás workers.
+    """
+    (emisor or socketio).emit(EVENTOS_SOCKET[evento['entidad']], evento, to=salas_evento(evento))
+
+
+def registrar_despachador(emisor=None):
+    """Suscribir el despachador de Socket.IO al bus de eventos de dominio.
+
+    Devuelve la función suscrita, para poder desuscribirla al cerrar.
+    """
+    if emisor is None:
+        return eventos.suscribir(despachar_evento)
+    return eventos.suscribir(partial(despachar_evento, emisor=emisor))
+
 @socketio.on('connect')
 def handle_connect():
     """Cliente conectado al WebSocket"""
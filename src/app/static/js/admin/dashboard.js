@@ -16,7 +16,8 @@ window.Dashboard = {
       await this.cargarTopProductos();
       await this.cargarAlertas();
       
-      // Actualizar cada 30 segundos
+      // El servidor empuja cada cambio de pedidos y reservas; el intervalo
+      // queda sólo como respaldo si se pierde la conexión
       if (window.dashboardInterval) {
         clearInterval(window.dashboardInterval);
       }
@@ -25,7 +26,22 @@ window.Dashboard = {
         if (window.currentView === 'dashboard') {
           this.cargarEstadisticas();
         }
-      }, 30000);
+      }, 300000);
+      
+      if (window.boodFoodSocket && !window.dashboardSocketRegistrado) {
+        window.dashboardSocketRegistrado = true;
+        // Espera mayor que DASHBOARD_STATS_MIN: el servidor ya puede recalcular
+        var refrescar = () => {
+          clearTimeout(window.dashboardRefresco);
+          window.dashboardRefresco = setTimeout(() => {
+            if (window.currentView === 'dashboard') {
+              this.cargarEstadisticas();
+            }
+          }, 2500);
+        };
+        window.boodFoodSocket.on('pedido_actualizado', refrescar);
+        window.boodFoodSocket.on('reserva_actualizada', refrescar);
+      }
       
       console.log('✅ Dashboard inicializado correctamente');
     } catch (error) {
@@ -9,7 +9,16 @@ window.Pedidos = {
   init: async function() {
     console.log('🍽️ Inicializando módulo Pedidos...');
     await cargarPedidos();
-    setInterval(async function() { await cargarPedidos(); }, 30000);
+    // Recargar cuando el servidor avisa de un cambio; el intervalo es respaldo
+    if (window.boodFoodSocket && !window.pedidosSocketRegistrado) {
+      window.pedidosSocketRegistrado = true;
+      var recarga = null;
+      window.boodFoodSocket.on('pedido_actualizado', function() {
+        clearTimeout(recarga);
+        recarga = setTimeout(cargarPedidos, 500);
+      });
+    }
+    setInterval(async function() { await cargarPedidos(); }, 300000);
   },
   cargarPedidos: async function() {
     await cargarPedidos();
@@ -153,10 +153,21 @@ function actualizarContadorNotificaciones() {
 
 // ===== API CLIENTE =====
 const API = {
+  // Los listados van paginados: se siguen las páginas (`X-Next-Cursor`)
+  // hasta juntar la lista completa
   async get(url) {
-    const res = await fetch(`/admin${url}`);
+    let res = await fetch(`/admin${url}`);
     if (!res.ok) throw new Error(`Error ${res.status}: ${await res.text()}`);
-    return res.json();
+    let datos = await res.json();
+    let cursor = res.headers.get('X-Next-Cursor');
+    while (cursor && Array.isArray(datos)) {
+      const separador = url.includes('?') ? '&' : '?';
+      res = await fetch(`/admin${url}${separador}cursor=${encodeURIComponent(cursor)}`);
+      if (!res.ok) throw new Error(`Error ${res.status}: ${await res.text()}`);
+      datos = datos.concat(await res.json());
+      cursor = res.headers.get('X-Next-Cursor');
+    }
+    return datos;
   },
   
   async post(url, data) {
@@ -194,12 +194,14 @@ async function cargarMesasDisponibles() {
         const hora = document.getElementById('hora').value;
         const personas = document.getElementById('numero_personas').value;
         
-        // Cargar todas las mesas
-        const response = await fetch('/api/mesas');
-        const mesas = await response.json();
+        // Mesas libres a esa hora y con capacidad suficiente
+        const params = new URLSearchParams({ fecha, personas });
+        if (hora) params.set('hora', hora);
+        const response = await fetch(`/api/reservas/disponibilidad?${params}`);
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.error || 'Error al consultar disponibilidad');
         
-        // Filtrar por capacidad
-        mesasDisponibles = mesas.filter(m => m.disponible && m.capacidad >= parseInt(personas));
+        mesasDisponibles = data.disponibles || [];
         
         if (mesasDisponibles.length === 0) {
             container.innerHTML = `
@@ -10,7 +10,11 @@ class BoodFoodSocket {
             'pedido_recibido': [],
             'estado_pedido_actualizado': [],
             'estado_mesa_actualizado': [],
-            'nueva_notificacion': []
+            'nueva_notificacion': [],
+            // Eventos de dominio emitidos por el servidor tras cada commit
+            'pedido_actualizado': [],
+            'reserva_actualizada': [],
+            'mesa_actualizada': []
         };
         this.reconnectAttempts = 0;
         this.maxReconnectAttempts = 5;
@@ -63,6 +67,11 @@ class BoodFoodSocket {
             this._triggerHandlers('estado_mesa_actualizado', data);
         });
 
+        // Eventos de dominio (el servidor los emite al confirmar cada cambio)
+        ['pedido_actualizado', 'reserva_actualizada', 'mesa_actualizada'].forEach(evento => {
+            this.socket.on(evento, (data) => this._triggerHandlers(evento, data));
+        });
+
         // Notificaciones generales
         this.socket.on('nueva_notificacion', (data) => {
             this._triggerHandlers('nueva_notificacion', data);
@@ -0,0 +1,226 @@
+"""
+Cola de la cocina en memoria, con feed incremental por versión.
+
+Las pantallas de cocina consultan la cola todo el día. En lugar de volcar
+cada vez todos los pedidos activos con `to_dict()` anidado, se mantiene por
+proceso un ticket ligero por pedido activo (ordenados por `fecha_pedido`) y
+cada cambio recibe un número de versión:
+
+- `cambios(session, desde)` devuelve sólo los tickets agregados o
+  modificados y los ids retirados después de la versión `desde`. Sin
+  versión, con una versión de otro proceso o demasiado antigua, devuelve la
+  cola completa (`completo: True`).
+- Los commits que tocan un `Pedido` o sus items marcan el pedido; en la
+  siguiente lectura se recargan sólo los marcados, con una consulta.
+- Cada `COCINA_COLA_TTL` segundos la cola se compara entera con la base de
+  datos, lo que recoge pedidos creados por otros procesos (p. ej. la API
+  FastAPI) o por `UPDATE` masivos.
+
+La versión es opaca para el cliente (`"<época>.<n>"`): la época identifica
+a la instancia de la cola, de modo que una versión emitida por otro worker
+nunca se interpreta como propia.
+"""
+import threading
+import time
+import uuid
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from ..models import Pedido, PedidoItem
+from .serializacion import Forma
+
+# Pedidos que la cocina tiene que preparar
+ESTADOS_COCINA = ('pendiente', 'preparando')
+TIPOS_COCINA = ('mesa', 'domicilio')
+
+# Ids retirados que se recuerdan para informar a clientes atrasados
+MAX_RETIRADOS = 500
+
+_MARCADOS_KEY = '_cola_cocina_marcados'
+
+
+def _ttl_por_defecto():
+    try:
+        from config.config import Config
+        return getattr(Config, 'COCINA_COLA_TTL', 15)
+    except ImportError:
+        return 15
+
+
+def _ticket(pedido):
+    return {
+        'id': pedido.id,
+        'codigo_pedido': pedido.codigo_pedido,
+        'estado': pedido.estado,
+        'tipo_servicio': pedido.tipo_servicio,
+        'mesa_id': pedido.mesa_id,
+        'fecha_pedido': pedido.fecha_pedido.isoformat() if pedido.fecha_pedido else None,
+        'nombre_receptor': pedido.nombre_receptor,
+        'instrucciones_entrega': pedido.instrucciones_entrega,
+        'items': [
+            {'menu_item_id': item.menu_item_id, 'nombre_item': item.nombre_item, 'cantidad': item.cantidad}
+            for item in pedido.items
+        ],
+    }
+
+
+# Un ticket sólo recorre los items del pedido
+TICKET = Forma(Pedido, serializar=_ticket, items=Forma(PedidoItem))
+
+
+def _orden(ticket):
+    return (ticket['fecha_pedido'] or '', ticket['id'])
+
+
+class ColaCocina:
+    """Tickets activos de cocina con historial de versiones."""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else _ttl_por_defecto()
+        self._lock = threading.Lock()
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._epoca = uuid.uuid4().hex[:8]
+        self._version = 0
+        self._minima = 0
+        self._tickets = {}
+        self._versiones = {}
+        self._retirados = {}
+        self._marcados = set()
+        self._sincronizado_en = None
+
+    def invalidar(self):
+        """Descartar la cola: la próxima lectura la reconstruye con otra época."""
+        with self._lock:
+            self._reiniciar()
+
+    def marcar(self, pedido_ids):
+        """Recargar estos pedidos en la próxima lectura."""
+        with self._lock:
+            self._marcados.update(pedido_ids)
+
+    # ----- Carga y diferencias -----
+
+    def _cargar(self, session, ids=None):
+        query = TICKET.consulta(select(Pedido)).where(
+            Pedido.estado.in_(ESTADOS_COCINA),
+            Pedido.tipo_servicio.in_(TIPOS_COCINA),
+        )
+        if ids is not None:
+            query = query.where(Pedido.id.in_(ids))
+        pedidos = session.scalars(query).all()
+        return {ticket['id']: ticket for ticket in TICKET.lista(pedidos)}
+
+    def _poner(self, pedido_id, ticket):
+        """Registrar el ticket (o su retiro, con `None`) si cambió. Requiere el lock."""
+        if self._tickets.get(pedido_id) == ticket:
+            return
+        if ticket is None and pedido_id not in self._tickets:
+            return
+        self._version += 1
+        if ticket is None:
+            del self._tickets[pedido_id]
+            del self._versiones[pedido_id]
+            self._retirados[pedido_id] = self._version
+        else:
+            self._tickets[pedido_id] = ticket
+            self._versiones[pedido_id] = self._version
+            self._retirados.pop(pedido_id, None)
+
+    def _podar_retirados(self):
+        if len(self._retirados) <= MAX_RETIRADOS:
+            return
+        antiguos = sorted(self._retirados.items(), key=lambda par: par[1])[:len(self._retirados) - MAX_RETIRADOS // 2]
+        for pedido_id, _ in antiguos:
+            del self._retirados[pedido_id]
+        # Quien venga de antes del último retiro olvidado recibe la cola completa
+        self._minima = max(self._minima, antiguos[-1][1])
+
+    def _asegurar(self, session):
+        sincronizado_en = self._sincronizado_en
+        if sincronizado_en is None or time.monotonic() - sincronizado_en > self.ttl:
+            activos = self._cargar(session)
+            with self._lock:
+                self._marcados.clear()
+                for pedido_id in set(self._tickets) - set(activos):
+                    self._poner(pedido_id, None)
+                for pedido_id, ticket in activos.items():
+                    self._poner(pedido_id, ticket)
+                self._sincronizado_en = time.monotonic()
+                self._podar_retirados()
+            return
+
+        with self._lock:
+            marcados, self._marcados = self._marcados, set()
+        if not marcados:
+            return
+        activos = self._cargar(session, marcados)
+        with self._lock:
+            for pedido_id in marcados:
+                self._poner(pedido_id, activos.get(pedido_id))
+            self._podar_retirados()
+
+    # ----- Lectura -----
+
+    def _numero(self, desde):
+        """Número de versión de `desde` si es de esta época y sigue vigente."""
+        epoca, _, numero = (desde or '').partition('.')
+        if epoca != self._epoca or not numero.isdigit():
+            return None
+        numero = int(numero)
+        if numero < self._minima or numero > self._version:
+            return None
+        return numero
+
+    def cambios(self, session, desde=None):
+        """Tickets cambiados desde la versión `desde` (o la cola completa)."""
+        self._asegurar(session)
+        with self._lock:
+            numero = self._numero(desde)
+            if numero is None:
+                tickets, retirados = list(self._tickets.values()), []
+            else:
+                tickets = [self._tickets[i] for i, v in self._versiones.items() if v > numero]
+                retirados = sorted(i for i, v in self._retirados.items() if v > numero)
+            return {
+                'version': f'{self._epoca}.{self._version}',
+                'completo': numero is None,
+                'tickets': sorted(tickets, key=_orden),
+                'retirados': retirados,
+            }
+
+    def tickets(self, session):
+        """Todos los tickets activos, por `fecha_pedido`."""
+        return self.cambios(session)['tickets']
+
+
+cola_cocina = ColaCocina()
+
+
+# ----- Marcado de pedidos vía eventos de sesión -----
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_pedidos_tocados(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Pedido):
+            pedido_id = obj.id
+        elif isinstance(obj, PedidoItem):
+            pedido_id = obj.pedido_id
+        else:
+            continue
+        if pedido_id is not None:
+            session.info.setdefault(_MARCADOS_KEY, set()).add(pedido_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _marcar_tras_commit(session):
+    marcados = session.info.pop(_MARCADOS_KEY, None)
+    if marcados:
+        cola_cocina.marcar(marcados)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_marcados(session):
+    session.info.pop(_MARCADOS_KEY, None)
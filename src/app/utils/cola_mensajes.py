@@ -0,0 +1,238 @@
+"""
+Cola de mensajes de Socket.IO entre procesos.
+
+Con un solo proceso, `socketio.emit` sólo llega a los clientes conectados a
+ese proceso. Al configurar `SOCKETIO_MESSAGE_QUEUE` cada worker de Flask se
+suscribe a un canal común y reenvía a sus clientes lo que emiten los demás;
+los workers de FastAPI publican en el mismo canal sin atender clientes
+(`write_only`), así que las salas siguen funcionando igual.
+
+URLs soportadas por `crear_gestor`:
+
+- `redis://`, `rediss://`, `valkey://`, `unix://`: Redis o compatible
+  (`socketio.RedisManager`, requiere el paquete `redis`).
+- `local://host:puerto` o `local:///ruta/al.sock`: broker propio sobre
+  `multiprocessing.connection` (TCP o socket Unix), pensado para pruebas y
+  desarrollo. Se arranca con `python -m app.utils.cola_mensajes URL`. La
+  contraseña de la URL (`local://:clave@host:puerto`) es la clave de
+  autenticación compartida.
+- Cualquier otra: Kombu (`amqp://`, etc., requiere el paquete `kombu`).
+
+Los client managers publican de forma síncrona. Donde el commit corre en
+el bucle de eventos (FastAPI con `FASTAPI_ASYNC_DB`) se envuelven en
+`EmisorEnHilo`, que publica desde un hilo propio.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener
+from urllib.parse import urlparse
+
+import socketio
+
+logger = logging.getLogger(__name__)
+
+_CLAVE_POR_DEFECTO = 'boodfood'
+_ROL_PUBLICADOR = b'pub'
+_ROL_SUSCRIPTOR = b'sub'
+
+
+def _direccion(url):
+    """Dirección de `multiprocessing.connection` y clave para una URL `local://`."""
+    partes = urlparse(url)
+    if partes.scheme != 'local':
+        raise ValueError(f'URL de cola local no válida: {url}')
+    if partes.hostname:
+        direccion = (partes.hostname, partes.port or 0)
+    elif partes.path:
+        direccion = partes.path
+    else:
+        raise ValueError(f'URL de cola local sin host ni ruta: {url}')
+    return direccion, (partes.password or _CLAVE_POR_DEFECTO).encode('utf-8')
+
+
+def crear_gestor(url, channel='boodfood', write_only=False):
+    """Client manager de python-socketio para la cola de `url`."""
+    esquema = urlparse(url).scheme.split('+', 1)[0].lower()
+    if esquema == 'local':
+        return GestorLocal(url, channel=channel, write_only=write_only)
+    if esquema in ('redis', 'rediss', 'valkey', 'valkeys', 'unix'):
+        return socketio.RedisManager(url, channel=channel, write_only=write_only)
+    return socketio.KombuManager(url, channel=channel, write_only=write_only)
+
+
+class EmisorEnHilo:
+    """Publica con `gestor.emit` desde un único hilo, en orden de llegada.
+
+    `emit` vuelve enseguida: la escritura en la cola no bloquea al llamador
+    (el bucle de eventos, cuando el commit es asíncrono).
+    """
+
+    def __init__(self, gestor):
+        self.gestor = gestor
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='socketio-pub')
+
+    def emit(self, *args, **kwargs):
+        self._executor.submit(self._emitir, args, kwargs)
+
+    def _emitir(self, args, kwargs):
+        try:
+            self.gestor.emit(*args, **kwargs)
+        except Exception:
+            logger.exception('No se pudo publicar en la cola de Socket.IO')
+
+    def cerrar(self):
+        """Esperar a que salgan los mensajes pendientes y parar el hilo."""
+        self._executor.shutdown(wait=True)
+
+
+class BrokerLocal:
+    """Reparte cada mensaje publicado a todos los suscriptores conectados.
+
+    Los clientes se identifican al conectar como publicador o suscriptor:
+    a los publicadores (p. ej. FastAPI) nunca se les envía nada, para que
+    su buffer de recepción no se llene.
+    """
+
+    def __init__(self, url):
+        self._direccion, self._clave = _direccion(url)
+        self._listener = None
+        self._suscriptores = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        """URL `local://` con la dirección real (útil con puerto 0)."""
+        direccion = self._listener.address
+        if isinstance(direccion, tuple):
+            return f'local://:{self._clave.decode()}@{direccion[0]}:{direccion[1]}'
+        return f'local://:{self._clave.decode()}@{direccion}'
+
+    def iniciar(self):
+        self._listener = Listener(self._direccion, authkey=self._clave)
+        threading.Thread(target=self._aceptar, name='broker-socketio', daemon=True).start()
+        return self
+
+    def cerrar(self):
+        self._listener.close()
+        with self._lock:
+            suscriptores, self._suscriptores = self._suscriptores, []
+        for conn in suscriptores:
+            conn.close()
+
+    def _aceptar(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return  # listener cerrado
+            except Exception:
+                logger.warning('Conexión rechazada por el broker de Socket.IO', exc_info=True)
+                continue
+            threading.Thread(target=self._atender, args=(conn,), daemon=True).start()
+
+    def _atender(self, conn):
+        try:
+            rol = conn.recv_bytes()
+            if rol == _ROL_SUSCRIPTOR:
+                with self._lock:
+                    self._suscriptores.append(conn)
+            while True:
+                self._difundir(conn.recv_bytes())
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._quitar(conn)
+            conn.close()
+
+    def _difundir(self, mensaje):
+        with self._lock:
+            for conn in list(self._suscriptores):
+                try:
+                    conn.send_bytes(mensaje)
+                except OSError:
+                    self._suscriptores.remove(conn)
+
+    def _quitar(self, conn):
+        with self._lock:
+            if conn in self._suscriptores:
+                self._suscriptores.remove(conn)
+
+
+class GestorLocal(socketio.PubSubManager):
+    """Client manager de Socket.IO sobre `BrokerLocal`."""
+
+    name = 'local'
+
+    def __init__(self, url='local://127.0.0.1:6380', channel='socketio', write_only=False,
+                 logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.url = url
+        self._direccion, self._clave = _direccion(url)
+        self._conexion = None
+        self._lock = threading.Lock()
+
+    def initialize(self):  # pragma: no cover
+        super().initialize()
+        # Igual que RedisManager: con eventlet/gevent el hilo de escucha
+        # bloquearía al servidor si los sockets no están parcheados
+        modo = self.server.async_mode
+        parcheado = True
+        if modo == 'eventlet':
+            from eventlet.patcher import is_monkey_patched
+            parcheado = is_monkey_patched('socket')
+        elif 'gevent' in modo:
+            from gevent.monkey import is_module_patched
+            parcheado = is_module_patched('socket')
+        if not parcheado:
+            raise RuntimeError(f'La cola local requiere sockets parcheados con {modo}')
+
+    def _conectar(self, rol):
+        conn = Client(self._direccion, authkey=self._clave)
+        conn.send_bytes(rol)
+        return conn
+
+    def _mensaje(self, data):
+        return self.json.dumps({'channel': self.channel, 'data': data}).encode('utf-8')
+
+    def _publish(self, data):
+        mensaje = self._mensaje(data)
+        with self._lock:
+            for intento in range(2):
+                try:
+                    if self._conexion is None:
+                        self._conexion = self._conectar(_ROL_PUBLICADOR)
+                    self._conexion.send_bytes(mensaje)
+                    return
+                except (EOFError, OSError):
+                    self._conexion = None
+                    if intento:
+                        self._get_logger().error('No se pudo publicar en la cola local de Socket.IO')
+
+    def _listen(self):
+        espera = 1
+        while True:
+            try:
+                conn = self._conectar(_ROL_SUSCRIPTOR)
+                espera = 1
+                while True:
+                    mensaje = self.json.loads(conn.recv_bytes().decode('utf-8'))
+                    if mensaje.get('channel') == self.channel:
+                        yield mensaje['data']
+            except (EOFError, OSError):
+                self._get_logger().error('Sin conexión con la cola local de Socket.IO, reintento en %s s', espera)
+                time.sleep(espera)
+                espera = min(espera * 2, 60)
+
+
+if __name__ == '__main__':
+    import sys
+
+    broker = BrokerLocal(sys.argv[1] if len(sys.argv) > 1 else 'local://127.0.0.1:6380').iniciar()
+    print(f'Broker de Socket.IO escuchando en {broker._listener.address}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        broker.cerrar()
@@ -0,0 +1,240 @@
+"""
+Índice en memoria de disponibilidad de mesas para reservas.
+
+`/api/reservas/disponibilidad` cargaba todas las reservas de la fecha en
+cada llamada y las cruzaba con todas las mesas en una lista de Python, sin
+mirar la hora ni la duración. El widget de reservas la llama en cada cambio
+de fecha u hora, así que el índice se construye una vez por fecha:
+
+- Para cada mesa (`mesa_asignada`, que guarda el número de mesa o varios
+  separados por comas) se guarda la lista ordenada de intervalos reservados
+  `[inicio, fin)` en minutos desde medianoche; saber si una mesa está libre
+  a una hora es un `bisect`.
+- Los intervalos son los mismos que bloquea `franjas_reserva`: desde la
+  hora hasta `duracion_estimada` horas después (o `RESERVA_DURACION_HORAS`),
+  redondeados a franjas de `RESERVA_FRANJA_MINUTOS`. El índice de una
+  fecha incluye la parte de las reservas de la víspera que pasa de
+  medianoche, y una consulta que pasa de medianoche mira también el día
+  siguiente.
+- Sólo cuentan las reservas `pendiente` y `confirmada`.
+- Las fechas afectadas por un commit de `Reserva` se invalidan mediante
+  eventos de sesión (Flask y FastAPI); cada `RESERVAS_DISPONIBILIDAD_TTL`
+  segundos una fecha se reconstruye igualmente, por los cambios de otros
+  procesos.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import timedelta
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from ..models import Reserva
+from .franjas_reserva import ESTADOS_ACTIVOS, cruza_medianoche, franjas, mesas_asignadas, tamano_franja
+
+_MINUTOS_DIA = 24 * 60
+
+_FECHAS_KEY = '_disponibilidad_reservas_fechas'
+_TODAS = object()
+
+
+def _config(nombre, por_defecto):
+    try:
+        from config.config import Config
+        return getattr(Config, nombre, por_defecto)
+    except ImportError:
+        return por_defecto
+
+
+def _intervalo(hora, horas=None):
+    """`[inicio, fin)` en minutos, redondeado a franjas completas."""
+    rango, tamano = franjas(hora, horas), tamano_franja()
+    return rango.start * tamano, rango.stop * tamano
+
+
+class _IndiceFecha:
+    """Franjas reservadas de una fecha, por mesa.
+
+    `inicios[mesa]` está ordenada y `fines[mesa][i]` es el mayor fin entre
+    las franjas `0..i`, de modo que las franjas solapadas (reservas dobles
+    antiguas) también se detectan.
+    """
+
+    __slots__ = ('inicios', 'fines', 'creado_en')
+
+    def __init__(self, franjas):
+        self.inicios = {}
+        self.fines = {}
+        for mesa, lista in franjas.items():
+            lista.sort()
+            fin_max, fines = 0, []
+            for _, fin in lista:
+                fin_max = max(fin_max, fin)
+                fines.append(fin_max)
+            self.inicios[mesa] = [inicio for inicio, _ in lista]
+            self.fines[mesa] = fines
+        self.creado_en = time.monotonic()
+
+    def ocupada(self, mesa, inicio, fin):
+        """¿Alguna franja de `mesa` se solapa con `[inicio, fin)`?"""
+        inicios = self.inicios.get(mesa)
+        if not inicios:
+            return False
+        # Franjas que empiezan antes de `fin`: basta con que alguna acabe después de `inicio`
+        i = bisect_left(inicios, fin) - 1
+        return i >= 0 and self.fines[mesa][i] > inicio
+
+
+class DisponibilidadReservas:
+    """Índice `fecha -> mesa -> franjas reservadas` con invalidación por commit."""
+
+    def __init__(self, ttl=None, max_fechas=64):
+        self.ttl = ttl if ttl is not None else _config('RESERVAS_DISPONIBILIDAD_TTL', 30)
+        self.max_fechas = max_fechas
+        self._lock = threading.Lock()
+        self._fechas = OrderedDict()
+        self._generacion = 0
+        self.construcciones = 0
+
+    def _construir(self, session, fecha):
+        vispera = fecha - timedelta(days=1)
+        filas = session.execute(
+            select(Reserva.fecha, Reserva.mesa_asignada, Reserva.hora, Reserva.duracion_estimada).where(
+                Reserva.fecha.between(vispera, fecha),
+                Reserva.estado.in_(ESTADOS_ACTIVOS),
+                Reserva.mesa_asignada.isnot(None)
+            )
+        )
+        por_mesa = {}
+        for dia, valor, hora, horas in filas:
+            if hora is None:
+                continue
+            inicio, fin = _intervalo(hora, horas)
+            if dia == vispera:
+                # Sólo lo que pasa de medianoche, en minutos de `fecha`
+                if fin <= _MINUTOS_DIA:
+                    continue
+                inicio, fin = max(inicio - _MINUTOS_DIA, 0), fin - _MINUTOS_DIA
+            for mesa in mesas_asignadas(valor):
+                por_mesa.setdefault(mesa, []).append((inicio, fin))
+        return _IndiceFecha(por_mesa)
+
+    def indice(self, session, fecha):
+        """`_IndiceFecha` de `fecha`, construyéndolo si no está o caducó."""
+        with self._lock:
+            indice = self._fechas.get(fecha)
+            if indice is not None and time.monotonic() - indice.creado_en <= self.ttl:
+                self._fechas.move_to_end(fecha)
+                return indice
+            generacion = self._generacion
+        indice = self._construir(session, fecha)
+        with self._lock:
+            self.construcciones += 1
+            if generacion != self._generacion:
+                # Hubo un commit mientras se leía: no guardar un índice quizá viejo
+                return indice
+            self._fechas[fecha] = indice
+            self._fechas.move_to_end(fecha)
+            while len(self._fechas) > self.max_fechas:
+                self._fechas.popitem(last=False)
+        return indice
+
+    def invalidar(self, fechas=None):
+        """Olvidar `fechas` (o todas) para reconstruirlas en la próxima lectura."""
+        with self._lock:
+            self._generacion += 1
+            if fechas is None:
+                self._fechas.clear()
+            else:
+                for fecha in fechas:
+                    self._fechas.pop(fecha, None)
+
+    def mesas_reservadas(self, session, fecha, hora=None, duracion=None):
+        """Valores de `mesa_asignada` con reserva en `fecha`.
+
+        Con `hora` sólo los que se solapan con `[hora, hora + duracion)`
+        (`duracion` en horas, `RESERVA_DURACION_HORAS` por defecto).
+        """
+        indice = self.indice(session, fecha)
+        if hora is None:
+            return set(indice.inicios)
+        inicio, fin = _intervalo(hora, duracion)
+        reservadas = {mesa for mesa in indice.inicios if indice.ocupada(mesa, inicio, fin)}
+        if fin > _MINUTOS_DIA:
+            siguiente = self.indice(session, fecha + timedelta(days=1))
+            reservadas |= {mesa for mesa in siguiente.inicios if siguiente.ocupada(mesa, 0, fin - _MINUTOS_DIA)}
+        return reservadas
+
+    def mesa_libre(self, session, fecha, mesa, hora, duracion=None):
+        inicio, fin = _intervalo(hora, duracion)
+        if self.indice(session, fecha).ocupada(str(mesa), inicio, fin):
+            return False
+        return fin <= _MINUTOS_DIA or not self.indice(session, fecha + timedelta(days=1)).ocupada(
+            str(mesa), 0, fin - _MINUTOS_DIA)
+
+
+disponibilidad_reservas = DisponibilidadReservas()
+
+
+# ----- Invalidación vía eventos de sesión -----
+
+def _fechas_afectadas(obj):
+    """Fecha actual y anterior de una reserva modificada en el flush."""
+    historia = inspect(obj).attrs.fecha.history
+    if not historia.deleted and not historia.unchanged:
+        # Atributo expirado (sin cargar o cambiado sin conocer el valor
+        # anterior): no se sabe qué fecha tenía
+        return _TODAS
+    return {*historia.added, *historia.deleted, *historia.unchanged}
+
+
+def _valores(estado_attr, nombre, nuevo):
+    """Valores actual y anterior de un atributo, o `None` si no se conoce el anterior."""
+    historia = estado_attr.attrs[nombre].history
+    if historia.added and not (historia.deleted or historia.unchanged) and not nuevo:
+        return None
+    return {*historia.added, *historia.deleted, *historia.unchanged} or {getattr(estado_attr.obj(), nombre)}
+
+
+def _cruzaba_medianoche(obj, nuevo):
+    """¿La reserva ocupa (u ocupaba antes del flush) franjas del día siguiente?"""
+    estado_attr = inspect(obj)
+    horas = _valores(estado_attr, 'hora', nuevo)
+    duraciones = _valores(estado_attr, 'duracion_estimada', nuevo)
+    if horas is None or duraciones is None:
+        return True
+    return any(hora is not None and cruza_medianoche(hora, duracion) for hora in horas for duracion in duraciones)
+
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_fechas_reservas(session, flush_context):
+    cambiadas = [obj for obj in (*session.new, *session.dirty, *session.deleted) if isinstance(obj, Reserva)]
+    if not cambiadas:
+        return
+    fechas = session.info.setdefault(_FECHAS_KEY, set())
+    for obj in cambiadas:
+        nuevo = obj in session.new
+        afectadas = {obj.fecha} if nuevo else _fechas_afectadas(obj)
+        if afectadas is _TODAS:
+            fechas.add(_TODAS)
+            continue
+        afectadas.discard(None)
+        fechas.update(afectadas)
+        if _cruzaba_medianoche(obj, nuevo):
+            # Su parte tras la medianoche está en el índice del día siguiente
+            fechas.update(fecha + timedelta(days=1) for fecha in afectadas)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_fechas_reservas(session):
+    fechas = session.info.pop(_FECHAS_KEY, None)
+    if not fechas:
+        return
+    disponibilidad_reservas.invalidar(None if _TODAS in fechas else fechas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_fechas_reservas(session):
+    session.info.pop(_FECHAS_KEY, None)
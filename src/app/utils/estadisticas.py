@@ -0,0 +1,202 @@
+"""
+Estadísticas del dashboard de administración calculadas en SQL.
+
+En lugar de cargar todos los pedidos del día/mes como objetos ORM y sumar
+en Python, cada bloque del dashboard es una consulta agregada
+(`COUNT/SUM ... GROUP BY`). Los totales por día y por estado salen del
+rollup `ventas_diarias` para los días cerrados. El resultado tiene
+exactamente la misma forma JSON que devolvía `admin.dashboard_stats`.
+
+`estadisticas_dashboard` comparte el cálculo entre pestañas y peticiones
+(ver `EstadisticasDashboard`).
+"""
+import threading
+import time as reloj
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select
+
+from ..models import Pedido, PedidoItem, MenuItem, Reserva, Mesa, Usuario, Inventario
+from . import eventos, ventas_diarias
+from .fechas import hoy_local, inicio_utc
+from .ocupacion_mesas import ocupacion_mesas
+
+
+def _clave_dia(valor):
+    """`DATE()` devuelve `date` en MySQL y texto en SQLite: normalizar a 'YYYY-MM-DD'."""
+    if isinstance(valor, (date, datetime)):
+        return valor.strftime('%Y-%m-%d')
+    return str(valor)[:10]
+
+
+def ventas_por_dia(session, desde, hasta, hoy=None):
+    """`{'YYYY-MM-DD': (pedidos, ventas)}` para los días en [desde, hasta)."""
+    filas = ventas_diarias.agregar(session, desde, hasta, ('fecha',), hoy=hoy)
+    return {_clave_dia(dia): valores for (dia,), valores in filas.items()}
+
+
+def pedidos_por_estado(session, desde, hasta, hoy=None):
+    filas = ventas_diarias.agregar(session, desde, hasta, ('estado',), hoy=hoy)
+    return {estado: cantidad for (estado,), (cantidad, _) in filas.items()}
+
+
+def top_productos(session, desde, limite=5):
+    total_vendido = func.sum(PedidoItem.cantidad)
+    filas = session.query(
+        MenuItem.nombre,
+        total_vendido
+    ).join(
+        Pedido, Pedido.id == PedidoItem.pedido_id
+    ).join(
+        MenuItem, MenuItem.id == PedidoItem.menu_item_id
+    ).filter(
+        Pedido.fecha_pedido >= inicio_utc(desde)
+    ).group_by(
+        PedidoItem.menu_item_id, MenuItem.nombre
+    ).order_by(total_vendido.desc()).limit(limite).all()
+    return [{'nombre': nombre, 'cantidad': int(cantidad)} for nombre, cantidad in filas]
+
+
+def contadores_generales(session, hoy):
+    """Todos los conteos sueltos del dashboard en una sola sentencia."""
+    def contar(modelo, *condiciones):
+        return select(func.count()).select_from(modelo).where(*condiciones).scalar_subquery()
+
+    fila = session.execute(select(
+        contar(Reserva, Reserva.fecha == hoy).label('reservas_hoy'),
+        contar(Mesa, Mesa.disponible == True).label('total_mesas'),  # noqa: E712
+        contar(Pedido, Pedido.estado == 'pendiente').label('pedidos_pendientes'),
+        contar(Usuario).label('total_usuarios'),
+        contar(Inventario, Inventario.cantidad <= Inventario.stock_minimo).label('inventario_bajo'),
+    )).one()
+    return {clave: int(valor or 0) for clave, valor in fila._mapping.items()}
+
+
+def calcular_dashboard_stats(session, hoy=None):
+    """Estadísticas completas para el dashboard de administración."""
+    hoy = hoy or hoy_local()
+    manana = hoy + timedelta(days=1)
+    inicio_mes = date(hoy.year, hoy.month, 1)
+    hace_30_dias = hoy - timedelta(days=30)
+    ultimos_7 = [hoy - timedelta(days=i) for i in range(7)]
+
+    # Un solo GROUP BY por día cubre hoy, el mes y la serie de 7 días
+    por_dia = ventas_por_dia(session, min(inicio_mes, ultimos_7[-1]), manana, hoy=hoy)
+
+    pedidos_hoy, ventas_hoy = por_dia.get(_clave_dia(hoy), (0, 0.0))
+    pedidos_mes = sum(c for d, (c, _) in por_dia.items() if d >= _clave_dia(inicio_mes))
+    ventas_mes = sum(v for d, (_, v) in por_dia.items() if d >= _clave_dia(inicio_mes))
+
+    contadores = contadores_generales(session, hoy)
+
+    return {
+        'pedidos_hoy': pedidos_hoy,
+        'reservas_hoy': contadores['reservas_hoy'],
+        'ventas_hoy': ventas_hoy,
+        'mesas_ocupadas': len(ocupacion_mesas.mesas_ocupadas(session)),
+        'total_mesas': contadores['total_mesas'],
+        'pedidos_pendientes': contadores['pedidos_pendientes'],
+        'total_usuarios': contadores['total_usuarios'],
+        'inventario_bajo': contadores['inventario_bajo'],
+        'ventas_mes': ventas_mes,
+        'pedidos_mes': pedidos_mes,
+        'estados_pedidos': pedidos_por_estado(session, hace_30_dias, manana, hoy=hoy),
+        'ventas_por_dia': {
+            _clave_dia(dia): por_dia.get(_clave_dia(dia), (0, 0.0))[1] for dia in ultimos_7
+        },
+        'top_productos': top_productos(session, hace_30_dias),
+    }
+
+
+def _config(nombre, por_defecto):
+    try:
+        from config.config import Config
+        return getattr(Config, nombre, por_defecto)
+    except ImportError:
+        return por_defecto
+
+
+class _Calculo:
+    """Cálculo en curso, al que esperan las peticiones concurrentes."""
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class EstadisticasDashboard:
+    """Estadísticas del dashboard calculadas una vez para todas las pestañas.
+
+    - Single-flight: si llegan varias peticiones mientras se calcula, sólo
+      una ejecuta `calcular_dashboard_stats`; las demás esperan su resultado.
+    - El resultado se reutiliza hasta que un commit de pedidos, reservas o
+      mesas lo marca como obsoleto (bus `eventos`). Aun así no se recalcula
+      más de una vez cada `DASHBOARD_STATS_MIN` segundos, para que una
+      ráfaga de pedidos no dispare un cálculo por cada sondeo.
+    - A los `DASHBOARD_STATS_TTL` segundos se recalcula de todos modos:
+      recoge cambios de otros procesos y de usuarios o inventario.
+    """
+
+    def __init__(self, ttl=None, minimo=None):
+        self.ttl = ttl if ttl is not None else _config('DASHBOARD_STATS_TTL', 60)
+        self.minimo = minimo if minimo is not None else _config('DASHBOARD_STATS_MIN', 2)
+        self._lock = threading.Lock()
+        self._dia = None
+        self._resultado = None
+        self._calculado_en = None
+        self._obsoleto = False
+        self._en_curso = None
+        self.calculos = 0
+
+    def marcar(self, evento=None):
+        """Marcar el resultado como obsoleto (suscriptor del bus de eventos)."""
+        self._obsoleto = True
+
+    def invalidar(self):
+        with self._lock:
+            self._dia = self._resultado = self._calculado_en = None
+
+    def _vigente(self, hoy, ahora):
+        if self._resultado is None or self._dia != hoy:
+            return False
+        edad = ahora - self._calculado_en
+        return edad < self.ttl and (not self._obsoleto or edad < self.minimo)
+
+    def obtener(self, session, hoy=None):
+        """Estadísticas de `hoy`, de la caché o de un cálculo compartido."""
+        hoy = hoy or hoy_local()
+        with self._lock:
+            if self._vigente(hoy, reloj.monotonic()):
+                return self._resultado
+            calculo = self._en_curso
+            propio = calculo is None
+            if propio:
+                calculo = self._en_curso = _Calculo()
+                # Los cambios que lleguen durante el cálculo vuelven a marcarlo
+                self._obsoleto = False
+
+        if not propio:
+            calculo.listo.wait()
+            if calculo.error is not None:
+                raise calculo.error
+            return calculo.resultado
+
+        try:
+            calculo.resultado = calcular_dashboard_stats(session, hoy=hoy)
+        except Exception as e:
+            calculo.error = e
+            raise
+        else:
+            with self._lock:
+                self._dia, self._resultado, self._calculado_en = hoy, calculo.resultado, reloj.monotonic()
+                self.calculos += 1
+            return calculo.resultado
+        finally:
+            with self._lock:
+                self._en_curso = None
+            calculo.listo.set()
+
+
+estadisticas_dashboard = EstadisticasDashboard()
+eventos.suscribir(estadisticas_dashboard.marcar)
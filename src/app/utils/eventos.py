@@ -0,0 +1,143 @@
+"""
+Bus de eventos de dominio (pedidos, reservas y mesas).
+
+Toda mutación de `Pedido`, `Reserva` o `Mesa` confirmada en base de datos
+publica un evento compacto, sin importar qué ruta la hizo (Flask, FastAPI,
+scripts): se detecta con eventos de sesión de SQLAlchemy, igual que el
+índice de ocupación de mesas.
+
+- En `after_flush` se arma el evento de cada objeto nuevo, modificado o
+  borrado; si un mismo objeto cambia en varios flush de la transacción se
+  combina en un solo evento.
+- En `after_commit` los eventos se entregan a los suscriptores (`suscribir`)
+  en orden; con rollback se descartan.
+
+Los suscriptores reciben un dict con `entidad`, `accion` (`creado`,
+`actualizado` o `eliminado`), `id`, los campos que identifican a dónde
+enviarlo y `cambios` (atributos modificados). Un suscriptor que falla se
+registra en el log y no afecta a los demás ni a la petición.
+"""
+import logging
+import threading
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..models import Mesa, Pedido, Reserva
+
+logger = logging.getLogger(__name__)
+
+_EVENTOS_KEY = '_eventos_dominio'
+
+_lock = threading.Lock()
+_suscriptores = []
+
+
+def suscribir(fn):
+    """Registrar `fn(evento)` (una sola vez) y devolverla."""
+    with _lock:
+        if fn not in _suscriptores:
+            _suscriptores.append(fn)
+    return fn
+
+
+def desuscribir(fn):
+    with _lock:
+        if fn in _suscriptores:
+            _suscriptores.remove(fn)
+
+
+def publicar(evento):
+    """Entregar `evento` a todos los suscriptores."""
+    with _lock:
+        suscriptores = list(_suscriptores)
+    for fn in suscriptores:
+        try:
+            fn(evento)
+        except Exception:
+            logger.exception('Error al despachar el evento %s', evento.get('entidad'))
+
+
+# ----- Construcción de eventos -----
+
+def _fecha(valor):
+    return valor.isoformat() if valor is not None else None
+
+
+def _datos_pedido(pedido):
+    return {
+        'codigo_pedido': pedido.codigo_pedido,
+        'estado': pedido.estado,
+        'tipo_servicio': pedido.tipo_servicio,
+        'mesa_id': pedido.mesa_id,
+        'usuario_id': pedido.usuario_id,
+    }
+
+
+def _datos_reserva(reserva):
+    return {
+        'codigo_reserva': reserva.codigo_reserva,
+        'estado': reserva.estado,
+        'fecha': _fecha(reserva.fecha),
+        'hora': _fecha(reserva.hora),
+        'numero_personas': reserva.numero_personas,
+        'usuario_id': reserva.usuario_id,
+    }
+
+
+def _datos_mesa(mesa):
+    return {
+        'numero': mesa.numero,
+        'disponible': mesa.disponible,
+    }
+
+
+ENTIDADES = {
+    Pedido: ('pedido', _datos_pedido),
+    Reserva: ('reserva', _datos_reserva),
+    Mesa: ('mesa', _datos_mesa),
+}
+
+
+def _cambios(obj):
+    estado = inspect(obj)
+    return sorted(attr.key for attr in estado.mapper.column_attrs if estado.attrs[attr.key].history.has_changes())
+
+
+def _registrar(pendientes, obj, accion):
+    entidad, datos = ENTIDADES[type(obj)]
+    cambios = _cambios(obj) if accion == 'actualizado' else []
+    if accion == 'actualizado' and not cambios:
+        return
+    clave = (entidad, obj.id)
+    previo = pendientes.get(clave)
+    evento = {'entidad': entidad, 'accion': accion, 'id': obj.id, **datos(obj), 'cambios': cambios}
+    if previo is not None:
+        if previo['accion'] == 'creado' and accion == 'actualizado':
+            evento['accion'] = 'creado'
+        evento['cambios'] = sorted(set(previo['cambios']) | set(cambios))
+    pendientes[clave] = evento
+
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_eventos(session, flush_context):
+    pendientes = None
+    for coleccion, accion in ((session.new, 'creado'), (session.dirty, 'actualizado'), (session.deleted, 'eliminado')):
+        for obj in coleccion:
+            if type(obj) in ENTIDADES:
+                if pendientes is None:
+                    pendientes = session.info.setdefault(_EVENTOS_KEY, {})
+                _registrar(pendientes, obj, accion)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publicar_tras_commit(session):
+    pendientes = session.info.pop(_EVENTOS_KEY, None)
+    if pendientes:
+        for evento in pendientes.values():
+            publicar(evento)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_eventos(session):
+    session.info.pop(_EVENTOS_KEY, None)
@@ -0,0 +1,80 @@
+"""
+Días de negocio locales como rangos UTC para filtrar columnas de fecha.
+
+Las columnas `DateTime` (`fecha_pedido`, `created_at`...) guardan UTC sin
+zona (`datetime.utcnow`), pero "hoy" para el restaurante es el día local
+de `Config.TIMEZONE`. Filtrar con `DATE(fecha_pedido) = hoy` compara el día
+UTC (los pedidos de la noche caen en el día siguiente) y, al envolver la
+columna en una función, impide usar su índice.
+
+Estas funciones traducen días locales a rangos semiabiertos
+`[inicio, fin)` en UTC sin zona, para comparar la columna tal cual:
+
+    inicio, fin = rango_utc(hoy_local())
+    Pedido.query.filter(Pedido.fecha_pedido >= inicio, Pedido.fecha_pedido < fin)
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+_zonas = {}
+
+
+def _config(nombre, por_defecto):
+    try:
+        from config.config import Config
+        return getattr(Config, nombre, por_defecto)
+    except ImportError:
+        return por_defecto
+
+
+def zona_local():
+    """Zona horaria del negocio (`TIMEZONE`, UTC si no se reconoce)."""
+    nombre = _config('TIMEZONE', 'UTC')
+    zona = _zonas.get(nombre)
+    if zona is None:
+        try:
+            zona = ZoneInfo(nombre)
+        except (ZoneInfoNotFoundError, ValueError):
+            zona = timezone.utc
+        _zonas[nombre] = zona
+    return zona
+
+
+def ahora_utc():
+    """Instante actual en UTC sin zona, como lo guardan los modelos."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def hoy_local():
+    """Día de negocio en curso."""
+    return datetime.now(zona_local()).date()
+
+
+def inicio_utc(dia):
+    """Medianoche local de `dia` como `datetime` UTC sin zona."""
+    local = datetime.combine(dia, time.min, tzinfo=zona_local())
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def rango_utc(desde, hasta=None):
+    """`(inicio, fin)` UTC de los días locales en [desde, hasta).
+
+    Sin `hasta` es sólo el día `desde`.
+    """
+    if hasta is None:
+        hasta = desde + timedelta(days=1)
+    return inicio_utc(desde), inicio_utc(hasta)
+
+
+def dia_local(valor):
+    """Día local de un `datetime` UTC sin zona (o de una fecha ya local)."""
+    if isinstance(valor, datetime):
+        if valor.tzinfo is None:
+            valor = valor.replace(tzinfo=timezone.utc)
+        return valor.astimezone(zona_local()).date()
+    if isinstance(valor, date):
+        return valor
+    texto = str(valor)
+    if len(texto) <= 10:
+        return date.fromisoformat(texto)
+    return dia_local(datetime.fromisoformat(texto))
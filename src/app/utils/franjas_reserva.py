@@ -0,0 +1,176 @@
+"""
+Bloqueo de franjas de mesa para reservas (`reserva_franjas`).
+
+Comprobar si la mesa está libre y luego insertar la reserva deja una
+ventana en la que dos reservas simultáneas pasan la comprobación. Aquí la
+comprobación es la propia inserción: cada reserva activa con mesa ocupa
+sus franjas `(mesa, fecha, franja)`, que son la clave primaria de la tabla,
+y la segunda reserva choca con esa clave en la base de datos.
+
+- Al confirmar un flush con reservas nuevas o con cambios de mesa, fecha,
+  hora, duración o estado, sus franjas se liberan y se vuelven a ocupar en
+  la misma transacción, con un único `INSERT` para todas las franjas.
+- Si alguna franja ya está ocupada se lanza `MesaOcupada` desde el flush
+  (o el commit); las rutas la convierten en un 409 y hacen rollback.
+- `mesa_asignada` puede tener varias mesas separadas por comas (eventos),
+  y se bloquean todas a la vez.
+
+Las franjas son de `RESERVA_FRANJA_MINUTOS` y cubren desde la hora de la
+reserva hasta su fin (`duracion_estimada` horas o `RESERVA_DURACION_HORAS`).
+Las que pasan de medianoche se ocupan en el día siguiente: una reserva a
+las 23:00 choca con otra de la misma mesa a las 00:00 del día después.
+"""
+from datetime import timedelta
+
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import Reserva, ReservaFranja
+
+# Estados en los que una reserva ocupa su mesa
+ESTADOS_ACTIVOS = ('pendiente', 'confirmada')
+# Cambios que obligan a recalcular las franjas
+_ATRIBUTOS = ('mesa_asignada', 'fecha', 'hora', 'duracion_estimada', 'estado')
+
+_tabla = ReservaFranja.__table__
+
+
+class MesaOcupada(Exception):
+    """Alguna franja pedida ya pertenece a otra reserva (responder 409)."""
+
+    def __init__(self, mesas, fecha):
+        self.mesas = mesas
+        self.fecha = fecha
+        nombres = ', '.join(mesas)
+        super().__init__(f'La mesa {nombres} ya está reservada el {fecha.strftime("%d/%m/%Y")} a esa hora')
+
+
+def _config(nombre, por_defecto):
+    try:
+        from config.config import Config
+        return getattr(Config, nombre, por_defecto)
+    except ImportError:
+        return por_defecto
+
+
+def mesas_asignadas(valor):
+    """Mesas de un `mesa_asignada` (`"4"` o `"4, 5"`)."""
+    if not valor:
+        return []
+    return list(dict.fromkeys(mesa.strip() for mesa in str(valor).split(',') if mesa.strip()))
+
+
+def tamano_franja():
+    return int(_config('RESERVA_FRANJA_MINUTOS', 30))
+
+
+def franjas_por_dia():
+    return 24 * 60 // tamano_franja()
+
+
+def franjas(hora, horas=None):
+    """Franjas que ocupa una reserva a `hora` durante `horas`, contadas
+    desde la medianoche de su fecha (pueden pasar de `franjas_por_dia()`)."""
+    tamano = tamano_franja()
+    inicio = hora.hour * 60 + hora.minute
+    fin = inicio + int((horas or _config('RESERVA_DURACION_HORAS', 2)) * 60)
+    return range(inicio // tamano, -(-fin // tamano))
+
+
+def cruza_medianoche(hora, horas=None):
+    """¿La reserva ocupa franjas del día siguiente?"""
+    return franjas(hora, horas).stop > franjas_por_dia()
+
+
+def filas_reserva(reserva):
+    """Filas de `reserva_franjas` de una reserva (vacío si no ocupa mesa)."""
+    if reserva.estado not in ESTADOS_ACTIVOS or reserva.fecha is None or reserva.hora is None:
+        return []
+    por_dia = franjas_por_dia()
+    filas = []
+    for franja in franjas(reserva.hora, reserva.duracion_estimada):
+        dias, franja = divmod(franja, por_dia)
+        fecha = reserva.fecha + timedelta(days=dias)
+        filas.extend(
+            {'mesa': mesa, 'fecha': fecha, 'franja': franja, 'reserva_id': reserva.id}
+            for mesa in mesas_asignadas(reserva.mesa_asignada)
+        )
+    return filas
+
+
+def ocupar(conexion, filas):
+    """Insertar todas las `filas` en una sola sentencia, o `MesaOcupada`."""
+    if not filas:
+        return
+    # Mismo orden de clave en todas las transacciones: dos reservas que se
+    # solapan chocan en la primera franja común (IntegrityError) en lugar
+    # de bloquearse mutuamente (deadlock de InnoDB, OperationalError)
+    filas = sorted(filas, key=lambda fila: (fila['mesa'], fila['fecha'], fila['franja']))
+    try:
+        conexion.execute(insert(_tabla).values(filas))
+    except IntegrityError as e:
+        mesas = sorted({fila['mesa'] for fila in filas})
+        raise MesaOcupada(mesas, filas[0]['fecha']) from e
+
+
+def liberar(conexion, reserva_ids):
+    if reserva_ids:
+        conexion.execute(delete(_tabla).where(_tabla.c.reserva_id.in_(reserva_ids)))
+
+
+@event.listens_for(Session, 'after_flush')
+def _sincronizar_franjas(session, flush_context):
+    por_ocupar, por_liberar = [], []
+    for obj in session.new:
+        if isinstance(obj, Reserva):
+            por_ocupar.append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Reserva):
+            estado_attr = inspect(obj)
+            if any(estado_attr.attrs[nombre].history.has_changes() for nombre in _ATRIBUTOS):
+                por_liberar.append(obj.id)
+                por_ocupar.append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Reserva):
+            por_liberar.append(inspect(obj).identity[0])
+
+    if not (por_ocupar or por_liberar):
+        return
+    conexion = session.connection()
+    liberar(conexion, por_liberar)
+    ocupar(conexion, [fila for obj in por_ocupar for fila in filas_reserva(obj)])
+
+
+# ----- Reconstrucción -----
+
+def reconstruir(session, desde=None):
+    """Volver a ocupar las franjas de las reservas activas desde `desde`.
+
+    Las reservas antiguas que se solapan entre sí no se pueden bloquear
+    todas: se conserva la primera (por id) y se devuelven los ids de las
+    demás para revisarlas. No hace commit. Devuelve `(filas, conflictos)`.
+    """
+    borrar = delete(_tabla)
+    consulta = select(Reserva).where(
+        Reserva.estado.in_(ESTADOS_ACTIVOS), Reserva.mesa_asignada.isnot(None)
+    ).order_by(Reserva.id)
+    if desde is not None:
+        borrar = borrar.where(_tabla.c.fecha >= desde)
+        # También las de la víspera que pasan de medianoche
+        consulta = consulta.where(Reserva.fecha >= desde - timedelta(days=1))
+    conexion = session.connection()
+    conexion.execute(borrar)
+
+    ocupadas, filas, conflictos = set(), [], []
+    for reserva in session.scalars(consulta):
+        propias = [fila for fila in filas_reserva(reserva) if desde is None or fila['fecha'] >= desde]
+        claves = {(fila['mesa'], fila['fecha'], fila['franja']) for fila in propias}
+        if claves & ocupadas:
+            conflictos.append(reserva.id)
+            continue
+        ocupadas |= claves
+        filas.extend(propias)
+    for i in range(0, len(filas), 1000):
+        conexion.execute(insert(_tabla), filas[i:i + 1000])
+    return len(filas), conflictos
@@ -0,0 +1,26 @@
+"""
+Valores previos de atributos del ORM dentro de un flush.
+
+Los índices y rollups que se mantienen con eventos de sesión
+(`ocupacion_mesas`, `ventas_diarias`) necesitan el valor que tenía un
+atributo antes del flush para deshacer su aportación anterior.
+"""
+
+# Valor previo que no se puede saber (atributo expirado al modificarlo)
+DESCONOCIDO = object()
+
+
+def valor_anterior(estado_attr, nombre):
+    """Valor de `nombre` antes del flush en curso, o `DESCONOCIDO`.
+
+    `estado_attr` es el `InstanceState` del objeto (`inspect(obj)`).
+    """
+    historia = estado_attr.attrs[nombre].history
+    if historia.deleted:
+        return historia.deleted[0]
+    if historia.unchanged:
+        return historia.unchanged[0]
+    if historia.added:
+        # El atributo estaba expirado al modificarlo: no se conoce el valor previo
+        return DESCONOCIDO
+    return getattr(estado_attr.obj(), nombre)
@@ -0,0 +1,29 @@
+"""
+Respuestas Flask a partir de JSON ya codificado (`menu_cache.json`).
+
+Envía el cuerpo tal cual con su ETag fuerte y contesta 304 sin cuerpo cuando
+el cliente ya tiene esa versión (`If-None-Match`).
+"""
+from flask import Response, current_app, request
+
+from .menu_cache import menu_cache
+
+
+def respuesta_json(entrada):
+    """`Response` para un `JSONCacheado`, o 304 si el ETag coincide."""
+    if request.if_none_match.contains_weak(entrada.etag):
+        respuesta = Response(status=304)
+    else:
+        respuesta = Response(entrada.cuerpo, mimetype='application/json')
+    respuesta.set_etag(entrada.etag)
+    # Permitir guardar la respuesta, pero revalidar siempre con el ETag
+    respuesta.headers['Cache-Control'] = 'no-cache'
+    return respuesta
+
+
+def json_cacheado(clave, construir):
+    """Servir `construir()` como JSON desde la caché del catálogo.
+
+    Se codifica con el proveedor JSON de la app, igual que `jsonify`.
+    """
+    return respuesta_json(menu_cache.json(clave, construir, current_app.json.dumps))
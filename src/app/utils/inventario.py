@@ -0,0 +1,71 @@
+"""
+Movimientos de stock atómicos sobre `inventario`.
+
+Descontar con `item.cantidad -= n` en Python (leer, restar, escribir) pierde
+actualizaciones cuando dos pedidos usan el mismo ingrediente a la vez, y
+puede dejar stock negativo: ambos leen el mismo valor y el segundo commit
+pisa al primero.
+
+Aquí cada salida es un único UPDATE condicional que hace la resta en la
+base de datos:
+
+    UPDATE inventario SET cantidad = cantidad - :n
+    WHERE id = :id AND cantidad >= :n
+
+Si la fila no cumple la condición no se toca (rowcount 0) y el ingrediente
+se informa como faltante. No hace falta `SELECT ... FOR UPDATE`: el bloqueo
+de fila lo toma el propio UPDATE y dura sólo hasta el commit, así que los
+pedidos que no comparten ingredientes no se esperan entre sí. Los UPDATE se
+emiten en orden de id para que dos pedidos concurrentes bloqueen las filas
+en el mismo orden y no se produzcan deadlocks.
+
+Tras el UPDATE, el atributo `cantidad` de las instancias cargadas en la
+sesión se expira para que la siguiente lectura traiga el valor real.
+"""
+from decimal import Decimal
+
+from sqlalchemy import update
+
+from ..models import Inventario
+
+_tabla = Inventario.__table__
+
+
+def _expirar(session, inventario_id):
+    instancia = session.identity_map.get(session.identity_key(Inventario, inventario_id))
+    if instancia is not None:
+        session.expire(instancia, ['cantidad'])
+
+
+def descontar(session, cantidades):
+    """Descontar `{inventario_id: cantidad}` de forma atómica.
+
+    Devuelve la lista de ids sin stock suficiente (vacía si todo se aplicó).
+    Los descuentos que sí se aplicaron quedan en la transacción: si hay
+    faltantes, quien llama debe hacer rollback.
+    """
+    faltantes = []
+    for inventario_id in sorted(cantidades):
+        cantidad = Decimal(cantidades[inventario_id])
+        if cantidad <= 0:
+            continue
+        resultado = session.execute(
+            update(_tabla)
+            .where(_tabla.c.id == inventario_id, _tabla.c.cantidad >= cantidad)
+            .values(cantidad=_tabla.c.cantidad - cantidad)
+        )
+        if resultado.rowcount != 1:
+            faltantes.append(inventario_id)
+        _expirar(session, inventario_id)
+    return faltantes
+
+
+def reponer(session, inventario_id, cantidad):
+    """Sumar `cantidad` al stock de forma atómica. Devuelve False si el id no existe."""
+    resultado = session.execute(
+        update(_tabla)
+        .where(_tabla.c.id == inventario_id)
+        .values(cantidad=_tabla.c.cantidad + Decimal(cantidad))
+    )
+    _expirar(session, inventario_id)
+    return resultado.rowcount == 1
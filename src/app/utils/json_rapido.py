@@ -0,0 +1,91 @@
+"""
+Codificación JSON rápida, compartida por Flask y FastAPI.
+
+Usa `orjson` si está instalado y, si no, `json` de la biblioteca estándar
+con el mismo resultado. En ambos casos:
+
+- `Decimal` se escribe como cadena (`"12.50"`), igual que Pydantic y que
+  el proveedor por defecto de Flask: sin pérdida de precisión.
+- `datetime`, `date` y `time` se escriben en ISO 8601 (`"2026-01-31T20:15:00"`).
+- La salida es compacta y en UTF-8, sin escapar los acentos.
+
+`ProveedorJSON` es el proveedor de `jsonify` para la app Flask; la respuesta
+equivalente para FastAPI está en `fastapi_app.respuestas`.
+"""
+import dataclasses
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+MOTOR = 'orjson' if orjson is not None else 'json'
+
+
+def _por_defecto(obj):
+    """Tipos que el codificador no conoce por sí mismo."""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Objeto de tipo {type(obj).__name__} no serializable a JSON')
+
+
+if orjson is not None:
+    def dumps(obj, ordenar=False, indentar=False):
+        """`obj` codificado como JSON (bytes UTF-8)."""
+        opciones = orjson.OPT_NON_STR_KEYS
+        if ordenar:
+            opciones |= orjson.OPT_SORT_KEYS
+        if indentar:
+            opciones |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_por_defecto, option=opciones)
+
+    loads = orjson.loads
+else:  # pragma: no cover - depende del entorno
+    def dumps(obj, ordenar=False, indentar=False):
+        """`obj` codificado como JSON (bytes UTF-8)."""
+        return json.dumps(
+            obj, default=_por_defecto, ensure_ascii=False, sort_keys=ordenar,
+            indent=2 if indentar else None, separators=(',', ': ') if indentar else (',', ':')
+        ).encode('utf-8')
+
+    loads = json.loads
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """Proveedor JSON de Flask basado en `dumps`.
+
+    Respeta `sort_keys` y `compact` como el proveedor por defecto, pero las
+    fechas salen en ISO 8601 en vez de en formato HTTP.
+    """
+
+    def _indentar(self):
+        if self.compact is None:
+            return self._app.debug
+        return not self.compact
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj, ordenar=kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        cuerpo = dumps(obj, ordenar=self.sort_keys, indentar=self._indentar())
+        return self._app.response_class(cuerpo + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,185 @@
+"""
+Caché de lectura del menú público y del resto del catálogo.
+
+El menú cambia pocas veces al día pero es la página más visitada, así que
+las consultas de `Categoria` y `MenuItem` se guardan por proceso:
+
+- Cada combinación de filtros (`disponible`, `categoria`, `destacado`) es
+  una entrada propia que caduca a los `MENU_CACHE_TTL` segundos.
+- Los handlers que crean, editan o borran items llaman a `invalidar()` tras
+  el commit, por lo que los cambios del administrador se ven al instante.
+  Además, cualquier commit que toque `Categoria`, `MenuItem`, `Servicio` o
+  `Mesero` vacía la caché (cubre las rutas genéricas `/api/data/...`).
+- Los endpoints JSON del catálogo guardan directamente el cuerpo ya
+  codificado junto con su ETag (`json()`), de modo que un acierto no vuelve
+  a ejecutar `to_dict()` ni a serializar, y un `If-None-Match` coincidente
+  se responde con 304.
+
+Los objetos se cargan en una sesión propia y quedan desacoplados
+(detached) con todas sus columnas: se pueden leer desde cualquier petición,
+pero no deben modificarse ni usarse para navegar relaciones.
+"""
+import hashlib
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..models import Categoria, MenuItem, Mesero, Servicio
+
+# Modelos cuyo cambio invalida la caché al hacer commit
+MODELOS_CATALOGO = (Categoria, MenuItem, Servicio, Mesero)
+
+_CAMBIOS_KEY = '_menu_cache_cambios'
+_FALTA = object()
+
+# Cuerpo JSON ya codificado y su ETag (sin comillas)
+JSONCacheado = namedtuple('JSONCacheado', ['cuerpo', 'etag'])
+
+
+def _ttl_por_defecto():
+    try:
+        from config.config import Config
+        return getattr(Config, 'MENU_CACHE_TTL', 300)
+    except ImportError:
+        return 300
+
+
+class MenuCache:
+    """Caché read-through con TTL e invalidación explícita."""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else _ttl_por_defecto()
+        self._lock = threading.Lock()
+        self._entradas = {}
+        self._generacion = 0
+        self._hits = 0
+        self._misses = 0
+
+    def _buscar(self, clave):
+        """Valor de `clave` (o `_FALTA`) y generación en la que se buscó."""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] > ahora:
+                self._hits += 1
+                return entrada[1], self._generacion
+            self._misses += 1
+            return _FALTA, self._generacion
+
+    def _guardar(self, clave, valor, generacion):
+        with self._lock:
+            if generacion != self._generacion:
+                # Se invalidó mientras se cargaba: no guardar un valor quizá viejo
+                return valor
+            self._entradas[clave] = (time.monotonic() + self.ttl, valor)
+        return valor
+
+    def obtener(self, clave, cargar):
+        """Devolver la entrada `clave`, llamando a `cargar()` si falta o caducó."""
+        valor, generacion = self._buscar(clave)
+        if valor is _FALTA:
+            valor = self._guardar(clave, cargar(), generacion)
+        return valor
+
+    async def obtener_async(self, clave, cargar):
+        """Como `obtener`, con `cargar` asíncrono (repositorios de FastAPI)."""
+        valor, generacion = self._buscar(clave)
+        if valor is _FALTA:
+            valor = self._guardar(clave, await cargar(), generacion)
+        return valor
+
+    def invalidar(self):
+        """Vaciar la caché (llamar tras crear/editar/borrar items del menú)."""
+        with self._lock:
+            self._generacion += 1
+            self._entradas.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / total, 4) if total else 0.0,
+                'size': len(self._entradas),
+                'ttl': self.ttl,
+            }
+
+    def json(self, clave, construir, codificar):
+        """Cuerpo JSON de `codificar(construir())` y su ETag, calculados una
+        sola vez por versión de la caché."""
+        return self.obtener(('json',) + tuple(clave), lambda: _codificar(construir(), codificar))
+
+    async def json_async(self, clave, construir, codificar):
+        """Como `json`, con `construir` asíncrono."""
+        async def cargar():
+            return _codificar(await construir(), codificar)
+
+        return await self.obtener_async(('json',) + tuple(clave), cargar)
+
+    # ----- Consultas del menú -----
+
+    def items(self, session, disponible=None, categoria=None, destacado=None):
+        """Items del menú filtrados, ordenados por `orden` y `nombre`."""
+        def cargar():
+            with _sesion_de_lectura(session) as lectura:
+                query = lectura.query(MenuItem)
+                if disponible is not None:
+                    query = query.filter(MenuItem.disponible == disponible)
+                if categoria:
+                    query = query.filter(MenuItem.categoria_nombre == categoria)
+                if destacado is not None:
+                    query = query.filter(MenuItem.destacado == destacado)
+                return tuple(query.order_by(MenuItem.orden, MenuItem.nombre).all())
+
+        return list(self.obtener(('items', disponible, categoria, destacado), cargar))
+
+    def categorias(self, session):
+        """Categorías ordenadas por `orden`."""
+        def cargar():
+            with _sesion_de_lectura(session) as lectura:
+                return tuple(lectura.query(Categoria).order_by(Categoria.orden).all())
+
+        return list(self.obtener(('categorias',), cargar))
+
+
+def _codificar(datos, codificar):
+    cuerpo = codificar(datos)
+    if isinstance(cuerpo, str):
+        cuerpo = cuerpo.encode('utf-8')
+    return JSONCacheado(cuerpo, hashlib.sha1(cuerpo).hexdigest())
+
+
+def _sesion_de_lectura(session):
+    """Sesión aparte sobre el mismo engine: al cerrarse, los objetos quedan
+    desacoplados sin tocar el identity map de la petición."""
+    return Session(bind=session.get_bind(mapper=MenuItem), expire_on_commit=False)
+
+
+menu_cache = MenuCache()
+
+
+# ----- Invalidación por commit -----
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_cambios_catalogo(session, flush_context):
+    if session.info.get(_CAMBIOS_KEY):
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, MODELOS_CATALOGO):
+            session.info[_CAMBIOS_KEY] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_tras_commit(session):
+    if session.info.pop(_CAMBIOS_KEY, False):
+        menu_cache.invalidar()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_cambios_catalogo(session):
+    session.info.pop(_CAMBIOS_KEY, None)
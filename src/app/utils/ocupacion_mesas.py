@@ -0,0 +1,183 @@
+"""
+Índice en memoria de ocupación de mesas.
+
+Mantiene, por proceso, cuántos pedidos activos tiene cada mesa (y de qué
+usuario son) para que el plano de mesas no tenga que consultar la tabla
+`pedidos` una vez por mesa.
+
+- Las transiciones de estado de `Pedido` se aplican al índice al hacer
+  commit, mediante eventos de sesión de SQLAlchemy (cubre Flask y FastAPI).
+- Cada `MESAS_OCUPACION_TTL` segundos el índice se resincroniza con una sola
+  consulta `GROUP BY mesa_id, usuario_id`, lo que corrige cambios hechos por
+  otros procesos o por `UPDATE` masivos que no pasan por el ORM.
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from ..models import Pedido
+from .historial import DESCONOCIDO, valor_anterior
+
+# Estados en los que un pedido mantiene ocupada su mesa
+ESTADOS_ACTIVOS = ('pendiente', 'preparando', 'enviado')
+
+_DELTAS_KEY = '_ocupacion_mesas_deltas'
+
+
+def _ttl_por_defecto():
+    try:
+        from config.config import Config
+        return getattr(Config, 'MESAS_OCUPACION_TTL', 30)
+    except ImportError:
+        return 30
+
+
+class OcupacionMesas:
+    """Mapa `mesa_id -> {usuario_id: pedidos activos}` con resincronización periódica."""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else _ttl_por_defecto()
+        self._lock = threading.Lock()
+        self._conteo = defaultdict(Counter)
+        self._sincronizado_en = None
+
+    def sincronizar(self, session):
+        """Reconstruir el índice con una única consulta agregada."""
+        filas = session.query(
+            Pedido.mesa_id,
+            Pedido.usuario_id,
+            func.count(Pedido.id)
+        ).filter(
+            Pedido.mesa_id.isnot(None),
+            Pedido.estado.in_(ESTADOS_ACTIVOS)
+        ).group_by(Pedido.mesa_id, Pedido.usuario_id).all()
+
+        conteo = defaultdict(Counter)
+        for mesa_id, usuario_id, cantidad in filas:
+            conteo[mesa_id][usuario_id] = cantidad
+
+        with self._lock:
+            self._conteo = conteo
+            self._sincronizado_en = time.monotonic()
+
+    def invalidar(self):
+        """Forzar resincronización en la próxima lectura."""
+        with self._lock:
+            self._sincronizado_en = None
+
+    def _asegurar(self, session):
+        sincronizado_en = self._sincronizado_en
+        if sincronizado_en is None or time.monotonic() - sincronizado_en > self.ttl:
+            self.sincronizar(session)
+
+    def pedidos_activos(self, session, mesa_id):
+        """Número de pedidos activos en la mesa."""
+        self._asegurar(session)
+        with self._lock:
+            return sum(self._conteo.get(mesa_id, Counter()).values())
+
+    def esta_ocupada(self, session, mesa_id):
+        return self.pedidos_activos(session, mesa_id) > 0
+
+    def mesas_ocupadas(self, session, excluir_usuario_id=None):
+        """IDs de mesas con pedidos activos.
+
+        Con `excluir_usuario_id` sólo se cuentan los pedidos de otros usuarios
+        (un cliente puede seguir pidiendo en la mesa que él mismo ocupa).
+        """
+        self._asegurar(session)
+        with self._lock:
+            return {
+                mesa_id
+                for mesa_id, por_usuario in self._conteo.items()
+                if any(
+                    cantidad > 0 and usuario_id != excluir_usuario_id
+                    for usuario_id, cantidad in por_usuario.items()
+                )
+            }
+
+    def aplicar(self, deltas):
+        """Aplicar cambios `{(mesa_id, usuario_id): +n/-n}` confirmados en BD."""
+        with self._lock:
+            for (mesa_id, usuario_id), delta in deltas.items():
+                por_usuario = self._conteo[mesa_id]
+                por_usuario[usuario_id] += delta
+                if por_usuario[usuario_id] <= 0:
+                    del por_usuario[usuario_id]
+                if not por_usuario:
+                    del self._conteo[mesa_id]
+
+
+ocupacion_mesas = OcupacionMesas()
+
+
+# ----- Seguimiento de transiciones vía eventos de sesión -----
+
+def _clave_activa(mesa_id, usuario_id, estado):
+    if DESCONOCIDO in (mesa_id, usuario_id, estado):
+        return DESCONOCIDO
+    if mesa_id is None or estado not in ESTADOS_ACTIVOS:
+        return None
+    return (mesa_id, usuario_id)
+
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_cambios_pedidos(session, flush_context):
+    deltas = session.info.setdefault(_DELTAS_KEY, Counter())
+
+    for obj in session.new:
+        if isinstance(obj, Pedido):
+            clave = _clave_activa(obj.mesa_id, obj.usuario_id, obj.estado)
+            if clave:
+                deltas[clave] += 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Pedido):
+            continue
+        estado_attr = inspect(obj)
+        antes = _clave_activa(
+            valor_anterior(estado_attr, 'mesa_id'),
+            valor_anterior(estado_attr, 'usuario_id'),
+            valor_anterior(estado_attr, 'estado'),
+        )
+        despues = _clave_activa(obj.mesa_id, obj.usuario_id, obj.estado)
+        if antes is DESCONOCIDO:
+            deltas[DESCONOCIDO] += 1
+        elif antes != despues:
+            if antes:
+                deltas[antes] -= 1
+            if despues:
+                deltas[despues] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Pedido):
+            estado_attr = inspect(obj)
+            clave = _clave_activa(
+                valor_anterior(estado_attr, 'mesa_id'),
+                valor_anterior(estado_attr, 'usuario_id'),
+                valor_anterior(estado_attr, 'estado'),
+            )
+            if clave is DESCONOCIDO:
+                deltas[DESCONOCIDO] += 1
+            elif clave:
+                deltas[clave] -= 1
+
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_cambios_pedidos(session):
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if not deltas:
+        return
+    if DESCONOCIDO in deltas:
+        # Alguna transición no se pudo reconstruir: resincronizar al leer
+        ocupacion_mesas.invalidar()
+    else:
+        ocupacion_mesas.aplicar(deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_cambios_pedidos(session):
+    session.info.pop(_DELTAS_KEY, None)
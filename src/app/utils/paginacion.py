@@ -0,0 +1,278 @@
+"""
+Paginación por cursor (keyset) y proyección de campos para los listados.
+
+Los listados devolvían la tabla completa (`query.all()`). Con esta capa
+cada página es una consulta acotada, sin `OFFSET`, que sigue siendo igual
+de barata en la página 1 y en la 1000:
+
+- `limit`: filas por página (`PAGINACION_LIMITE` por defecto, nunca más de
+  `PAGINACION_LIMITE_MAX`).
+- `cursor`: valor opaco devuelto en la página anterior. Codifica los
+  valores del orden de la última fila (p. ej. `fecha_pedido` e `id`) y la
+  siguiente página se pide con `WHERE (fecha_pedido, id) < (...)`.
+- `fields`: columnas separadas por comas; sólo esas columnas se leen de la
+  base de datos y el resultado son dicts planos, sin `to_dict()`. Sólo se
+  aceptan columnas que el `to_dict()` del modelo ya expone (ver
+  `campos_publicos`): la proyección no puede revelar nada más.
+- `count=1`: añade el total de filas que cumplen los filtros (una consulta
+  `COUNT` extra, por eso sólo bajo pedido).
+
+El orden de cada listado termina siempre en la clave primaria, para que el
+cursor sea estable aunque haya valores repetidos. Las columnas del orden
+pueden ser nulas (p. ej. `Pedido.fecha_pedido`): el cursor sigue el orden
+de MySQL y SQLite, donde NULL va antes que cualquier valor (al final en
+los órdenes descendentes).
+
+El núcleo (`consulta_pagina`, `consulta_total`, `armar_pagina`) no depende
+del framework y lo usan Flask y FastAPI; `pagina_json` es el atajo para
+las rutas Flask.
+"""
+import base64
+import binascii
+import json
+from collections import namedtuple
+from functools import lru_cache
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from sqlalchemy import and_, false, func, inspect, or_, select
+
+# Columnas que nunca se exponen con `fields`
+CAMPOS_PRIVADOS = frozenset({'password_hash'})
+
+# Valores de relleno por tipo para leer las claves de `to_dict()`
+_MUESTRAS = {
+    int: 0, float: 0.0, Decimal: Decimal('0'), str: '', bool: False,
+    datetime: datetime.min, date: date.min, time: time.min,
+}
+
+Pagina = namedtuple('Pagina', ['items', 'siguiente', 'total'])
+Parametros = namedtuple('Parametros', ['limite', 'cursor', 'campos', 'contar'])
+
+
+class ParametrosInvalidos(ValueError):
+    """`limit`, `cursor` o `fields` no válidos (responder 400)."""
+
+
+def _config(nombre, por_defecto):
+    try:
+        from config.config import Config
+        return getattr(Config, nombre, por_defecto)
+    except ImportError:
+        return por_defecto
+
+
+def _verdadero(valor):
+    return str(valor).lower() in ('1', 'true', 'yes', 'si')
+
+
+def leer_parametros(args, limite_defecto=None, limite_max=None):
+    """`Parametros` a partir de los argumentos de la URL (`request.args`)."""
+    limite_max = limite_max or _config('PAGINACION_LIMITE_MAX', 1000)
+    limite = args.get('limit')
+    if limite in (None, ''):
+        limite = limite_defecto or _config('PAGINACION_LIMITE', 300)
+    else:
+        try:
+            limite = int(limite)
+        except ValueError:
+            raise ParametrosInvalidos('limit debe ser un número entero')
+        if limite < 1:
+            raise ParametrosInvalidos('limit debe ser mayor que 0')
+    campos = [c.strip() for c in (args.get('fields') or '').split(',') if c.strip()]
+    return Parametros(min(limite, limite_max), args.get('cursor') or None, campos or None, _verdadero(args.get('count')))
+
+
+def _muestra(columna):
+    try:
+        return _MUESTRAS.get(columna.type.python_type)
+    except NotImplementedError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def campos_publicos(modelo):
+    """Columnas de `modelo` que su `to_dict()` ya expone con el mismo nombre.
+
+    Las claves se leen de un `to_dict()` sobre una instancia transitoria con
+    valores de relleno; si falla, no se permite proyectar ninguna columna.
+    """
+    mapper = inspect(modelo)
+    muestra = modelo()
+    for atributo in mapper.column_attrs:
+        setattr(muestra, atributo.key, _muestra(atributo.columns[0]))
+    try:
+        claves = set(muestra.to_dict())
+    except Exception:
+        claves = set()
+    return frozenset(a.key for a in mapper.column_attrs if a.key in claves) - CAMPOS_PRIVADOS
+
+
+def _columnas(modelo, campos):
+    publicos = campos_publicos(modelo)
+    disponibles = {c.key: c for c in inspect(modelo).column_attrs if c.key in publicos}
+    desconocidos = [c for c in campos if c not in disponibles]
+    if desconocidos:
+        raise ParametrosInvalidos(f'Campos no válidos: {", ".join(desconocidos)}')
+    return [disponibles[c].class_attribute for c in campos]
+
+
+# ----- Cursor -----
+
+def _a_json(valor):
+    if isinstance(valor, (datetime, date, time)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+def _de_json(columna, valor):
+    try:
+        tipo = columna.type.python_type
+    except NotImplementedError:
+        return valor
+    if valor is None:
+        return None
+    if tipo is datetime:
+        return datetime.fromisoformat(valor)
+    if tipo is date:
+        return date.fromisoformat(valor)
+    if tipo is time:
+        return time.fromisoformat(valor)
+    if tipo is Decimal:
+        return Decimal(valor)
+    return tipo(valor)
+
+
+def codificar_cursor(valores):
+    datos = json.dumps([_a_json(v) for v in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(datos.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor, orden):
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(orden):
+            raise ValueError
+        return [_de_json(columna, valor) for (columna, _), valor in zip(orden, valores)]
+    except (ValueError, TypeError, binascii.Error):
+        raise ParametrosInvalidos('cursor no válido')
+
+
+def _posterior_e_igual(columna, descendente, valor):
+    """Condiciones "posterior a `valor`" e "igual a `valor`" en `columna`,
+    con NULL antes que cualquier valor (después, si `descendente`)."""
+    if not getattr(columna, 'nullable', False):
+        return (columna < valor if descendente else columna > valor), columna == valor
+    if valor is None:
+        return (false() if descendente else columna.isnot(None)), columna.is_(None)
+    if descendente:
+        return or_(columna < valor, columna.is_(None)), columna == valor
+    return columna > valor, columna == valor
+
+
+def _despues_de(orden, valores):
+    """Condición "fila posterior a `valores`" en el orden lexicográfico de `orden`."""
+    condicion = None
+    for (columna, descendente), valor in reversed(list(zip(orden, valores))):
+        siguiente, igual = _posterior_e_igual(columna, descendente, valor)
+        condicion = siguiente if condicion is None else or_(siguiente, and_(igual, condicion))
+    return condicion
+
+
+# ----- Consultas -----
+
+def consulta_pagina(query, modelo, orden, parametros, opciones=()):
+    """`SELECT` de una página: keyset, orden, `limit + 1` y proyección.
+
+    `orden` es una lista de `(columna, descendente)` que termina en la clave
+    primaria. `opciones` (p. ej. `selectinload`) sólo se aplican cuando se
+    devuelven objetos completos.
+    """
+    if parametros.cursor:
+        query = query.where(_despues_de(orden, decodificar_cursor(parametros.cursor, orden)))
+    if parametros.campos:
+        columnas = _columnas(modelo, parametros.campos)
+        claves = [columna.label(f'_orden_{i}') for i, (columna, _) in enumerate(orden)]
+        query = query.with_only_columns(*columnas, *claves)
+    elif opciones:
+        query = query.options(*opciones)
+    orden_sql = [columna.desc() if descendente else columna.asc() for columna, descendente in orden]
+    return query.order_by(*orden_sql).limit(parametros.limite + 1)
+
+
+def consulta_total(query):
+    """`SELECT COUNT(*)` de las filas que cumplen los filtros de `query`."""
+    return select(func.count()).select_from(query.order_by(None).subquery())
+
+
+def _valor_plano(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date, time)):
+        return valor.isoformat()
+    return valor
+
+
+def armar_pagina(resultado, orden, parametros, total=None):
+    """`Pagina` a partir del `Result` de `consulta_pagina`.
+
+    Sin `fields`, `items` son los objetos del modelo; con `fields`, dicts
+    con las columnas pedidas (fechas en ISO, decimales como float).
+    """
+    if parametros.campos:
+        filas = list(resultado.mappings())
+    else:
+        filas = list(resultado.scalars())
+    siguiente = None
+    if len(filas) > parametros.limite:
+        filas = filas[:parametros.limite]
+        ultima = filas[-1]
+        if parametros.campos:
+            valores = [ultima[f'_orden_{i}'] for i in range(len(orden))]
+        else:
+            valores = [getattr(ultima, columna.key) for columna, _ in orden]
+        siguiente = codificar_cursor(valores)
+    if parametros.campos:
+        filas = [{campo: _valor_plano(fila[campo]) for campo in parametros.campos} for fila in filas]
+    return Pagina(filas, siguiente, total)
+
+
+def cabeceras_pagina(pagina):
+    """Cabeceras HTTP con el cursor siguiente y, si se pidió, el total."""
+    cabeceras = {}
+    if pagina.siguiente:
+        cabeceras['X-Next-Cursor'] = pagina.siguiente
+    if pagina.total is not None:
+        cabeceras['X-Total-Count'] = str(pagina.total)
+    return cabeceras
+
+
+def paginar(session, query, modelo, orden, parametros, opciones=()):
+    """Ejecutar una página con una `Session` síncrona."""
+    total = session.scalar(consulta_total(query)) if parametros.contar else None
+    resultado = session.execute(consulta_pagina(query, modelo, orden, parametros, opciones))
+    return armar_pagina(resultado, orden, parametros, total)
+
+
+def pagina_json(session, query, modelo, orden, serializar, opciones=()):
+    """Respuesta Flask con una página del listado.
+
+    El cuerpo sigue siendo una lista JSON, como antes; el cursor de la
+    página siguiente y el total van en las cabeceras `X-Next-Cursor` y
+    `X-Total-Count`. Un cliente que no lea `X-Next-Cursor` sólo ve la
+    primera página (el panel de admin las recorre todas en `API.get`).
+    """
+    from flask import jsonify, request
+
+    try:
+        parametros = leer_parametros(request.args)
+        pagina = paginar(session, query, modelo, orden, parametros, opciones)
+    except ParametrosInvalidos as e:
+        return jsonify({'error': str(e)}), 400
+    items = pagina.items if parametros.campos else [serializar(item) for item in pagina.items]
+    respuesta = jsonify(items)
+    respuesta.headers.update(cabeceras_pagina(pagina))
+    return respuesta
@@ -0,0 +1,72 @@
+"""
+Detección de recorridos completos de tabla con `EXPLAIN`.
+
+Las pruebas de `tests/test_planes_consulta.py` ejecutan las consultas
+frecuentes de repositorios y servicios, capturan el SQL real con
+`capturar(engine)` y piden el plan de cada `SELECT`; si alguna recorre una
+tabla completa es que le falta un índice (y una migración).
+
+Se entiende por recorrido completo:
+
+- SQLite: `SCAN tabla` sin `USING INDEX` (recorrer un índice en orden,
+  p. ej. para `ORDER BY ... LIMIT`, no cuenta).
+- MySQL: filas de `EXPLAIN` con `type = ALL`.
+- PostgreSQL: nodos `Seq Scan`.
+"""
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+_SCAN_SQLITE = re.compile(r'^SCAN (\S+)(.*)$')
+_SUBCONSULTA_SQLITE = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (\S+)')
+_SEQ_SCAN_PG = re.compile(r'Seq Scan on (\S+)')
+
+
+@contextmanager
+def capturar(engine):
+    """Lista de `(sentencia, parámetros)` de los `SELECT` ejecutados en el bloque."""
+    capturadas = []
+
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            capturadas.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', _antes)
+    try:
+        yield capturadas
+    finally:
+        event.remove(engine, 'before_cursor_execute', _antes)
+
+
+def _sqlite(conexion, sentencia, parametros):
+    filas = conexion.exec_driver_sql(f'EXPLAIN QUERY PLAN {sentencia}', parametros).all()
+    detalles = [fila[-1] for fila in filas]
+    subconsultas = {m.group(1) for m in map(_SUBCONSULTA_SQLITE.match, detalles) if m}
+    tablas = []
+    for detalle in detalles:
+        m = _SCAN_SQLITE.match(detalle)
+        if m and m.group(1) != 'CONSTANT' and m.group(1) not in subconsultas and 'USING' not in m.group(2):
+            tablas.append(m.group(1))
+    return tablas
+
+
+def _mysql(conexion, sentencia, parametros):
+    resultado = conexion.exec_driver_sql(f'EXPLAIN {sentencia}', parametros)
+    return [fila['table'] for fila in resultado.mappings() if fila['type'] == 'ALL']
+
+
+def _postgresql(conexion, sentencia, parametros):
+    filas = conexion.exec_driver_sql(f'EXPLAIN {sentencia}', parametros).scalars()
+    return [m.group(1) for linea in filas for m in _SEQ_SCAN_PG.finditer(linea)]
+
+
+_PLANES = {'sqlite': _sqlite, 'mysql': _mysql, 'postgresql': _postgresql}
+
+
+def recorridos_completos(conexion, sentencia, parametros=()):
+    """Tablas (o alias) que el plan de `sentencia` recorre completas."""
+    dialecto = conexion.dialect.name
+    if dialecto not in _PLANES:
+        raise NotImplementedError(f'EXPLAIN no soportado para {dialecto}')
+    return _PLANES[dialecto](conexion, sentencia, parametros)
@@ -0,0 +1,129 @@
+"""
+Caché de usuarios autenticados ("principales") de la API.
+
+Cada petición autenticada de FastAPI necesita saber quién es el usuario y
+qué rol tiene, pero no la fila completa de `usuarios`. En lugar de un
+`db.get(Usuario, id)` por petición se guarda, por proceso, un `Principal`
+ligero con los pocos campos que leen los servicios:
+
+- Las entradas caducan a los `PRINCIPAL_CACHE_TTL` segundos y la caché
+  guarda como mucho `PRINCIPAL_CACHE_MAX` usuarios (LRU).
+- Los cambios de rol o estado hechos desde `usuarios_service` o desde los
+  handlers de administración llaman a `invalidar(usuario_id)` tras el
+  commit. Además, cualquier commit que modifique o borre un `Usuario`
+  invalida su entrada, en el proceso que hizo el commit; entre procesos
+  el límite es el TTL.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..models import Usuario
+
+_CAMBIOS_KEY = '_principales_cambios'
+
+# Datos del usuario que necesitan la autorización y los servicios de la API
+Principal = namedtuple('Principal', ['id', 'rol', 'activo', 'nombre', 'apellido', 'email', 'telefono'])
+
+
+def _config(nombre, defecto):
+    try:
+        from config.config import Config
+        return getattr(Config, nombre, defecto)
+    except ImportError:
+        return defecto
+
+
+def principal_de(usuario):
+    """Construir el `Principal` de una instancia de `Usuario`."""
+    return Principal(
+        id=usuario.id,
+        rol=usuario.rol,
+        activo=bool(usuario.activo),
+        nombre=usuario.nombre,
+        apellido=usuario.apellido,
+        email=usuario.email,
+        telefono=usuario.telefono,
+    )
+
+
+class CachePrincipales:
+    """LRU acotada con TTL de `Principal` por id de usuario."""
+
+    def __init__(self, ttl=None, max_entradas=None):
+        self.ttl = ttl if ttl is not None else _config('PRINCIPAL_CACHE_TTL', 60)
+        self.max_entradas = max_entradas if max_entradas is not None else _config('PRINCIPAL_CACHE_MAX', 1024)
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def obtener(self, usuario_id):
+        """Devolver el `Principal` en caché o `None` si falta o caducó."""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(usuario_id)
+            if entrada is not None and entrada[0] > ahora:
+                self._entradas.move_to_end(usuario_id)
+                self._hits += 1
+                return entrada[1]
+            if entrada is not None:
+                del self._entradas[usuario_id]
+            self._misses += 1
+            return None
+
+    def guardar(self, usuario):
+        """Guardar el `Principal` de `usuario` y devolverlo."""
+        principal = principal_de(usuario)
+        with self._lock:
+            self._entradas[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entradas.move_to_end(principal.id)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return principal
+
+    def invalidar(self, usuario_id=None):
+        """Olvidar un usuario, o todos si no se indica `usuario_id`."""
+        with self._lock:
+            if usuario_id is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(usuario_id, None)
+
+    def estadisticas(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / total, 4) if total else 0.0,
+                'size': len(self._entradas),
+                'max': self.max_entradas,
+                'ttl': self.ttl,
+            }
+
+
+principales = CachePrincipales()
+
+
+# ----- Invalidación por eventos de sesión -----
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_cambios_usuarios(session, flush_context):
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, Usuario) and obj.id is not None:
+            session.info.setdefault(_CAMBIOS_KEY, set()).add(obj.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_tras_commit(session):
+    for usuario_id in session.info.pop(_CAMBIOS_KEY, ()):
+        principales.invalidar(usuario_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_cambios_usuarios(session):
+    session.info.pop(_CAMBIOS_KEY, None)
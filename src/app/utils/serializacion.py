@@ -0,0 +1,104 @@
+"""
+Serializadores con carga anticipada declarada (`Forma`).
+
+`Pedido.to_dict()` recorre `self.items` y cada `PedidoItem.to_dict()` toca
+`self.menu_item`: sin opciones de carga, una lista de 50 pedidos con 4
+líneas dispara ~250 consultas. Cada endpoint declara aquí la forma que
+serializa, y la consulta recibe las opciones que le corresponden:
+
+    PEDIDO = Forma(Pedido, items=Forma(PedidoItem, menu_item=Forma(MenuItem)))
+
+    pedidos = PEDIDO.consulta(Pedido.query.filter_by(estado='pendiente')).all()
+    return jsonify(PEDIDO.lista(pedidos))
+
+- Las colecciones se cargan con `selectinload` (una consulta por nivel)
+  y las relaciones a uno con `joinedload` (en la misma consulta).
+- Con `SERIALIZACION_ESTRICTA` (o dentro de `sin_cargas_perezosas()`)
+  cualquier carga perezosa durante la serialización lanza `CargaPerezosa`:
+  el `to_dict` recorre una relación que falta en la forma.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from ..models import MenuItem, Pedido, PedidoItem
+
+_estricta = ContextVar('serializacion_estricta', default=False)
+
+
+class CargaPerezosa(Exception):
+    """Carga perezosa de una relación durante una serialización estricta."""
+
+
+def _config(nombre, por_defecto):
+    try:
+        from config.config import Config
+        return getattr(Config, nombre, por_defecto)
+    except ImportError:
+        return por_defecto
+
+
+@contextmanager
+def sin_cargas_perezosas(activo=True):
+    """Lanzar `CargaPerezosa` ante cualquier carga perezosa dentro del bloque."""
+    token = _estricta.set(activo)
+    try:
+        yield
+    finally:
+        _estricta.reset(token)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _vigilar_cargas_perezosas(estado):
+    # `lazy_loaded_from` distingue la carga perezosa de un `selectinload`
+    if _estricta.get() and estado.is_relationship_load and estado.lazy_loaded_from is not None:
+        ruta = estado.loader_strategy_path
+        raise CargaPerezosa(f'Carga perezosa de {ruta[-1] if ruta else "una relación"} al serializar; '
+                            'declárela en la Forma del endpoint')
+
+
+class Forma:
+    """Modelo, serializador y relaciones (anidadas) que éste recorre."""
+
+    def __init__(self, modelo, serializar=None, **relaciones):
+        relaciones_modelo = inspect(modelo).relationships
+        for nombre, forma in relaciones.items():
+            if nombre not in relaciones_modelo:
+                raise ValueError(f'{modelo.__name__} no tiene la relación {nombre!r}')
+            if relaciones_modelo[nombre].mapper.class_ is not forma.modelo:
+                raise ValueError(f'{modelo.__name__}.{nombre} no es de tipo {forma.modelo.__name__}')
+        self.modelo = modelo
+        self.serializar = serializar or modelo.to_dict
+        self.relaciones = relaciones
+
+    def opciones(self):
+        """Opciones de carga de todas las relaciones de la forma."""
+        opciones = []
+        for nombre, forma in self.relaciones.items():
+            atributo = getattr(self.modelo, nombre)
+            carga = selectinload(atributo) if atributo.property.uselist else joinedload(atributo)
+            anidadas = forma.opciones()
+            opciones.append(carga.options(*anidadas) if anidadas else carga)
+        return opciones
+
+    def consulta(self, query):
+        """`query` (`Query` o `select`) con las opciones de la forma."""
+        return query.options(*self.opciones())
+
+    def _estricta(self):
+        return _estricta.get() or bool(_config('SERIALIZACION_ESTRICTA', False))
+
+    def __call__(self, obj):
+        with sin_cargas_perezosas(self._estricta()):
+            return self.serializar(obj)
+
+    def lista(self, objs):
+        with sin_cargas_perezosas(self._estricta()):
+            return [self.serializar(obj) for obj in objs]
+
+
+# Formas compartidas
+MENU_ITEM = Forma(MenuItem)
+PEDIDO = Forma(Pedido, items=Forma(PedidoItem, menu_item=MENU_ITEM))
@@ -0,0 +1,115 @@
+"""
+Planificación del consumo de inventario de un pedido.
+
+Crear un pedido descuenta de `inventario` lo que indican las `recetas` de
+cada plato. En lugar de consultar plato, recetas e ingredientes línea a
+línea, el plan se arma con tres consultas `IN` para todo el carrito:
+
+1. `cargar_menu_items`: los `MenuItem` de todas las líneas.
+2. `planificar`: sus `Receta` y los `Inventario` que usan; suma lo
+   requerido por ingrediente entre todas las líneas y valida el stock.
+3. `aplicar`: descuenta cada ingrediente una sola vez con un UPDATE
+   condicional (`app.utils.inventario.descontar`) y registra los
+   `InventarioMovimiento` (uno por línea e ingrediente, como antes) en un
+   único `add_all`.
+
+La validación de `planificar` usa el stock leído sin bloqueos y sirve para
+rechazar pronto; la que manda es la de `aplicar`, atómica en la base de
+datos, que detecta lo que otro pedido concurrente haya consumido entre
+medias.
+"""
+from collections import defaultdict, namedtuple
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from ..models import Inventario, InventarioMovimiento, MenuItem, Receta
+from . import inventario as stock
+
+# Salida de un ingrediente por una línea del carrito
+Consumo = namedtuple('Consumo', ['inventario_id', 'menu_item', 'cantidad_pedido', 'cantidad_salida'])
+
+# inventarios: {id: Inventario}; requerido: {id: Decimal}; consumos: [Consumo]
+PlanStock = namedtuple('PlanStock', ['inventarios', 'requerido', 'consumos'])
+
+
+class StockInsuficiente(Exception):
+    """Un ingrediente no alcanza para las líneas del pedido."""
+
+    def __init__(self, inventario, menu_item):
+        self.inventario = inventario
+        self.menu_item = menu_item
+        super().__init__(
+            f'Stock insuficiente de "{inventario.nombre}" para el plato "{menu_item.nombre}"'
+        )
+
+
+def cargar_menu_items(session, ids):
+    """`{id: MenuItem}` para los ids dados, en una sola consulta."""
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return {}
+    items = session.scalars(select(MenuItem).where(MenuItem.id.in_(ids)))
+    return {item.id: item for item in items}
+
+
+def planificar(session, lineas):
+    """Calcular y validar el consumo de inventario de `lineas`.
+
+    `lineas` es una secuencia de `(menu_item, cantidad)`. Lanza
+    `StockInsuficiente` con el primer ingrediente que no alcanza, nombrando
+    la línea en la que el acumulado supera el stock.
+    """
+    menu_item_ids = {menu_item.id for menu_item, _ in lineas}
+    recetas = defaultdict(list)
+    if menu_item_ids:
+        for receta in session.scalars(select(Receta).where(Receta.menu_item_id.in_(menu_item_ids))):
+            recetas[receta.menu_item_id].append(receta)
+
+    inventario_ids = {r.inventario_id for rs in recetas.values() for r in rs}
+    inventarios = {}
+    if inventario_ids:
+        inventarios = {
+            inv.id: inv
+            for inv in session.scalars(select(Inventario).where(Inventario.id.in_(inventario_ids)))
+        }
+
+    requerido = defaultdict(Decimal)
+    consumos = []
+    for menu_item, cantidad in lineas:
+        for receta in recetas.get(menu_item.id, ()):
+            inventario = inventarios.get(receta.inventario_id)
+            if inventario is None:
+                continue
+            salida = Decimal(receta.cantidad_usada) * int(cantidad)
+            requerido[inventario.id] += salida
+            if Decimal(inventario.cantidad) < requerido[inventario.id]:
+                raise StockInsuficiente(inventario, menu_item)
+            consumos.append(Consumo(inventario.id, menu_item, int(cantidad), salida))
+
+    return PlanStock(inventarios, dict(requerido), consumos)
+
+
+def aplicar(session, plan, usuario_id, codigo_pedido):
+    """Descontar el inventario del plan y registrar sus movimientos de salida.
+
+    Lanza `StockInsuficiente` si un ingrediente ya no alcanza; en ese caso
+    quien llama debe hacer rollback de la transacción.
+    """
+    faltantes = stock.descontar(session, plan.requerido)
+    if faltantes:
+        faltante = faltantes[0]
+        # El plato nombrado es la última línea que usa el ingrediente
+        menu_item = [c.menu_item for c in plan.consumos if c.inventario_id == faltante][-1]
+        raise StockInsuficiente(plan.inventarios[faltante], menu_item)
+
+    session.add_all([
+        InventarioMovimiento(
+            inventario_id=consumo.inventario_id,
+            tipo='salida',
+            cantidad=consumo.cantidad_salida,
+            usuario_id=usuario_id,
+            notas=f'Pedido {codigo_pedido} - {consumo.menu_item.nombre} x{consumo.cantidad_pedido}'
+        )
+        for consumo in plan.consumos
+    ])
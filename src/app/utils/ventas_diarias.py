@@ -0,0 +1,296 @@
+"""
+Rollup incremental de ventas diarias (`ventas_diarias`).
+
+Cada vez que se confirma la creación, el cambio o el borrado de un `Pedido`
+se suman/restan sus contadores en la fila del día correspondiente. Los
+cambios se acumulan en cada flush y se aplican después del commit, en una
+transacción corta y aparte: así los pedidos simultáneos no esperan, hasta
+confirmarse, por el bloqueo de la misma fila del día. Si hay rollback no se
+aplica nada; si falla la aplicación tras el commit se registra en el log y
+`scripts/reconstruir_ventas_diarias.py` recupera el rollup.
+
+Las estadísticas leen el rollup para los días cerrados y consultan `pedidos`
+en vivo sólo para el día en curso, de modo que su costo no depende del
+tamaño del historial.
+
+El día de un pedido es su día local (`Config.TIMEZONE`, ver `utils.fechas`):
+`fecha_pedido` se guarda en UTC, y las consultas sobre `pedidos` filtran por
+el rango UTC de cada día en lugar de `DATE(fecha_pedido)`, para que puedan
+usar el índice de la columna.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy import event, func, inspect, select, delete, and_
+from sqlalchemy.orm import Session
+
+from ..models import Pedido, VentaDiaria
+from .fechas import dia_local, hoy_local, rango_utc
+from .historial import DESCONOCIDO, valor_anterior
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONES = ('fecha', 'estado', 'metodo_pago', 'tipo_servicio')
+_ATRIBUTOS = ('fecha_pedido', 'estado', 'metodo_pago', 'tipo_servicio', 'total')
+
+_tabla = VentaDiaria.__table__
+_DELTAS_KEY = '_ventas_diarias_deltas'
+
+
+def _clave(fecha_pedido, estado, metodo_pago, tipo_servicio):
+    if fecha_pedido is None:
+        return None
+    return (dia_local(fecha_pedido), estado or '', metodo_pago or '', tipo_servicio or '')
+
+
+def _decimal(valor):
+    if valor is None:
+        return Decimal('0')
+    if isinstance(valor, Decimal):
+        return valor
+    return Decimal(str(valor))
+
+
+# ----- Mantenimiento incremental -----
+
+def _cargar_valor_previo(target, value, oldvalue, initiator):
+    """Sin efecto: sólo fuerza `active_history` para conocer el valor previo
+    aunque el atributo estuviera expirado (p. ej. tras un commit)."""
+
+
+for _nombre in _ATRIBUTOS:
+    event.listen(getattr(Pedido, _nombre), 'set', _cargar_valor_previo, active_history=True)
+
+
+def _anterior(estado_attr, nombre):
+    valor = valor_anterior(estado_attr, nombre)
+    # Con `active_history` el valor previo siempre se carga: si el historial
+    # sólo tiene el nuevo valor es que el anterior era nulo
+    return None if valor is DESCONOCIDO else valor
+
+
+def _fila_anterior(obj):
+    estado_attr = inspect(obj)
+    return {nombre: _anterior(estado_attr, nombre) for nombre in _ATRIBUTOS}
+
+
+def _fila_actual(obj):
+    return {nombre: getattr(obj, nombre) for nombre in _ATRIBUTOS}
+
+
+def _acumular(deltas, fila, signo):
+    clave = _clave(fila['fecha_pedido'], fila['estado'], fila['metodo_pago'], fila['tipo_servicio'])
+    if clave is None:
+        return
+    deltas[clave][0] += signo
+    deltas[clave][1] += signo * _decimal(fila['total'])
+
+
+def _upsert(conexion, clave, cantidad, total):
+    """Sumar (cantidad, total) a la fila `clave` de forma atómica."""
+    valores = dict(zip(DIMENSIONES, clave), cantidad=cantidad, total=total)
+    dialecto = conexion.dialect.name
+
+    if dialecto == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(_tabla).values(**valores)
+        stmt = stmt.on_duplicate_key_update(
+            cantidad=_tabla.c.cantidad + stmt.inserted.cantidad,
+            total=_tabla.c.total + stmt.inserted.total,
+        )
+    elif dialecto in ('sqlite', 'postgresql'):
+        if dialecto == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(_tabla).values(**valores)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(DIMENSIONES),
+            set_={
+                'cantidad': _tabla.c.cantidad + stmt.excluded.cantidad,
+                'total': _tabla.c.total + stmt.excluded.total,
+            },
+        )
+    else:
+        condicion = and_(*(getattr(_tabla.c, d) == v for d, v in zip(DIMENSIONES, clave)))
+        resultado = conexion.execute(
+            _tabla.update().where(condicion).values(
+                cantidad=_tabla.c.cantidad + cantidad,
+                total=_tabla.c.total + total,
+            )
+        )
+        if resultado.rowcount:
+            return
+        stmt = _tabla.insert().values(**valores)
+
+    conexion.execute(stmt)
+
+
+def _nuevos_deltas():
+    return defaultdict(lambda: [0, Decimal('0')])
+
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_deltas(session, flush_context):
+    deltas = _nuevos_deltas()
+
+    for obj in session.new:
+        if isinstance(obj, Pedido):
+            _acumular(deltas, _fila_actual(obj), +1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Pedido) and session.is_modified(obj, include_collections=False):
+            antes, despues = _fila_anterior(obj), _fila_actual(obj)
+            if antes != despues:
+                _acumular(deltas, antes, -1)
+                _acumular(deltas, despues, +1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Pedido):
+            _acumular(deltas, _fila_anterior(obj), -1)
+
+    if not deltas:
+        return
+
+    pendientes = session.info.setdefault(_DELTAS_KEY, _nuevos_deltas())
+    for clave, (cantidad, total) in deltas.items():
+        pendientes[clave][0] += cantidad
+        pendientes[clave][1] += total
+
+
+def aplicar(conexion, deltas):
+    """Sumar `deltas` al rollup, en orden de clave (mismo orden de bloqueo)."""
+    for clave, (cantidad, total) in sorted(deltas.items()):
+        if cantidad or total:
+            _upsert(conexion, clave, cantidad, total)
+
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_deltas(session):
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if not deltas:
+        return
+    try:
+        with session.get_bind(mapper=inspect(Pedido)).begin() as conexion:
+            aplicar(conexion, deltas)
+    except Exception:
+        logger.exception('No se pudo actualizar ventas_diarias; reconstruir con '
+                         'scripts/reconstruir_ventas_diarias.py')
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_deltas(session):
+    session.info.pop(_DELTAS_KEY, None)
+
+
+# ----- Reconstrucción -----
+
+def _dias(session, desde, hasta):
+    """Días locales en [desde, hasta); sin límites, los que tienen pedidos."""
+    if desde is None or hasta is None:
+        primero, ultimo = session.execute(
+            select(func.min(Pedido.fecha_pedido), func.max(Pedido.fecha_pedido))
+        ).one()
+        if primero is None:
+            return []
+        desde = desde if desde is not None else dia_local(primero)
+        hasta = hasta if hasta is not None else dia_local(ultimo) + timedelta(days=1)
+    return [desde + timedelta(days=i) for i in range((hasta - desde).days)]
+
+
+def reconstruir(session, desde=None, hasta=None):
+    """Recalcular el rollup desde `pedidos` para los días en [desde, hasta).
+
+    Sin límites reconstruye toda la tabla. Cada día es un `GROUP BY` sobre
+    el rango UTC de ese día local. No hace commit.
+    Devuelve el número de filas generadas.
+    """
+    borrar = delete(_tabla)
+    if desde is not None:
+        borrar = borrar.where(_tabla.c.fecha >= desde)
+    if hasta is not None:
+        borrar = borrar.where(_tabla.c.fecha < hasta)
+    dias = _dias(session, desde, hasta)
+    session.execute(borrar)
+
+    registros = []
+    for dia in dias:
+        inicio, fin = rango_utc(dia)
+        filas = session.execute(
+            select(
+                Pedido.estado,
+                Pedido.metodo_pago,
+                Pedido.tipo_servicio,
+                func.count(Pedido.id),
+                func.coalesce(func.sum(Pedido.total), 0),
+            ).where(
+                Pedido.fecha_pedido >= inicio, Pedido.fecha_pedido < fin
+            ).group_by(Pedido.estado, Pedido.metodo_pago, Pedido.tipo_servicio)
+        ).all()
+        registros.extend(
+            dict(zip(DIMENSIONES, _clave(dia, estado, metodo, tipo)), cantidad=int(cantidad), total=_decimal(total))
+            for estado, metodo, tipo, cantidad, total in filas
+        )
+    if registros:
+        session.execute(_tabla.insert(), registros)
+    return len(registros)
+
+
+# ----- Lectura -----
+
+def _columna_vivo(dimension):
+    if dimension == 'fecha':
+        # El día local se calcula en Python: en vivo sólo se lee el día en curso
+        return Pedido.fecha_pedido
+    return getattr(Pedido, dimension)
+
+
+def _normalizar(dimension, valor):
+    if dimension == 'fecha':
+        return dia_local(valor)
+    return valor or None
+
+
+def agregar(session, desde, hasta, agrupar_por, hoy=None):
+    """Pedidos y ventas en [desde, hasta) agrupados por `agrupar_por`.
+
+    Los días anteriores a `hoy` salen de `ventas_diarias`; desde `hoy` en
+    adelante se consulta `pedidos` en vivo. Devuelve
+    `{tupla_de_dimensiones: (cantidad, total_float)}`; `fecha` se devuelve
+    como `date` y los valores vacíos como `None`.
+    """
+    hoy = hoy or hoy_local()
+    agrupar_por = tuple(agrupar_por)
+    resultado = defaultdict(lambda: [0, 0.0])
+
+    corte = min(max(desde, hoy), hasta)
+
+    if desde < corte:
+        columnas = [getattr(_tabla.c, d) for d in agrupar_por]
+        filas = session.execute(
+            select(*columnas, func.sum(_tabla.c.cantidad), func.sum(_tabla.c.total))
+            .where(_tabla.c.fecha >= desde, _tabla.c.fecha < corte)
+            .group_by(*columnas)
+        ).all()
+        for *clave, cantidad, total in filas:
+            acumulado = resultado[tuple(_normalizar(d, v) for d, v in zip(agrupar_por, clave))]
+            acumulado[0] += int(cantidad or 0)
+            acumulado[1] += float(total or 0)
+
+    if corte < hasta:
+        columnas = [_columna_vivo(d) for d in agrupar_por]
+        inicio, fin = rango_utc(corte, hasta)
+        filas = session.execute(
+            select(*columnas, func.count(Pedido.id), func.coalesce(func.sum(Pedido.total), 0))
+            .where(Pedido.fecha_pedido >= inicio, Pedido.fecha_pedido < fin)
+            .group_by(*columnas)
+        ).all()
+        for *clave, cantidad, total in filas:
+            acumulado = resultado[tuple(_normalizar(d, v) for d, v in zip(agrupar_por, clave))]
+            acumulado[0] += int(cantidad or 0)
+            acumulado[1] += float(total or 0)
+
+    return {clave: (cantidad, total) for clave, (cantidad, total) in resultado.items() if cantidad}
+
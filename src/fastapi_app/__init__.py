@@ -6,61 +6,53 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, RedirectResponse
 from contextlib import asynccontextmanager
-import importlib
-import traceback
 
 # Importar rutas desde los routers relativos
 from . import routers
-from .routers import mesas, menu, pedidos, reservas, usuarios, auth
+from .routers import mesas, menu, pedidos, reservas, usuarios, auth, stream
+from .database import dispose_engines, usar_async_db
+from .hashing import HasherSaturado, password_hasher
+from .stream import canal_eventos
+from config.config import Config
+from app.utils import eventos
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Manejo del ciclo de vida de la aplicación"""
+    """Manejo del ciclo de vida de la aplicación.
+
+    La API usa sus propios engines de SQLAlchemy (`database.py`), creados
+    al recibir la primera petición: no se construye la app Flask ni se
+    abre conexión a la base de datos al arrancar.
+    """
     # Startup
     print("🚀 FastAPI iniciando...")
-
-    # Crear una instancia mínima de la aplicación Flask y almacenarla en el
-    # state de FastAPI. No se hace push del contexto aquí porque los
-    # manejadores de petición pueden ejecutarse en hilos/greenlets distintos;
-    # en su lugar abriremos un `app_context` por petición en la dependencia.
-    try:
-        # Importar la factory de Flask en tiempo de ejecución para evitar
-        # fallos si Flask no está instalado cuando se importa el paquete.
-        try:
-            flask_module = importlib.import_module('app.app')
-            create_flask_app = getattr(flask_module, 'create_app', None)
-        except (ImportError, AttributeError):
-            try:
-                # Intentar alternativa si la primera falla
-                from app.app import create_app
-                create_flask_app = create_app
-            except (ImportError, AttributeError):
-                create_flask_app = None
-        except Exception:
-            create_flask_app = None
-
-        if create_flask_app:
-            flask_app = create_flask_app('development')
-            # Guardar la app para que las dependencias la usen por petición
-            app.state._flask_app = flask_app
-            print("✅ Flask app instance stored on FastAPI state")
-        else:
-            print("⚠️ Flask factory `create_app` not available; skipping Flask integration")
-    except Exception as e:
-        print(f"⚠️ Could not create Flask app instance: {e}")
-        traceback.print_exc()
+    # Cambios confirmados en este proceso -> clientes de /api/v1/stream
+    eventos.suscribir(canal_eventos.publicar_evento)
+    despachador = en_hilo = None
+    if Config.SOCKETIO_MESSAGE_QUEUE:
+        # Publicar en la cola de Socket.IO los cambios confirmados por la API,
+        # para que los workers de Flask los entreguen a sus salas
+        from app.socket_events import registrar_despachador
+        from app.utils.cola_mensajes import EmisorEnHilo, crear_gestor
+        emisor = crear_gestor(Config.SOCKETIO_MESSAGE_QUEUE, channel=Config.SOCKETIO_CHANNEL, write_only=True)
+        if usar_async_db():
+            # `after_commit` corre en el bucle de eventos: publicar desde otro hilo
+            emisor = en_hilo = EmisorEnHilo(emisor)
+        despachador = registrar_despachador(emisor)
 
     yield
 
-    # Shutdown (limpiar la referencia a la app Flask si existe)
-    try:
-        if hasattr(app.state, '_flask_app'):
-            delattr(app.state, '_flask_app')
-            print("👋 Flask app reference removed from state")
-    except Exception as e:
-        print(f"⚠️ Error removing Flask app reference: {e}")
-
+    # Shutdown: dejar de publicar, cortar los streams, cerrar los pools de
+    # conexiones y los hilos de bcrypt
+    eventos.desuscribir(canal_eventos.publicar_evento)
+    canal_eventos.cerrar()
+    if despachador is not None:
+        eventos.desuscribir(despachador)
+    if en_hilo is not None:
+        en_hilo.cerrar()
+    await dispose_engines()
+    password_hasher.cerrar()
     print("👋 FastAPI cerrando...")
 
 
@@ -93,6 +85,7 @@ def create_fastapi_app():
     app.include_router(pedidos.router, prefix="/api/v1", tags=["Pedidos"])
     app.include_router(reservas.router, prefix="/api/v1", tags=["Reservas"])
     app.include_router(usuarios.router, prefix="/api/v1", tags=["Usuarios"])
+    app.include_router(stream.router, prefix="/api/v1", tags=["Tiempo real"])
     
     # Ruta raíz
     @app.get("/api")
@@ -107,7 +100,8 @@ def create_fastapi_app():
                 "menu": "/api/v1/menu",
                 "pedidos": "/api/v1/pedidos",
                 "reservas": "/api/v1/reservas",
-                "usuarios": "/api/v1/usuarios"
+                "usuarios": "/api/v1/usuarios",
+                "stream": "/api/v1/stream"
             }
         }
 
@@ -125,6 +119,15 @@ def create_fastapi_app():
         return RedirectResponse(url="/api/openapi.json")
     
     # Manejador de errores
+    @app.exception_handler(HasherSaturado)
+    async def hasher_saturado_handler(request, exc):
+        # Demasiados logins/registros en cola: mejor reintentar que esperar
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Servicio de autenticación ocupado, inténtalo de nuevo"},
+            headers={"Retry-After": "1"}
+        )
+
     @app.exception_handler(Exception)
     async def global_exception_handler(request, exc):
         return JSONResponse(
@@ -0,0 +1,195 @@
+"""
+Sesiones de base de datos para FastAPI.
+
+La API no depende de la app Flask: usa sus propios engines de SQLAlchemy,
+creados de forma perezosa a partir de `Config`, sobre los mismos modelos
+(`app.models`, que comparten la metadata de Flask-SQLAlchemy). Así no hay
+que construir la app Flask al arrancar ni empujar un `app_context` por
+petición.
+
+Con `Config.FASTAPI_ASYNC_DB` activado, los handlers usan un `AsyncSession`
+sobre un engine asyncio (aiomysql en producción, aiosqlite en pruebas), de
+modo que una consulta lenta no bloquea el event loop.
+
+Sin esa opción se usa una `Session` síncrona, envuelta en
+`SyncSessionAdapter` para que los repositorios (todos `async`) funcionen
+igual en ambos modos.
+"""
+import threading
+from typing import Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from config.config import Config
+
+# Driver asyncio equivalente a cada driver síncrono soportado
+_DRIVERS_ASYNC = {
+    'mysql': 'mysql+aiomysql',
+    'mysql+pymysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+}
+
+_lock = threading.Lock()
+_sync_engine = None
+_sync_session_factory = None
+_engine = None
+_session_factory = None
+
+
+def usar_async_db() -> bool:
+    return bool(getattr(Config, 'FASTAPI_ASYNC_DB', False))
+
+
+# ----- Engine síncrono -----
+
+def configurar_engine(url: Optional[str] = None, **opciones):
+    """Crear (o reemplazar) el engine síncrono y su fábrica de sesiones."""
+    global _sync_engine, _sync_session_factory
+    url = url or Config.SQLALCHEMY_DATABASE_URI
+    if not opciones and make_url(url).get_backend_name() != 'sqlite':
+        opciones = getattr(Config, 'SQLALCHEMY_ENGINE_OPTIONS', {})
+    engine = create_engine(url, echo=getattr(Config, 'SQLALCHEMY_ECHO', False), **opciones)
+    with _lock:
+        _sync_engine = engine
+        _sync_session_factory = sessionmaker(bind=engine)
+    return engine
+
+
+def get_engine():
+    if _sync_engine is None:
+        with _lock:
+            if _sync_engine is None:
+                configurar_engine()
+    return _sync_engine
+
+
+def session_factory() -> sessionmaker:
+    get_engine()
+    return _sync_session_factory
+
+
+# ----- Engine asyncio -----
+
+
+def async_database_url(url: str) -> str:
+    """Convertir una URL síncrona (p. ej. `mysql+pymysql://`) a su driver asyncio."""
+    url = make_url(url)
+    driver = _DRIVERS_ASYNC.get(url.drivername, url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _opciones_engine(url: str) -> dict:
+    """Opciones de pool de `SQLALCHEMY_ENGINE_OPTIONS` válidas para el driver asyncio."""
+    if make_url(url).get_backend_name() == 'sqlite':
+        return {}
+    base = getattr(Config, 'SQLALCHEMY_ENGINE_OPTIONS', {})
+    opciones = {
+        clave: base[clave]
+        for clave in ('pool_pre_ping', 'pool_recycle', 'pool_timeout', 'pool_size', 'max_overflow')
+        if clave in base
+    }
+    connect_args = base.get('connect_args', {})
+    # aiomysql no acepta read_timeout/write_timeout de PyMySQL
+    opciones['connect_args'] = {
+        clave: connect_args[clave] for clave in ('connect_timeout', 'charset') if clave in connect_args
+    }
+    return opciones
+
+
+def configurar_async_engine(url: Optional[str] = None, **opciones):
+    """Crear (o reemplazar) el engine asyncio y su fábrica de sesiones."""
+    global _engine, _session_factory
+    url = url or Config.SQLALCHEMY_ASYNC_DATABASE_URI or async_database_url(Config.SQLALCHEMY_DATABASE_URI)
+    engine = create_async_engine(url, **(opciones or _opciones_engine(url)))
+    with _lock:
+        _engine = engine
+        _session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    return engine
+
+
+def get_async_engine():
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                configurar_async_engine()
+    return _engine
+
+
+def async_session_factory() -> async_sessionmaker:
+    get_async_engine()
+    return _session_factory
+
+
+async def dispose_engines():
+    """Cerrar los pools de ambos engines (al apagar la API)."""
+    global _sync_engine, _sync_session_factory, _engine, _session_factory
+    with _lock:
+        sync_engine, _sync_engine, _sync_session_factory = _sync_engine, None, None
+        engine, _engine, _session_factory = _engine, None, None
+    if sync_engine is not None:
+        sync_engine.dispose()
+    if engine is not None:
+        await engine.dispose()
+
+
+async def get_async_db():
+    """Dependencia FastAPI: un `AsyncSession` por petición."""
+    async with async_session_factory()() as session:
+        yield session
+
+
+class SyncSessionAdapter:
+    """Expone una `Session` síncrona con la interfaz awaitable de `AsyncSession`.
+
+    Sólo cubre lo que usan los repositorios. Las llamadas siguen siendo
+    bloqueantes: es el comportamiento previo cuando el modo asyncio está
+    desactivado.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, obj):
+        self.sync_session.add(obj)
+
+    def add_all(self, objs):
+        self.sync_session.add_all(objs)
+
+    async def get(self, *args, **kwargs):
+        return self.sync_session.get(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return self.sync_session.execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return self.sync_session.scalar(*args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return self.sync_session.scalars(*args, **kwargs)
+
+    async def flush(self, objects=None):
+        self.sync_session.flush(objects)
+
+    async def commit(self):
+        self.sync_session.commit()
+
+    async def rollback(self):
+        self.sync_session.rollback()
+
+    async def refresh(self, obj, attribute_names=None):
+        self.sync_session.refresh(obj, attribute_names)
+
+    async def delete(self, obj):
+        self.sync_session.delete(obj)
+
+    async def close(self):
+        self.sync_session.close()
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.sync_session, *args, **kwargs)
@@ -1,11 +1,15 @@
 """
 Dependencias comunes para FastAPI
 """
+from contextlib import contextmanager
 from typing import Optional
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from .models import db, Usuario
+from .models import Usuario
+from app.utils.principales import Principal, principales
+from .database import SyncSessionAdapter, async_session_factory, session_factory, usar_async_db
 import jwt
 from datetime import datetime, timedelta
 from config.config import Config
@@ -14,33 +18,32 @@ from config.config import Config
 security = HTTPBearer()
 
 
-async def get_db(request: Request):
-    """Obtener sesión de base de datos.
+def get_db():
+    """Obtener una sesión síncrona de base de datos.
 
-    Esta versión es `async` para asegurarse de que el `app_context` se
-    hace `push()` y `pop()` en el mismo hilo/loop donde FastAPI ejecuta la
-    dependencia (evita que el `finally` se ejecute en otro worker thread).
+    Sale del engine propio de la API (`database.session_factory`), sin
+    pasar por la app Flask ni por su `app_context`.
     """
-    flask_app = getattr(request.app.state, '_flask_app', None)
+    session = session_factory()()
+    try:
+        yield session
+    finally:
+        session.close()
+
 
-    # Si no hay Flask app en el state, devolvemos la sesión tal cual.
-    if flask_app is None:
-        try:
-            yield db.session
-        finally:
-            db.session.close()
+async def get_session():
+    """Sesión para los repositorios, según `Config.FASTAPI_ASYNC_DB`.
 
+    - Activado: `AsyncSession` del engine asyncio (no bloquea el event loop).
+    - Desactivado: la sesión síncrona de `get_db` envuelta en
+      `SyncSessionAdapter`, con la misma interfaz awaitable.
+    """
+    if usar_async_db():
+        async with async_session_factory()() as session:
+            yield session
     else:
-        ctx = flask_app.app_context()
-        ctx.push()
-        try:
-            yield db.session
-        finally:
-            # Cerrar la sesión y sacar el contexto en el mismo hilo
-            try:
-                db.session.close()
-            finally:
-                ctx.pop()
+        with contextmanager(get_db)() as session:
+            yield SyncSessionAdapter(session)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -79,16 +82,8 @@ def decode_access_token(token: str):
         )
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Obtener usuario actual desde el token.
-
-    Mantener la dependencia `HTTPBearer` permite que Swagger muestre
-    el botón Authorize. Aquí extraemos el token desde `credentials`
-    y lo validamos con `decode_access_token`.
-    """
+def _token_payload(credentials: Optional[HTTPAuthorizationCredentials]) -> dict:
+    """Validar el token de `credentials` y devolver sus claims."""
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -103,28 +98,70 @@ async def get_current_user(
         )
 
     payload = decode_access_token(token)
-
-    user_id = payload.get("user_id")
-    if user_id is None:
+    if payload.get("user_id") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido (sin user_id)"
         )
-
-    usuario = db.get(Usuario, user_id)
-    if usuario is None:
+    return payload
+
+
+async def _principal(payload: dict, db: AsyncSession) -> Principal:
+    """`Principal` del usuario del token: de la caché o, si falta, de la BD."""
+    user_id = payload["user_id"]
+    principal = principales.obtener(user_id)
+    if principal is None:
+        usuario = await db.get(Usuario, user_id)
+        if usuario is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuario no encontrado"
+            )
+        principal = principales.guardar(usuario)
+
+    if not principal.activo:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuario no encontrado"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Usuario inactivo"
         )
+    return principal
 
-    return usuario
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_session)
+) -> Principal:
+    """Obtener usuario actual desde el token.
+
+    Mantener la dependencia `HTTPBearer` permite que Swagger muestre
+    el botón Authorize. Aquí extraemos el token desde `credentials`
+    y lo validamos con `decode_access_token`.
+
+    Devuelve un `Principal` (id, rol, activo y datos de contacto) desde la
+    caché de `app.utils.principales`; sólo consulta la BD si el usuario no
+    está en caché. Para la fila completa usar `usuarios_service`.
+    """
+    return await _principal(_token_payload(credentials), db)
 
 
 async def require_admin(
-    current_user: Usuario = Depends(get_current_user)
-) -> Usuario:
-    """Requiere que el usuario sea administrador"""
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_session)
+) -> Principal:
+    """Requiere que el usuario sea administrador.
+
+    Si el token trae el claim `rol` y no es admin, se rechaza sin tocar la
+    caché ni la BD. Si dice admin, se confirma con el `Principal`, para que
+    un rol revocado deje de valer aunque el token siga vigente.
+    """
+    payload = _token_payload(credentials)
+    if payload.get("rol", "admin") != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acceso denegado: se requieren permisos de administrador"
+        )
+
+    current_user = await _principal(payload, db)
     if current_user.rol != 'admin':
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
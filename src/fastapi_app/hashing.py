@@ -0,0 +1,100 @@
+"""
+Hash de contraseñas (bcrypt) fuera del event loop.
+
+`bcrypt.checkpw`/`hashpw` tardan del orden de cientos de milisegundos por
+diseño. Ejecutados dentro de un handler `async` bloquean el event loop y,
+con varios logins simultáneos (inicio de turno), congelan la API para todos.
+
+`PasswordHasher` los ejecuta en un pool de hilos propio y acotado (bcrypt
+libera el GIL mientras calcula):
+
+- `BCRYPT_WORKERS` hilos como máximo.
+- `BCRYPT_MAX_PENDIENTES` operaciones en curso o en cola; por encima de
+  ese límite se lanza `HasherSaturado`, que la app responde con 503 en vez
+  de acumular peticiones que acabarían en timeout.
+- `BCRYPT_ROUNDS` es el factor de coste de los hashes nuevos; los hashes
+  existentes se verifican con el coste que llevan grabado.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from config.config import Config
+
+
+class HasherSaturado(Exception):
+    """El pool de bcrypt tiene la cola llena."""
+
+
+class PasswordHasher:
+    """Pool de hilos acotado para bcrypt."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_pendientes: Optional[int] = None,
+                 rounds: Optional[int] = None):
+        self.max_workers = max_workers or getattr(Config, 'BCRYPT_WORKERS', 4)
+        self.max_pendientes = max_pendientes or getattr(Config, 'BCRYPT_MAX_PENDIENTES', 64)
+        self.rounds = rounds or getattr(Config, 'BCRYPT_ROUNDS', 12)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pendientes = 0
+
+    @property
+    def pendientes(self) -> int:
+        return self._pendientes
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Se crea al primer uso: los hilos no sobreviven a un fork del worker
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bcrypt')
+            return self._executor
+
+    def _liberar(self, _futuro):
+        with self._lock:
+            self._pendientes -= 1
+
+    def _enviar(self, fn, *args):
+        pool = self._pool()
+        with self._lock:
+            if self._pendientes >= self.max_pendientes:
+                raise HasherSaturado()
+            self._pendientes += 1
+        try:
+            futuro = pool.submit(fn, *args)
+        except BaseException:
+            self._liberar(None)
+            raise
+        # El hueco se libera cuando termina el hilo, aunque el cliente cancele
+        futuro.add_done_callback(self._liberar)
+        return asyncio.wrap_future(futuro)
+
+    async def hash(self, password: str) -> str:
+        """Hash bcrypt de `password` con `BCRYPT_ROUNDS`."""
+        hashed = await self._enviar(self._hashpw, password.encode('utf-8'), self.rounds)
+        return hashed.decode('utf-8')
+
+    async def verificar(self, password: str, password_hash) -> bool:
+        """Comprobar `password` contra un hash bcrypt (str o bytes).
+
+        Lanza `ValueError` si el hash no tiene formato bcrypt.
+        """
+        if isinstance(password_hash, str):
+            password_hash = password_hash.encode('utf-8')
+        return await self._enviar(bcrypt.checkpw, password.encode('utf-8'), password_hash)
+
+    @staticmethod
+    def _hashpw(password: bytes, rounds: int) -> bytes:
+        return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+    def cerrar(self):
+        """Terminar los hilos del pool (al apagar la API)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,48 @@
+"""
+Paginación por cursor en los listados de la API (ver `app.utils.paginacion`).
+
+- `parametros_pagina` es la dependencia con `limit`, `cursor`, `fields` y
+  `count`.
+- `paginar` ejecuta la página con `AsyncSession` o `SyncSessionAdapter`.
+- `responder` pone `X-Next-Cursor`/`X-Total-Count` en la respuesta. Con
+  `fields` devuelve directamente la respuesta, porque los dicts parciales
+  no cumplen el `response_model` completo; con `directo=True` también, para
+  ahorrar la validación en los listados calientes (ver `respuestas`).
+"""
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.paginacion import (
+	Pagina, Parametros, ParametrosInvalidos, armar_pagina, cabeceras_pagina, consulta_pagina, consulta_total
+)
+from .respuestas import respuesta_directa
+
+
+def parametros_pagina(
+	limit: int = Query(50, ge=1, le=100, description="Límite de resultados"),
+	cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor"),
+	fields: Optional[str] = Query(None, description="Columnas separadas por comas"),
+	count: bool = Query(False, description="Incluir el total en X-Total-Count")
+) -> Parametros:
+	campos = [c.strip() for c in (fields or "").split(",") if c.strip()]
+	return Parametros(limit, cursor, campos or None, count)
+
+
+async def paginar(db: AsyncSession, query, modelo, orden, parametros: Parametros, opciones=()) -> Pagina:
+	try:
+		consulta = consulta_pagina(query, modelo, orden, parametros, opciones)
+	except ParametrosInvalidos as e:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+	total = await db.scalar(consulta_total(query)) if parametros.contar else None
+	return armar_pagina(await db.execute(consulta), orden, parametros, total)
+
+
+def responder(response: Response, pagina: Pagina, parametros: Parametros, serializar: Optional[Callable] = None, directo: bool = False):
+	cabeceras = cabeceras_pagina(pagina)
+	items = [serializar(item) for item in pagina.items] if serializar and not parametros.campos else pagina.items
+	if parametros.campos or directo:
+		return respuesta_directa(items, headers=cabeceras)
+	response.headers.update(cabeceras)
+	return items
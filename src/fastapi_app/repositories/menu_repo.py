@@ -2,45 +2,41 @@
 Repository layer para menu
 """
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import MenuItem
+from app.utils.menu_cache import menu_cache
 
 
-def list_menu(db: Session, disponible: Optional[bool] = None, categoria: Optional[str] = None, destacado: Optional[bool] = None) -> List[MenuItem]:
-    query = db.query(MenuItem)
-    if disponible is not None:
-        query = query.filter(MenuItem.disponible == disponible)
-    if categoria:
-        query = query.filter(MenuItem.categoria_nombre == categoria)
-    if destacado is not None:
-        query = query.filter(MenuItem.destacado == destacado)
-    return query.order_by(MenuItem.orden, MenuItem.nombre).all()
+async def list_menu(db: AsyncSession, disponible: Optional[bool] = None, categoria: Optional[str] = None, destacado: Optional[bool] = None) -> List[MenuItem]:
+    # Items desacoplados compartidos por la caché: sólo lectura
+    return await db.run_sync(menu_cache.items, disponible, categoria, destacado)
 
 
-def get_item(db: Session, item_id: int):
-    return db.get(MenuItem, item_id)
+async def get_item(db: AsyncSession, item_id: int):
+    return await db.get(MenuItem, item_id)
 
 
-def create_item(db: Session, item_obj: MenuItem):
+async def create_item(db: AsyncSession, item_obj: MenuItem):
     db.add(item_obj)
-    db.commit()
-    db.refresh(item_obj)
+    await db.commit()
+    await db.refresh(item_obj)
     return item_obj
 
 
-def update_item(db: Session, item: MenuItem):
-    db.commit()
-    db.refresh(item)
+async def update_item(db: AsyncSession, item: MenuItem):
+    await db.commit()
+    await db.refresh(item)
     return item
 
 
-def delete_item(db: Session, item: MenuItem):
-    db.delete(item)
-    db.commit()
+async def delete_item(db: AsyncSession, item: MenuItem):
+    await db.delete(item)
+    await db.commit()
 
 
-def list_categorias(db: Session):
-    categorias = db.query(MenuItem.categoria_nombre).distinct().filter(
-        MenuItem.categoria_nombre.isnot(None)
-    ).all()
-    return [c[0] for c in categorias if c[0]]
+async def list_categorias(db: AsyncSession):
+    categorias = await db.execute(
+        select(MenuItem.categoria_nombre).distinct().where(MenuItem.categoria_nombre.isnot(None))
+    )
+    return [c[0] for c in categorias.all() if c[0]]
@@ -1,45 +1,49 @@
 """
 Repository layer for mesas — encapsula queries a la base de datos.
 """
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from app.models import Mesa, Pedido
 
 
-def list_mesas(db: Session, disponible: Optional[bool] = None, tipo: Optional[str] = None) -> List[Mesa]:
-    query = db.query(Mesa)
+async def list_mesas(db: AsyncSession, disponible: Optional[bool] = None, tipo: Optional[str] = None) -> List[Mesa]:
+    query = select(Mesa)
     if disponible is not None:
-        query = query.filter(Mesa.disponible == disponible)
+        query = query.where(Mesa.disponible == disponible)
     if tipo:
-        query = query.filter(Mesa.tipo == tipo)
-    return query.order_by(Mesa.numero).all()
+        query = query.where(Mesa.tipo == tipo)
+    result = await db.execute(query.order_by(Mesa.numero))
+    return list(result.scalars().all())
 
 
-def get_mesa(db: Session, mesa_id: int) -> Optional[Mesa]:
-    return db.get(Mesa, mesa_id)
+async def get_mesa(db: AsyncSession, mesa_id: int) -> Optional[Mesa]:
+    return await db.get(Mesa, mesa_id)
 
 
-def create_mesa(db: Session, mesa_obj: Mesa) -> Mesa:
+async def create_mesa(db: AsyncSession, mesa_obj: Mesa) -> Mesa:
     db.add(mesa_obj)
-    db.commit()
-    db.refresh(mesa_obj)
+    await db.commit()
+    await db.refresh(mesa_obj)
     return mesa_obj
 
 
-def update_mesa(db: Session, mesa: Mesa) -> Mesa:
-    db.commit()
-    db.refresh(mesa)
+async def update_mesa(db: AsyncSession, mesa: Mesa) -> Mesa:
+    await db.commit()
+    await db.refresh(mesa)
     return mesa
 
 
-def delete_mesa(db: Session, mesa: Mesa) -> None:
-    db.delete(mesa)
-    db.commit()
+async def delete_mesa(db: AsyncSession, mesa: Mesa) -> None:
+    await db.delete(mesa)
+    await db.commit()
 
 
-def has_active_pedido(db: Session, mesa: Mesa) -> bool:
-    pedido_activo = db.query(Pedido).filter(
-        Pedido.mesa_id == mesa.id,
-        Pedido.estado.in_(['pendiente', 'preparando', 'enviado'])
-    ).first()
+async def has_active_pedido(db: AsyncSession, mesa: Mesa) -> bool:
+    pedido_activo = await db.scalar(
+        select(Pedido.id).where(
+            Pedido.mesa_id == mesa.id,
+            Pedido.estado.in_(['pendiente', 'preparando', 'enviado'])
+        ).limit(1)
+    )
     return pedido_activo is not None
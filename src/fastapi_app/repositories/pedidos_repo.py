@@ -1,46 +1,110 @@
 """
 Repository layer para pedidos: operaciones CRUD con Pedidos y PedidoItem.
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.models import Pedido, PedidoItem
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.models import MenuItem, Pedido, PedidoItem
+from app.utils.paginacion import Pagina, Parametros
+from ..paginacion import paginar
 
+# Orden de los listados: más recientes primero (keyset sobre fecha e id)
+ORDEN_PEDIDOS = [(Pedido.fecha_pedido, True), (Pedido.id, True)]
 
-def query_pedidos(db: Session, usuario_id: Optional[int] = None, estado: Optional[str] = None, tipo_servicio: Optional[str] = None, limit: int = 50) -> List[Pedido]:
-    query = db.query(Pedido)
+
+async def pagina_pedidos(db: AsyncSession, parametros: Parametros, usuario_id: Optional[int] = None, estado: Optional[str] = None, tipo_servicio: Optional[str] = None, with_items: bool = False) -> Pagina:
+    """Una página de pedidos filtrados.
+
+    Con `with_items=True` los items de toda la página se cargan en una sola
+    consulta adicional (`SELECT ... WHERE pedido_id IN (...)`) en lugar de
+    una consulta por pedido.
+    """
+    query = select(Pedido)
     if usuario_id is not None:
-        query = query.filter(Pedido.usuario_id == usuario_id)
+        query = query.where(Pedido.usuario_id == usuario_id)
     if estado:
-        query = query.filter(Pedido.estado == estado)
+        query = query.where(Pedido.estado == estado)
     if tipo_servicio:
-        query = query.filter(Pedido.tipo_servicio == tipo_servicio)
-    return query.order_by(Pedido.created_at.desc()).limit(limit).all()
+        query = query.where(Pedido.tipo_servicio == tipo_servicio)
+    opciones = [selectinload(Pedido.items)] if with_items else []
+    return await paginar(db, query, Pedido, ORDEN_PEDIDOS, parametros, opciones)
+
+
+async def query_pedidos(db: AsyncSession, usuario_id: Optional[int] = None, estado: Optional[str] = None, tipo_servicio: Optional[str] = None, limit: int = 50, with_items: bool = False) -> List[Pedido]:
+    """Primera página de pedidos filtrados, como lista."""
+    pagina = await pagina_pedidos(db, Parametros(limit, None, None, False), usuario_id, estado, tipo_servicio, with_items)
+    return pagina.items
 
 
-def get_pedido(db: Session, pedido_id: int) -> Optional[Pedido]:
-    return db.get(Pedido, pedido_id)
+async def get_pedido(db: AsyncSession, pedido_id: int) -> Optional[Pedido]:
+    return await db.get(Pedido, pedido_id)
 
 
-def add_pedido(db: Session, pedido: Pedido) -> Pedido:
+async def get_pedido_items(db: AsyncSession, pedido_id: int) -> List[PedidoItem]:
+    result = await db.execute(select(PedidoItem).where(PedidoItem.pedido_id == pedido_id))
+    return list(result.scalars().all())
+
+
+async def add_pedido(db: AsyncSession, pedido: Pedido) -> Pedido:
     db.add(pedido)
-    db.flush()
+    await db.flush()
     return pedido
 
 
-def add_pedido_item(db: Session, pedido_item: PedidoItem) -> PedidoItem:
+def add_pedido_item(db: AsyncSession, pedido_item: PedidoItem) -> PedidoItem:
     db.add(pedido_item)
     return pedido_item
 
 
-def commit(db: Session):
-    db.commit()
+async def add_pedidos(db: AsyncSession, pedidos: List[Pedido]) -> List[Pedido]:
+    """Agregar varios pedidos y hacer flush para obtener sus ids."""
+    db.add_all(pedidos)
+    await db.flush()
+    return pedidos
+
+
+async def insert_pedido_items(db: AsyncSession, filas: List[Dict]) -> None:
+    """Insertar los items (dicts con las columnas de `pedido_items`) en un solo INSERT."""
+    if filas:
+        await db.execute(insert(PedidoItem), filas)
+
+
+async def get_menu_items(db: AsyncSession, ids: Iterable[int]) -> Dict[int, MenuItem]:
+    """`{id: MenuItem}` de los ids dados, en una sola consulta."""
+    ids = set(ids)
+    if not ids:
+        return {}
+    result = await db.execute(select(MenuItem).where(MenuItem.id.in_(ids)))
+    return {item.id: item for item in result.scalars()}
+
+
+async def find_mesas_ocupadas(db: AsyncSession, mesa_ids: Iterable[int], excluir_usuario_id: int) -> Set[int]:
+    """Mesas (de `mesa_ids`) con un pedido activo de otro usuario."""
+    mesa_ids = set(mesa_ids)
+    if not mesa_ids:
+        return set()
+    result = await db.execute(select(Pedido.mesa_id).where(
+        Pedido.mesa_id.in_(mesa_ids),
+        Pedido.estado.in_(['pendiente', 'preparando', 'enviado']),
+        Pedido.usuario_id != excluir_usuario_id
+    ).distinct())
+    return set(result.scalars())
+
+
+async def commit(db: AsyncSession):
+    await db.commit()
+
+
+async def rollback(db: AsyncSession):
+    await db.rollback()
 
 
-def refresh(db: Session, obj):
-    db.refresh(obj)
+async def refresh(db: AsyncSession, obj):
+    await db.refresh(obj)
 
 
-def update_pedido(db: Session, pedido: Pedido) -> Pedido:
-    db.commit()
-    db.refresh(pedido)
+async def update_pedido(db: AsyncSession, pedido: Pedido) -> Pedido:
+    await db.commit()
+    await db.refresh(pedido)
     return pedido
@@ -2,31 +2,42 @@
 Repository layer para reservas
 """
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Reserva
+from app.utils.paginacion import Pagina, Parametros
+from ..paginacion import paginar
 
+# Orden de los listados: más recientes primero
+ORDEN_RESERVAS = [(Reserva.id, True)]
 
-def query_reservas(db: Session, usuario_id: Optional[int] = None, estado: Optional[str] = None, limit: int = 50) -> List[Reserva]:
-    query = db.query(Reserva)
+
+async def pagina_reservas(db: AsyncSession, parametros: Parametros, usuario_id: Optional[int] = None, estado: Optional[str] = None) -> Pagina:
+    query = select(Reserva)
     if usuario_id is not None:
-        query = query.filter(Reserva.usuario_id == usuario_id)
+        query = query.where(Reserva.usuario_id == usuario_id)
     if estado:
-        query = query.filter(Reserva.estado == estado)
-    return query.order_by(Reserva.fecha_reserva.desc()).limit(limit).all()
+        query = query.where(Reserva.estado == estado)
+    return await paginar(db, query, Reserva, ORDEN_RESERVAS, parametros)
+
+
+async def query_reservas(db: AsyncSession, usuario_id: Optional[int] = None, estado: Optional[str] = None, limit: int = 50) -> List[Reserva]:
+    pagina = await pagina_reservas(db, Parametros(limit, None, None, False), usuario_id, estado)
+    return pagina.items
 
 
-def get_reserva(db: Session, reserva_id: int) -> Optional[Reserva]:
-    return db.get(Reserva, reserva_id)
+async def get_reserva(db: AsyncSession, reserva_id: int) -> Optional[Reserva]:
+    return await db.get(Reserva, reserva_id)
 
 
-def add_reserva(db: Session, reserva: Reserva) -> Reserva:
+async def add_reserva(db: AsyncSession, reserva: Reserva) -> Reserva:
     db.add(reserva)
-    db.commit()
-    db.refresh(reserva)
+    await db.commit()
+    await db.refresh(reserva)
     return reserva
 
 
-def update_reserva(db: Session, reserva: Reserva) -> Reserva:
-    db.commit()
-    db.refresh(reserva)
+async def update_reserva(db: AsyncSession, reserva: Reserva) -> Reserva:
+    await db.commit()
+    await db.refresh(reserva)
     return reserva
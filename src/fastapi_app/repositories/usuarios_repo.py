@@ -2,40 +2,52 @@
 Repository layer para usuarios
 """
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Usuario
+from app.utils.paginacion import Pagina, Parametros
+from ..paginacion import paginar
 
+# Orden de los listados: registrados más recientemente primero
+ORDEN_USUARIOS = [(Usuario.id, True)]
 
-def list_usuarios(db: Session, activo: Optional[bool] = None, rol: Optional[str] = None, limit: int = 50) -> List[Usuario]:
-    query = db.query(Usuario)
+
+async def pagina_usuarios(db: AsyncSession, parametros: Parametros, activo: Optional[bool] = None, rol: Optional[str] = None) -> Pagina:
+    query = select(Usuario)
     if activo is not None:
-        query = query.filter(Usuario.activo == activo)
+        query = query.where(Usuario.activo == activo)
     if rol:
-        query = query.filter(Usuario.rol == rol)
-    return query.order_by(Usuario.fecha_registro.desc()).limit(limit).all()
+        query = query.where(Usuario.rol == rol)
+    return await paginar(db, query, Usuario, ORDEN_USUARIOS, parametros)
+
+
+async def list_usuarios(db: AsyncSession, activo: Optional[bool] = None, rol: Optional[str] = None, limit: int = 50) -> List[Usuario]:
+    pagina = await pagina_usuarios(db, Parametros(limit, None, None, False), activo, rol)
+    return pagina.items
 
 
-def get_usuario(db: Session, usuario_id: int) -> Optional[Usuario]:
-    return db.get(Usuario, usuario_id)
+async def get_usuario(db: AsyncSession, usuario_id: int) -> Optional[Usuario]:
+    return await db.get(Usuario, usuario_id)
 
 
-def find_by_email(db: Session, email: str) -> Optional[Usuario]:
-    return db.query(Usuario).filter(Usuario.email == email).first()
+async def find_by_email(db: AsyncSession, email: str) -> Optional[Usuario]:
+    result = await db.execute(select(Usuario).where(Usuario.email == email).limit(1))
+    return result.scalars().first()
 
 
-def create_usuario(db: Session, usuario: Usuario) -> Usuario:
+async def create_usuario(db: AsyncSession, usuario: Usuario) -> Usuario:
     db.add(usuario)
-    db.commit()
-    db.refresh(usuario)
+    await db.commit()
+    await db.refresh(usuario)
     return usuario
 
 
-def update_usuario(db: Session, usuario: Usuario) -> Usuario:
-    db.commit()
-    db.refresh(usuario)
+async def update_usuario(db: AsyncSession, usuario: Usuario) -> Usuario:
+    await db.commit()
+    await db.refresh(usuario)
     return usuario
 
 
-def delete_usuario(db: Session, usuario: Usuario) -> None:
-    db.delete(usuario)
-    db.commit()
+async def delete_usuario(db: AsyncSession, usuario: Usuario) -> None:
+    await db.delete(usuario)
+    await db.commit()
@@ -0,0 +1,28 @@
+"""
+Respuestas JSON codificadas con `app.utils.json_rapido` (orjson).
+
+Con `response_model`, FastAPI ya valida y serializa con Pydantic; esta clase
+es para las rutas que devuelven la respuesta directamente:
+
+- `RespuestaJSON`: como `JSONResponse`, pero acepta `Decimal`, fechas y
+  horas sin pasar por `jsonable_encoder`.
+- `respuesta_directa`: modo sin `response_model` para listados calientes.
+  Los dicts se envían tal cual, sin volver a validarlos contra el esquema,
+  así que quien la usa garantiza que ya tienen su forma (p. ej.
+  `_pedido_to_dict` para `PedidoResponse`). El esquema sigue declarado en
+  el decorador para la documentación.
+"""
+from typing import Any, Mapping, Optional
+
+from fastapi.responses import JSONResponse
+
+from app.utils import json_rapido
+
+
+class RespuestaJSON(JSONResponse):
+	def render(self, content: Any) -> bytes:
+		return json_rapido.dumps(content)
+
+
+def respuesta_directa(contenido: Any, headers: Optional[Mapping[str, str]] = None, status_code: int = 200) -> RespuestaJSON:
+	return RespuestaJSON(contenido, status_code=status_code, headers=headers)
@@ -2,8 +2,8 @@
 Routers de autenticación (login/register) usando auth_service
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..dependencies import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..dependencies import get_session
 from ..schemas import LoginRequest, LoginResponse, RegisterRequest, MessageResponse
 from ..services.auth_service import login_user, register_user
 
@@ -11,8 +11,8 @@ router = APIRouter()
 
 
 @router.post("/auth/login", response_model=LoginResponse)
-async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
-	res, status_code = login_user(db, credentials.email, credentials.password)
+async def login(credentials: LoginRequest, db: AsyncSession = Depends(get_session)):
+	res, status_code = await login_user(db, credentials.email, credentials.password)
 	if status_code != 'ok':
 		if status_code == 'inactive':
 			raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuario inactivo")
@@ -21,8 +21,8 @@ async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/auth/register", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: RegisterRequest, db: Session = Depends(get_db)):
-	ok, reason = register_user(db, user_data)
+async def register(user_data: RegisterRequest, db: AsyncSession = Depends(get_session)):
+	ok, reason = await register_user(db, user_data)
 	if not ok:
 		if reason == 'exists':
 			raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El email ya está registrado")
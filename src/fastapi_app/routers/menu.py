@@ -1,32 +1,57 @@
 """
 Routers para menú (usa service + repository)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_db, require_admin
+from ..dependencies import get_session, require_admin
 from ..schemas import MenuItemResponse, MenuItemCreate, MenuItemUpdate, MessageResponse
 from ..services.menu_service import (
-	obtener_menu, obtener_item, crear_item, actualizar_item, eliminar_item, obtener_categorias
+	obtener_menu_json, obtener_item, crear_item, actualizar_item, eliminar_item, obtener_categorias_json
 )
 
 router = APIRouter()
 
 
+def _etag_coincide(request: Request, etag: str) -> bool:
+	"""Comparación débil de `If-None-Match` (RFC 9110)."""
+	cabecera = request.headers.get("if-none-match")
+	if not cabecera:
+		return False
+	for valor in cabecera.split(","):
+		valor = valor.strip()
+		if valor == "*":
+			return True
+		if valor.startswith("W/"):
+			valor = valor[2:]
+		if valor.strip('"') == etag:
+			return True
+	return False
+
+
+def _respuesta_cacheada(request: Request, entrada) -> Response:
+	"""Cuerpo JSON precodificado con ETag, o 304 si el cliente ya lo tiene."""
+	headers = {"ETag": f'"{entrada.etag}"', "Cache-Control": "no-cache"}
+	if _etag_coincide(request, entrada.etag):
+		return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+	return Response(content=entrada.cuerpo, media_type="application/json", headers=headers)
+
+
 @router.get("/menu", response_model=List[MenuItemResponse])
 async def api_obtener_menu(
+	request: Request,
 	disponible: Optional[bool] = Query(None, description="Filtrar por disponibilidad"),
 	categoria: Optional[str] = Query(None, description="Filtrar por categoría"),
 	destacado: Optional[bool] = Query(None, description="Solo items destacados"),
-	db: Session = Depends(get_db)
+	db: AsyncSession = Depends(get_session)
 ):
-	return obtener_menu(db, disponible, categoria, destacado)
+	return _respuesta_cacheada(request, await obtener_menu_json(db, disponible, categoria, destacado))
 
 
 @router.get("/menu/{item_id}", response_model=MenuItemResponse)
-async def api_obtener_item(item_id: int, db: Session = Depends(get_db)):
-	item = obtener_item(db, item_id)
+async def api_obtener_item(item_id: int, db: AsyncSession = Depends(get_session)):
+	item = await obtener_item(db, item_id)
 	if not item:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item no encontrado")
 	return item
@@ -35,20 +60,20 @@ async def api_obtener_item(item_id: int, db: Session = Depends(get_db)):
 @router.post("/menu", response_model=MenuItemResponse, status_code=status.HTTP_201_CREATED)
 async def api_crear_item(
 	item_data: MenuItemCreate,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(require_admin)
 ):
-	return crear_item(db, item_data)
+	return await crear_item(db, item_data)
 
 
 @router.put("/menu/{item_id}", response_model=MenuItemResponse)
 async def api_actualizar_item(
 	item_id: int,
 	item_data: MenuItemUpdate,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(require_admin)
 ):
-	updated = actualizar_item(db, item_id, item_data)
+	updated = await actualizar_item(db, item_id, item_data)
 	if not updated:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item no encontrado")
 	return updated
@@ -57,16 +82,16 @@ async def api_actualizar_item(
 @router.delete("/menu/{item_id}", response_model=MessageResponse)
 async def api_eliminar_item(
 	item_id: int,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(require_admin)
 ):
-	ok, reason = eliminar_item(db, item_id)
+	ok, reason = await eliminar_item(db, item_id)
 	if not ok:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item no encontrado")
 	return {"message": f"Item eliminado exitosamente", "success": True}
 
 
 @router.get("/categorias", response_model=List[str])
-async def api_obtener_categorias(db: Session = Depends(get_db)):
-	return obtener_categorias(db)
+async def api_obtener_categorias(request: Request, db: AsyncSession = Depends(get_session)):
+	return _respuesta_cacheada(request, await obtener_categorias_json(db))
 
@@ -3,9 +3,9 @@ Routers de mesas (usa service + repository).
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_db, require_admin
+from ..dependencies import get_session, require_admin
 from ..schemas import MesaResponse, MesaCreate, MesaUpdate, MessageResponse
 from ..services.mesas_service import (
 	obtener_mesas, obtener_mesa, crear_mesa, actualizar_mesa, eliminar_mesa
@@ -18,14 +18,14 @@ router = APIRouter()
 async def api_obtener_mesas(
 	disponible: Optional[bool] = Query(None, description="Filtrar por disponibilidad"),
 	tipo: Optional[str] = Query(None, description="Filtrar por tipo (interior, terraza, vip)"),
-	db: Session = Depends(get_db)
+	db: AsyncSession = Depends(get_session)
 ):
-	return obtener_mesas(db, disponible, tipo)
+	return await obtener_mesas(db, disponible, tipo)
 
 
 @router.get("/mesas/{mesa_id}", response_model=MesaResponse)
-async def api_obtener_mesa(mesa_id: int, db: Session = Depends(get_db)):
-	res = obtener_mesa(db, mesa_id)
+async def api_obtener_mesa(mesa_id: int, db: AsyncSession = Depends(get_session)):
+	res = await obtener_mesa(db, mesa_id)
 	if not res:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mesa no encontrada")
 	return res
@@ -34,20 +34,20 @@ async def api_obtener_mesa(mesa_id: int, db: Session = Depends(get_db)):
 @router.post("/mesas", response_model=MesaResponse, status_code=status.HTTP_201_CREATED)
 async def api_crear_mesa(
 	mesa_data: MesaCreate,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(require_admin)
 ):
-	return crear_mesa(db, mesa_data)
+	return await crear_mesa(db, mesa_data)
 
 
 @router.put("/mesas/{mesa_id}", response_model=MesaResponse)
 async def api_actualizar_mesa(
 	mesa_id: int,
 	mesa_data: MesaUpdate,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(require_admin)
 ):
-	updated = actualizar_mesa(db, mesa_id, mesa_data)
+	updated = await actualizar_mesa(db, mesa_id, mesa_data)
 	if not updated:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mesa no encontrada")
 	return updated
@@ -56,10 +56,10 @@ async def api_actualizar_mesa(
 @router.delete("/mesas/{mesa_id}", response_model=MessageResponse)
 async def api_eliminar_mesa(
 	mesa_id: int,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(require_admin)
 ):
-	ok, reason = eliminar_mesa(db, mesa_id)
+	ok, reason = await eliminar_mesa(db, mesa_id)
 	if not ok:
 		if reason == 'not_found':
 			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mesa no encontrada")
@@ -1,14 +1,15 @@
 """
 Routers para pedidos (usa service + repository)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from ..dependencies import get_db, get_current_user
-from ..schemas import PedidoResponse, PedidoCreate, PedidoUpdate, MessageResponse
+from ..dependencies import get_session, get_current_user
+from ..paginacion import Parametros, parametros_pagina, responder
+from ..schemas import PedidoResponse, PedidoCreate, PedidoBatchCreate, PedidoUpdate, MessageResponse
 from ..services.pedidos_service import (
-	obtener_pedidos, obtener_pedido, crear_pedido, actualizar_pedido
+	obtener_pagina_pedidos, obtener_pedido, crear_pedido, crear_pedidos, actualizar_pedido
 )
 
 router = APIRouter()
@@ -16,22 +17,25 @@ router = APIRouter()
 
 @router.get("/pedidos", response_model=List[PedidoResponse])
 async def api_obtener_pedidos(
+	response: Response,
 	estado: Optional[str] = Query(None, description="Filtrar por estado"),
 	tipo_servicio: Optional[str] = Query(None, description="Filtrar por tipo de servicio"),
-	limit: int = Query(50, le=100, description="Límite de resultados"),
-	db: Session = Depends(get_db),
+	pagina: Parametros = Depends(parametros_pagina),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
-	return obtener_pedidos(db, current_user, estado, tipo_servicio, limit)
+	# Los dicts de `_pedido_to_dict` ya tienen la forma de `PedidoResponse`:
+	# se envían sin volver a validarlos
+	return responder(response, await obtener_pagina_pedidos(db, current_user, pagina, estado, tipo_servicio), pagina, directo=True)
 
 
 @router.get("/pedidos/{pedido_id}", response_model=PedidoResponse)
 async def api_obtener_pedido(
 	pedido_id: int,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
-	res = obtener_pedido(db, pedido_id, current_user)
+	res = await obtener_pedido(db, pedido_id, current_user)
 	if res is None:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pedido no encontrado")
 	if res == 'forbidden':
@@ -42,11 +46,24 @@ async def api_obtener_pedido(
 @router.post("/pedidos", response_model=PedidoResponse, status_code=status.HTTP_201_CREATED)
 async def api_crear_pedido(
 	pedido_data: PedidoCreate,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
 	try:
-		return crear_pedido(db, pedido_data, current_user)
+		return await crear_pedido(db, pedido_data, current_user)
+	except ValueError as exc:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.post("/pedidos/batch", response_model=List[PedidoResponse], status_code=status.HTTP_201_CREATED)
+async def api_crear_pedidos(
+	batch: PedidoBatchCreate,
+	db: AsyncSession = Depends(get_session),
+	current_user = Depends(get_current_user)
+):
+	"""Crear varios pedidos en una petición (kiosco de piscina). Todo o nada."""
+	try:
+		return await crear_pedidos(db, batch.pedidos, current_user)
 	except ValueError as exc:
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
@@ -55,10 +72,10 @@ async def api_crear_pedido(
 async def api_actualizar_pedido(
 	pedido_id: int,
 	pedido_data: PedidoUpdate,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
-	res = actualizar_pedido(db, pedido_id, pedido_data, current_user)
+	res = await actualizar_pedido(db, pedido_id, pedido_data, current_user)
 	if res is None:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pedido no encontrado")
 	if res == 'forbidden':
@@ -1,14 +1,16 @@
 """
 Routers para reservas (usa service + repository)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_db, get_current_user
+from app.utils.franjas_reserva import MesaOcupada
+from ..dependencies import get_session, get_current_user
+from ..paginacion import Parametros, parametros_pagina, responder
 from ..schemas import ReservaResponse, ReservaCreate, ReservaUpdate, MessageResponse
 from ..services.reservas_service import (
-	obtener_reservas, obtener_reserva, crear_reserva, actualizar_reserva, cancelar_reserva
+	obtener_pagina_reservas, obtener_reserva, crear_reserva, actualizar_reserva, cancelar_reserva
 )
 
 router = APIRouter()
@@ -16,21 +18,22 @@ router = APIRouter()
 
 @router.get("/reservas", response_model=List[ReservaResponse])
 async def api_obtener_reservas(
+	response: Response,
 	estado: Optional[str] = Query(None, description="Filtrar por estado"),
-	limit: int = Query(50, le=100, description="Límite de resultados"),
-	db: Session = Depends(get_db),
+	pagina: Parametros = Depends(parametros_pagina),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
-	return obtener_reservas(db, current_user, estado, limit)
+	return responder(response, await obtener_pagina_reservas(db, current_user, pagina, estado), pagina)
 
 
 @router.get("/reservas/{reserva_id}", response_model=ReservaResponse)
 async def api_obtener_reserva(
 	reserva_id: int,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
-	res = obtener_reserva(db, reserva_id, current_user)
+	res = await obtener_reserva(db, reserva_id, current_user)
 	if res is None:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reserva no encontrada")
 	if res == 'forbidden':
@@ -41,23 +44,30 @@ async def api_obtener_reserva(
 @router.post("/reservas", response_model=ReservaResponse, status_code=status.HTTP_201_CREATED)
 async def api_crear_reserva(
 	reserva_data: ReservaCreate,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
 	try:
-		return crear_reserva(db, reserva_data, current_user)
+		return await crear_reserva(db, reserva_data, current_user)
 	except ValueError as exc:
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+	except MesaOcupada as exc:
+		await db.rollback()
+		raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
 
 
 @router.put("/reservas/{reserva_id}", response_model=ReservaResponse)
 async def api_actualizar_reserva(
 	reserva_id: int,
 	reserva_data: ReservaUpdate,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
-	res = actualizar_reserva(db, reserva_id, reserva_data, current_user)
+	try:
+		res = await actualizar_reserva(db, reserva_id, reserva_data, current_user)
+	except MesaOcupada as exc:
+		await db.rollback()
+		raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
 	if res is None:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reserva no encontrada")
 	if res == 'forbidden':
@@ -68,10 +78,10 @@ async def api_actualizar_reserva(
 @router.delete("/reservas/{reserva_id}", response_model=MessageResponse)
 async def api_cancelar_reserva(
 	reserva_id: int,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
-	ok, reason = cancelar_reserva(db, reserva_id, current_user)
+	ok, reason = await cancelar_reserva(db, reserva_id, current_user)
 	if not ok:
 		if reason == 'not_found':
 			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reserva no encontrada")
@@ -0,0 +1,87 @@
+"""
+Router del stream de eventos en tiempo real (Server-Sent Events).
+"""
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils import json_rapido
+from config.config import Config
+from ..dependencies import _principal, _token_payload, get_session
+from ..stream import TEMAS, TEMAS_POR_ROL, canal_eventos, filtro_para
+
+router = APIRouter()
+
+# EventSource no permite cabeceras: el token también se acepta en `?token=`
+bearer_opcional = HTTPBearer(auto_error=False)
+
+
+def _formato(mensaje) -> str:
+	datos = json_rapido.dumps(mensaje.datos).decode('utf-8')
+	return f"id: {mensaje.id}\nevent: {mensaje.tema}\ndata: {datos}\n\n"
+
+
+async def _emitir(request: Request, suscripcion, perdidos, heartbeat: float):
+	try:
+		yield "retry: 3000\n\n"
+		if perdidos is None:
+			# El Last-Event-ID ya no está en el buffer: el cliente debe recargar
+			yield "event: reinicio\ndata: {}\n\n"
+		else:
+			for mensaje in perdidos:
+				yield _formato(mensaje)
+		while True:
+			try:
+				mensaje = await asyncio.wait_for(suscripcion.cola.get(), heartbeat)
+			except asyncio.TimeoutError:
+				if await request.is_disconnected():
+					break
+				yield ": ping\n\n"
+				continue
+			if mensaje is None:
+				# Cliente lento o app cerrando: reconectará con Last-Event-ID
+				break
+			yield _formato(mensaje)
+	finally:
+		canal_eventos.desuscribir(suscripcion)
+
+
+@router.get("/stream")
+async def api_stream(
+	request: Request,
+	topics: str = Query(",".join(sorted(TEMAS)), description="Temas separados por comas: pedidos, mesas, reservas"),
+	token: Optional[str] = Query(None, description="JWT, para clientes EventSource sin cabeceras"),
+	last_event_id: Optional[str] = Header(None),
+	credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_opcional),
+	db: AsyncSession = Depends(get_session)
+):
+	if credentials is None and token:
+		credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+	current_user = await _principal(_token_payload(credentials), db)
+	# La conexión dura horas: no retener la sesión (ni su conexión del pool)
+	await db.close()
+
+	temas = {t.strip() for t in topics.split(",") if t.strip()}
+	desconocidos = temas - TEMAS
+	if not temas or desconocidos:
+		raise HTTPException(
+			status_code=status.HTTP_400_BAD_REQUEST,
+			detail=f"Temas no válidos: {', '.join(sorted(desconocidos)) or 'ninguno'}"
+		)
+	no_permitidos = temas - TEMAS_POR_ROL.get(current_user.rol, frozenset())
+	if no_permitidos:
+		raise HTTPException(
+			status_code=status.HTTP_403_FORBIDDEN,
+			detail=f"Sin permiso para: {', '.join(sorted(no_permitidos))}"
+		)
+
+	suscripcion, perdidos = canal_eventos.suscribir(temas, filtro_para(current_user), last_event_id)
+	return StreamingResponse(
+		_emitir(request, suscripcion, perdidos, getattr(Config, 'STREAM_HEARTBEAT', 15)),
+		media_type="text/event-stream",
+		headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+	)
@@ -1,12 +1,13 @@
 """Routers de usuarios (usa service + repository)."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from ..dependencies import get_db, get_current_user, require_admin
+from ..dependencies import get_session, get_current_user, require_admin
+from ..paginacion import Parametros, parametros_pagina, responder
 from ..schemas import UsuarioResponse, UsuarioCreate, UsuarioUpdate, MessageResponse
 from ..services.usuarios_service import (
-	obtener_usuarios, obtener_usuario, crear_usuario_admin, actualizar_usuario, eliminar_usuario
+	obtener_pagina_usuarios, obtener_usuario, crear_usuario_admin, actualizar_usuario, eliminar_usuario
 )
 
 router = APIRouter()
@@ -14,27 +15,35 @@ router = APIRouter()
 
 @router.get("/usuarios", response_model=List[UsuarioResponse])
 async def api_obtener_usuarios(
+	response: Response,
 	activo: Optional[bool] = Query(None, description="Filtrar por estado activo"),
 	rol: Optional[str] = Query(None, description="Filtrar por rol"),
-	limit: int = Query(50, le=100, description="Límite de resultados"),
-	db: Session = Depends(get_db),
+	pagina: Parametros = Depends(parametros_pagina),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(require_admin)
 ):
-	return obtener_usuarios(db, activo, rol, limit)
+	return responder(response, await obtener_pagina_usuarios(db, pagina, activo, rol), pagina)
 
 
 @router.get("/usuarios/me", response_model=UsuarioResponse)
-async def api_obtener_perfil(current_user = Depends(get_current_user)):
-	return current_user
+async def api_obtener_perfil(
+	db: AsyncSession = Depends(get_session),
+	current_user = Depends(get_current_user)
+):
+	# `current_user` es el principal en caché; el perfil necesita la fila completa
+	usuario = await obtener_usuario(db, current_user.id, current_user)
+	if usuario is None:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+	return usuario
 
 
 @router.get("/usuarios/{usuario_id}", response_model=UsuarioResponse)
 async def api_obtener_usuario(
 	usuario_id: int,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
-	res = obtener_usuario(db, usuario_id, current_user)
+	res = await obtener_usuario(db, usuario_id, current_user)
 	if res is None:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
 	if res == 'forbidden':
@@ -45,11 +54,11 @@ async def api_obtener_usuario(
 @router.post("/usuarios", response_model=UsuarioResponse, status_code=status.HTTP_201_CREATED)
 async def api_crear_usuario(
 	usuario_data: UsuarioCreate,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(require_admin)
 ):
 	try:
-		return crear_usuario_admin(db, usuario_data)
+		return await crear_usuario_admin(db, usuario_data)
 	except ValueError as exc:
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
@@ -58,10 +67,10 @@ async def api_crear_usuario(
 async def api_actualizar_usuario(
 	usuario_id: int,
 	usuario_data: UsuarioUpdate,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(get_current_user)
 ):
-	res = actualizar_usuario(db, usuario_id, usuario_data, current_user)
+	res = await actualizar_usuario(db, usuario_id, usuario_data, current_user)
 	if res is None:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
 	if res == 'forbidden':
@@ -74,10 +83,10 @@ async def api_actualizar_usuario(
 @router.delete("/usuarios/{usuario_id}", response_model=MessageResponse)
 async def api_eliminar_usuario(
 	usuario_id: int,
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_session),
 	current_user = Depends(require_admin)
 ):
-	ok, reason = eliminar_usuario(db, usuario_id, current_user)
+	ok, reason = await eliminar_usuario(db, usuario_id, current_user)
 	if not ok:
 		if reason == 'cannot_delete_self':
 			raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No puedes eliminar tu propia cuenta")
@@ -8,6 +8,8 @@ from datetime import datetime
 import uuid
 from ..dependencies import get_db, get_current_user
 from ..schemas import PedidoResponse, PedidoCreate, PedidoUpdate, MessageResponse
+from ..database import SyncSessionAdapter
+from ..repositories.pedidos_repo import query_pedidos
 from ...app.models import Usuario, Pedido, PedidoItem, MenuItem, Mesa
 
 router = APIRouter()
@@ -23,25 +25,15 @@ async def obtener_pedidos(
 ):
     """Obtener pedidos del usuario (o todos si es admin)"""
     
-    query = db.query(Pedido)
-    
     # Si no es admin, solo ver sus propios pedidos
-    if current_user.rol != 'admin':
-        query = query.filter(Pedido.usuario_id == current_user.id)
-    
-    if estado:
-        query = query.filter(Pedido.estado == estado)
+    usuario_id = None if current_user.rol == 'admin' else current_user.id
     
-    if tipo_servicio:
-        query = query.filter(Pedido.tipo_servicio == tipo_servicio)
-    
-    pedidos = query.order_by(Pedido.created_at.desc()).limit(limit).all()
+    # Los items de toda la página se cargan en una sola consulta
+    pedidos = await query_pedidos(SyncSessionAdapter(db), usuario_id, estado, tipo_servicio, limit, with_items=True)
     
     # Incluir items de cada pedido
     result = []
     for pedido in pedidos:
-        items = db.query(PedidoItem).filter(PedidoItem.pedido_id == pedido.id).all()
-        
         pedido_dict = {
             "id": pedido.id,
             "usuario_id": pedido.usuario_id,
@@ -55,7 +47,7 @@ async def obtener_pedidos(
             "fecha_pedido": pedido.fecha_pedido,
             "items": [
                 {
-                    "id": item.id,
+                    "id": 0,  # PedidoItem usa clave compuesta (pedido_id, menu_item_id)
                     "pedido_id": item.pedido_id,
                     "menu_item_id": item.menu_item_id,
                     "cantidad": item.cantidad,
@@ -63,7 +55,7 @@ async def obtener_pedidos(
                     "nombre_item": item.nombre_item,
                     "subtotal": item.subtotal
                 }
-                for item in items
+                for item in pedido.items
             ]
         }
         result.append(pedido_dict)
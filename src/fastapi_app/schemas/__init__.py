@@ -141,7 +141,8 @@ class PedidoItemBase(BaseModel):
 
 
 class PedidoItemCreate(PedidoItemBase):
-    pass
+    # Se ignora: el servidor usa el precio vigente del menú
+    precio_unitario: Optional[Decimal] = None
 
 
 class PedidoItemResponse(PedidoItemBase):
@@ -163,6 +164,10 @@ class PedidoCreate(BaseModel):
     instrucciones_entrega: Optional[str] = None
 
 
+class PedidoBatchCreate(BaseModel):
+    pedidos: List[PedidoCreate] = Field(..., min_length=1, max_length=50)
+
+
 class PedidoUpdate(BaseModel):
     estado: Optional[str] = None
     mesa_id: Optional[int] = None
@@ -195,6 +200,8 @@ class ReservaCreate(BaseModel):
     email_cliente: Optional[EmailStr] = None
     ocasion_especial: Optional[str] = None
     notas: Optional[str] = None
+    mesa_asignada: Optional[str] = None  # número de mesa, o varios separados por comas
+    duracion_estimada: Optional[int] = Field(None, gt=0)  # horas
 
 
 class ReservaUpdate(BaseModel):
@@ -202,6 +209,7 @@ class ReservaUpdate(BaseModel):
     fecha_reserva: Optional[str] = None
     numero_personas: Optional[int] = None
     notas: Optional[str] = None
+    mesa_asignada: Optional[str] = None
 
 
 class ReservaResponse(BaseModel):
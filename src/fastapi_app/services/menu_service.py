@@ -2,22 +2,39 @@
 Service layer para menu — lógica de negocio de items del menú
 """
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import MenuItem
+from app.utils import json_rapido
+from app.utils.menu_cache import menu_cache, JSONCacheado
+from ..schemas import MenuItemResponse
 from ..repositories.menu_repo import (
     list_menu, get_item, create_item, update_item, delete_item, list_categorias
 )
 
 
-def obtener_menu(db: Session, disponible: Optional[bool] = None, categoria: Optional[str] = None, destacado: Optional[bool] = None) -> List[MenuItem]:
-    return list_menu(db, disponible, categoria, destacado)
+async def obtener_menu(db: AsyncSession, disponible: Optional[bool] = None, categoria: Optional[str] = None, destacado: Optional[bool] = None) -> List[MenuItem]:
+    return await list_menu(db, disponible, categoria, destacado)
 
 
-def obtener_item(db: Session, item_id: int):
-    return get_item(db, item_id)
+async def obtener_menu_json(db: AsyncSession, disponible: Optional[bool] = None, categoria: Optional[str] = None, destacado: Optional[bool] = None) -> JSONCacheado:
+    """Menú serializado como `List[MenuItemResponse]`, ya codificado y con ETag."""
+    async def construir():
+        return [
+            MenuItemResponse.model_validate(item).model_dump(mode="json")
+            for item in await list_menu(db, disponible, categoria, destacado)
+        ]
+    return await menu_cache.json_async(("v1.menu", disponible, categoria, destacado), construir, json_rapido.dumps)
 
 
-def crear_item(db: Session, item_data) -> MenuItem:
+async def obtener_categorias_json(db: AsyncSession) -> JSONCacheado:
+    return await menu_cache.json_async(("v1.categorias",), lambda: list_categorias(db), json_rapido.dumps)
+
+
+async def obtener_item(db: AsyncSession, item_id: int):
+    return await get_item(db, item_id)
+
+
+async def crear_item(db: AsyncSession, item_data) -> MenuItem:
     nuevo = MenuItem(
         restaurante_id=item_data.restaurante_id,
         nombre=item_data.nombre,
@@ -29,25 +46,30 @@ def crear_item(db: Session, item_data) -> MenuItem:
         disponible=item_data.disponible,
         destacado=item_data.destacado
     )
-    return create_item(db, nuevo)
+    creado = await create_item(db, nuevo)
+    menu_cache.invalidar()
+    return creado
 
 
-def actualizar_item(db: Session, item_id: int, item_data):
-    item = get_item(db, item_id)
+async def actualizar_item(db: AsyncSession, item_id: int, item_data):
+    item = await get_item(db, item_id)
     if not item:
         return None
     for field, value in item_data.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
-    return update_item(db, item)
+    actualizado = await update_item(db, item)
+    menu_cache.invalidar()
+    return actualizado
 
 
-def eliminar_item(db: Session, item_id: int):
-    item = get_item(db, item_id)
+async def eliminar_item(db: AsyncSession, item_id: int):
+    item = await get_item(db, item_id)
     if not item:
         return False, "not_found"
-    delete_item(db, item)
+    await delete_item(db, item)
+    menu_cache.invalidar()
     return True, "deleted"
 
 
-def obtener_categorias(db: Session):
-    return list_categorias(db)
+async def obtener_categorias(db: AsyncSession):
+    return await list_categorias(db)
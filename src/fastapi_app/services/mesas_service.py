@@ -2,18 +2,20 @@
 Service layer for mesas — lógica de negocio independiente de web.
 """
 from typing import Optional, List, Dict
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Mesa
+from app.utils.ocupacion_mesas import ocupacion_mesas
 from ..repositories.mesas_repo import (
     list_mesas, get_mesa, create_mesa, update_mesa, delete_mesa, has_active_pedido
 )
 
 
-def obtener_mesas(db: Session, disponible: Optional[bool] = None, tipo: Optional[str] = None) -> List[Dict]:
-    mesas = list_mesas(db, disponible, tipo)
+async def obtener_mesas(db: AsyncSession, disponible: Optional[bool] = None, tipo: Optional[str] = None) -> List[Dict]:
+    mesas = await list_mesas(db, disponible, tipo)
+    ocupadas = await db.run_sync(ocupacion_mesas.mesas_ocupadas)
     result = []
     for mesa in mesas:
-        ocupada = has_active_pedido(db, mesa)
+        ocupada = mesa.id in ocupadas
         mesa_dict = {
             "id": mesa.id,
             "numero": mesa.numero,
@@ -27,11 +29,11 @@ def obtener_mesas(db: Session, disponible: Optional[bool] = None, tipo: Optional
     return result
 
 
-def obtener_mesa(db: Session, mesa_id: int) -> Optional[Dict]:
-    mesa = get_mesa(db, mesa_id)
+async def obtener_mesa(db: AsyncSession, mesa_id: int) -> Optional[Dict]:
+    mesa = await get_mesa(db, mesa_id)
     if not mesa:
         return None
-    ocupada = has_active_pedido(db, mesa)
+    ocupada = await db.run_sync(ocupacion_mesas.esta_ocupada, mesa.id)
     return {
         "id": mesa.id,
         "numero": mesa.numero,
@@ -43,7 +45,7 @@ def obtener_mesa(db: Session, mesa_id: int) -> Optional[Dict]:
     }
 
 
-def crear_mesa(db: Session, mesa_data) -> Mesa:
+async def crear_mesa(db: AsyncSession, mesa_data) -> Mesa:
     nueva = Mesa(
         numero=mesa_data.numero,
         capacidad=mesa_data.capacidad,
@@ -51,23 +53,23 @@ def crear_mesa(db: Session, mesa_data) -> Mesa:
         tipo=mesa_data.tipo,
         disponible=mesa_data.disponible
     )
-    return create_mesa(db, nueva)
+    return await create_mesa(db, nueva)
 
 
-def actualizar_mesa(db: Session, mesa_id: int, mesa_data) -> Optional[Mesa]:
-    mesa = get_mesa(db, mesa_id)
+async def actualizar_mesa(db: AsyncSession, mesa_id: int, mesa_data) -> Optional[Mesa]:
+    mesa = await get_mesa(db, mesa_id)
     if not mesa:
         return None
     for field, value in mesa_data.model_dump(exclude_unset=True).items():
         setattr(mesa, field, value)
-    return update_mesa(db, mesa)
+    return await update_mesa(db, mesa)
 
 
-def eliminar_mesa(db: Session, mesa_id: int) -> (bool, str):
-    mesa = get_mesa(db, mesa_id)
+async def eliminar_mesa(db: AsyncSession, mesa_id: int) -> (bool, str):
+    mesa = await get_mesa(db, mesa_id)
     if not mesa:
         return False, "not_found"
-    if has_active_pedido(db, mesa):
+    if await has_active_pedido(db, mesa):
         return False, "has_active_pedido"
-    delete_mesa(db, mesa)
+    await delete_mesa(db, mesa)
     return True, "deleted"
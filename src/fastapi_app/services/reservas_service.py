@@ -2,19 +2,25 @@
 Service layer para reservas — lógica de negocio.
 """
 from typing import List, Optional, Dict
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.models import Reserva, Mesa
-from ..repositories.reservas_repo import query_reservas, get_reserva, add_reserva, update_reserva
+from app.utils.paginacion import Pagina, Parametros
+from ..repositories.reservas_repo import pagina_reservas, get_reserva, add_reserva, update_reserva
 
 
-def obtener_reservas(db: Session, current_user, estado: Optional[str] = None, limit: int = 50) -> List[Reserva]:
+async def obtener_pagina_reservas(db: AsyncSession, current_user, parametros: Parametros, estado: Optional[str] = None) -> Pagina:
     usuario_id = None if getattr(current_user, 'rol', None) == 'admin' else current_user.id
-    return query_reservas(db, usuario_id, estado, limit)
+    return await pagina_reservas(db, parametros, usuario_id, estado)
 
 
-def obtener_reserva(db: Session, reserva_id: int, current_user):
-    reserva = get_reserva(db, reserva_id)
+async def obtener_reservas(db: AsyncSession, current_user, estado: Optional[str] = None, limit: int = 50) -> List[Reserva]:
+    pagina = await obtener_pagina_reservas(db, current_user, Parametros(limit, None, None, False), estado)
+    return pagina.items
+
+
+async def obtener_reserva(db: AsyncSession, reserva_id: int, current_user):
+    reserva = await get_reserva(db, reserva_id)
     if not reserva:
         return None
     if getattr(current_user, 'rol', None) != 'admin' and reserva.usuario_id != current_user.id:
@@ -22,7 +28,7 @@ def obtener_reserva(db: Session, reserva_id: int, current_user):
     return reserva
 
 
-def crear_reserva(db: Session, reserva_data, current_user):
+async def crear_reserva(db: AsyncSession, reserva_data, current_user):
     # Parsear fecha si es string
     fecha_dt = reserva_data.fecha_reserva
     if isinstance(fecha_dt, str):
@@ -51,28 +57,31 @@ def crear_reserva(db: Session, reserva_data, current_user):
         telefono_reserva=reserva_data.telefono_cliente or current_user.telefono,
         email_reserva=reserva_data.email_cliente or current_user.email,
         notas_especiales=reserva_data.notas,
+        mesa_asignada=reserva_data.mesa_asignada,
+        duracion_estimada=reserva_data.duracion_estimada,
         estado='pendiente'
     )
-    return add_reserva(db, nueva_reserva)
+    # Las franjas de la mesa se bloquean en el commit (MesaOcupada si ya están tomadas)
+    return await add_reserva(db, nueva_reserva)
 
 
-def actualizar_reserva(db: Session, reserva_id: int, reserva_data, current_user):
-    reserva = get_reserva(db, reserva_id)
+async def actualizar_reserva(db: AsyncSession, reserva_id: int, reserva_data, current_user):
+    reserva = await get_reserva(db, reserva_id)
     if not reserva:
         return None
     if getattr(current_user, 'rol', None) != 'admin' and reserva.usuario_id != current_user.id:
         return 'forbidden'
     for field, value in reserva_data.model_dump(exclude_unset=True).items():
         setattr(reserva, field, value)
-    return update_reserva(db, reserva)
+    return await update_reserva(db, reserva)
 
 
-def cancelar_reserva(db: Session, reserva_id: int, current_user):
-    reserva = get_reserva(db, reserva_id)
+async def cancelar_reserva(db: AsyncSession, reserva_id: int, current_user):
+    reserva = await get_reserva(db, reserva_id)
     if not reserva:
         return False, 'not_found'
     if getattr(current_user, 'rol', None) != 'admin' and reserva.usuario_id != current_user.id:
         return False, 'forbidden'
     reserva.estado = 'cancelada'
-    db.commit()
+    await db.commit()
     return True, 'cancelled'
@@ -2,20 +2,26 @@
 Service layer para usuarios — lógica de negocio relacionada con usuarios.
 """
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Usuario
-import bcrypt
+from app.utils.paginacion import Pagina, Parametros
+from app.utils.principales import principales
+from ..hashing import password_hasher
 from ..repositories.usuarios_repo import (
-    list_usuarios, get_usuario, find_by_email, create_usuario, update_usuario, delete_usuario
+    list_usuarios, pagina_usuarios, get_usuario, find_by_email, create_usuario, update_usuario, delete_usuario
 )
 
 
-def obtener_usuarios(db: Session, activo: Optional[bool] = None, rol: Optional[str] = None, limit: int = 50) -> List[Usuario]:
-    return list_usuarios(db, activo, rol, limit)
+async def obtener_usuarios(db: AsyncSession, activo: Optional[bool] = None, rol: Optional[str] = None, limit: int = 50) -> List[Usuario]:
+    return await list_usuarios(db, activo, rol, limit)
 
 
-def obtener_usuario(db: Session, usuario_id: int, current_user) -> Optional[Usuario]:
-    usuario = get_usuario(db, usuario_id)
+async def obtener_pagina_usuarios(db: AsyncSession, parametros: Parametros, activo: Optional[bool] = None, rol: Optional[str] = None) -> Pagina:
+    return await pagina_usuarios(db, parametros, activo, rol)
+
+
+async def obtener_usuario(db: AsyncSession, usuario_id: int, current_user) -> Optional[Usuario]:
+    usuario = await get_usuario(db, usuario_id)
     if not usuario:
         return None
     # permisos: sólo admin puede ver otros usuarios
@@ -24,26 +30,26 @@ def obtener_usuario(db: Session, usuario_id: int, current_user) -> Optional[Usua
     return usuario
 
 
-def crear_usuario_admin(db: Session, usuario_data) -> Usuario:
-    existing = find_by_email(db, usuario_data.email)
+async def crear_usuario_admin(db: AsyncSession, usuario_data) -> Usuario:
+    existing = await find_by_email(db, usuario_data.email)
     if existing:
         raise ValueError("El email ya está registrado")
-    hashed_password = bcrypt.hashpw(usuario_data.password.encode('utf-8'), bcrypt.gensalt())
+    hashed_password = await password_hasher.hash(usuario_data.password)
     nuevo = Usuario(
         nombre=usuario_data.nombre,
         apellido=usuario_data.apellido,
         email=usuario_data.email,
-        password_hash=hashed_password.decode('utf-8'),
+        password_hash=hashed_password,
         telefono=usuario_data.telefono,
         direccion=usuario_data.direccion,
         rol=usuario_data.rol,
         activo=usuario_data.activo
     )
-    return create_usuario(db, nuevo)
+    return await create_usuario(db, nuevo)
 
 
-def actualizar_usuario(db: Session, usuario_id: int, usuario_data, current_user):
-    usuario = get_usuario(db, usuario_id)
+async def actualizar_usuario(db: AsyncSession, usuario_id: int, usuario_data, current_user):
+    usuario = await get_usuario(db, usuario_id)
     if not usuario:
         return None
     if getattr(current_user, 'rol', None) != 'admin':
@@ -53,14 +59,17 @@ def actualizar_usuario(db: Session, usuario_id: int, usuario_data, current_user)
             return 'forbidden_role_change'
     for field, value in usuario_data.model_dump(exclude_unset=True).items():
         setattr(usuario, field, value)
-    return update_usuario(db, usuario)
+    usuario = await update_usuario(db, usuario)
+    principales.invalidar(usuario_id)
+    return usuario
 
 
-def eliminar_usuario(db: Session, usuario_id: int, current_user):
+async def eliminar_usuario(db: AsyncSession, usuario_id: int, current_user):
     if usuario_id == current_user.id:
         return False, 'cannot_delete_self'
-    usuario = get_usuario(db, usuario_id)
+    usuario = await get_usuario(db, usuario_id)
     if not usuario:
         return False, 'not_found'
-    delete_usuario(db, usuario)
+    await delete_usuario(db, usuario)
+    principales.invalidar(usuario_id)
     return True, 'deleted'
@@ -0,0 +1,171 @@
+"""
+Canal de eventos en memoria para `GET /api/v1/stream` (Server-Sent Events).
+
+Los paneles (dashboard, cocina, caja) consultaban la API cada pocos
+segundos. Con SSE cada pantalla mantiene una sola conexión y recibe los
+cambios de pedidos, mesas y reservas confirmados en este proceso, que
+llegan desde el bus de eventos de dominio (`app.utils.eventos`).
+
+- Cada mensaje recibe un id `"<época>.<n>"` y se guarda en un buffer
+  circular de `STREAM_BUFFER` mensajes. Un cliente que reconecta con
+  `Last-Event-ID` recibe lo que se perdió; si el id es de otra época
+  (reinicio del worker) o ya salió del buffer, recibe un evento `reinicio`
+  para que recargue el estado completo.
+- Cada suscripción tiene una cola de `STREAM_COLA_MAX` mensajes. Si el
+  cliente no la vacía a tiempo se descarta la suscripción (se cierra el
+  stream): el navegador reconecta solo y se pone al día con el buffer, en
+  lugar de acumular memoria en el servidor.
+- `publicar` es seguro desde cualquier hilo; la entrega a cada suscripción
+  se hace en su event loop.
+"""
+import asyncio
+import threading
+import uuid
+from collections import deque, namedtuple
+from typing import Callable, Iterable, Optional
+
+from config.config import Config
+
+# Tema del stream para cada entidad del bus de dominio
+TEMAS_ENTIDAD = {
+    'pedido': 'pedidos',
+    'mesa': 'mesas',
+    'reserva': 'reservas',
+}
+TEMAS = frozenset(TEMAS_ENTIDAD.values())
+
+# Temas que puede escuchar cada rol; los clientes sólo reciben sus propios
+# pedidos y reservas (ver `filtro_para`)
+TEMAS_POR_ROL = {
+    'admin': TEMAS,
+    'cajero': TEMAS,
+    'mesero': frozenset({'pedidos', 'mesas'}),
+    'cocinero': frozenset({'pedidos'}),
+    'cliente': TEMAS,
+}
+
+Mensaje = namedtuple('Mensaje', ['id', 'tema', 'datos'])
+
+
+def filtro_para(principal) -> Optional[Callable[[Mensaje], bool]]:
+    """Filtro de mensajes por usuario, o `None` si el rol ve todo."""
+    if principal.rol != 'cliente':
+        return None
+    return lambda mensaje: mensaje.datos.get('usuario_id') in (None, principal.id)
+
+
+class Suscripcion:
+    """Cola de mensajes pendientes de un cliente del stream."""
+
+    def __init__(self, temas: Iterable[str], filtro=None, max_pendientes: int = 100):
+        self.temas = frozenset(temas)
+        self.filtro = filtro
+        self.cola = asyncio.Queue(maxsize=max_pendientes)
+        self.loop = asyncio.get_running_loop()
+        self.descartada = False
+        self.lenta = False
+
+    def acepta(self, mensaje: Mensaje) -> bool:
+        return mensaje.tema in self.temas and (self.filtro is None or self.filtro(mensaje))
+
+    def entregar(self, mensaje: Optional[Mensaje]):
+        try:
+            en_su_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            en_su_loop = False
+        if en_su_loop:
+            self._poner(mensaje)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._poner, mensaje)
+
+    def _poner(self, mensaje: Optional[Mensaje]):
+        if self.descartada:
+            return
+        if mensaje is None:
+            self.descartada = True
+        else:
+            try:
+                self.cola.put_nowait(mensaje)
+                return
+            except asyncio.QueueFull:
+                self.descartada = self.lenta = True
+        # Cerrar: vaciar la cola y dejar sólo la marca de fin
+        while not self.cola.empty():
+            self.cola.get_nowait()
+        self.cola.put_nowait(None)
+
+
+class CanalEventos:
+    """Pub/sub en memoria con buffer de repetición."""
+
+    def __init__(self, max_buffer: Optional[int] = None, max_pendientes: Optional[int] = None):
+        self.max_pendientes = max_pendientes or getattr(Config, 'STREAM_COLA_MAX', 100)
+        self._lock = threading.Lock()
+        self._epoca = uuid.uuid4().hex[:8]
+        self._n = 0
+        self._buffer = deque(maxlen=max_buffer or getattr(Config, 'STREAM_BUFFER', 1000))
+        self._suscripciones = set()
+        self.descartadas = 0
+
+    @property
+    def suscripciones(self) -> int:
+        return len(self._suscripciones)
+
+    def publicar(self, tema: str, datos: dict) -> Mensaje:
+        with self._lock:
+            self._n += 1
+            mensaje = Mensaje(f'{self._epoca}.{self._n}', tema, datos)
+            self._buffer.append(mensaje)
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            if suscripcion.acepta(mensaje):
+                suscripcion.entregar(mensaje)
+        return mensaje
+
+    def publicar_evento(self, evento: dict):
+        """Suscriptor del bus de dominio: reenviar el evento a su tema."""
+        tema = TEMAS_ENTIDAD.get(evento.get('entidad'))
+        if tema is not None:
+            self.publicar(tema, evento)
+
+    def _perdidos(self, desde: str):
+        """Mensajes posteriores a `desde`, o `None` si no se pueden recuperar."""
+        epoca, _, numero = desde.partition('.')
+        if epoca != self._epoca or not numero.isdigit():
+            return None
+        numero = int(numero)
+        primero = int(self._buffer[0].id.partition('.')[2]) if self._buffer else self._n + 1
+        if numero > self._n or numero < primero - 1:
+            return None
+        return [m for m in self._buffer if int(m.id.partition('.')[2]) > numero]
+
+    def suscribir(self, temas: Iterable[str], filtro=None, desde: Optional[str] = None):
+        """Registrar una suscripción (llamar desde el event loop).
+
+        Devuelve `(suscripcion, perdidos)`: `perdidos` son los mensajes
+        posteriores a `desde` que acepta la suscripción, o `None` si `desde`
+        ya no se puede recuperar y el cliente debe recargar todo.
+        """
+        suscripcion = Suscripcion(temas, filtro, self.max_pendientes)
+        with self._lock:
+            perdidos = [] if desde is None else self._perdidos(desde)
+            self._suscripciones.add(suscripcion)
+        if perdidos is not None:
+            perdidos = [m for m in perdidos if suscripcion.acepta(m)]
+        return suscripcion, perdidos
+
+    def desuscribir(self, suscripcion: Suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+            if suscripcion.lenta:
+                self.descartadas += 1
+
+    def cerrar(self):
+        """Terminar todos los streams abiertos (al apagar la app)."""
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            suscripcion.entregar(None)
+
+
+canal_eventos = CanalEventos()
@@ -0,0 +1,94 @@
+"""
+Fixtures compartidas para las pruebas.
+
+Las pruebas usan SQLite en memoria con los mismos modelos de `app.models`,
+sin levantar la aplicación Flask ni conectarse al MySQL remoto. Los datos
+de prueba habituales salen de `usuario`, `crear_usuario` y `crear_pedido`.
+"""
+import os
+import sys
+from decimal import Decimal
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models import Pedido, PedidoItem, Usuario, db
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        'sqlite://',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool,
+    )
+    db.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as s:
+        yield s
+
+
+@pytest.fixture
+def sql_counter(engine):
+    """Cuenta las sentencias SQL ejecutadas contra el engine de prueba."""
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', _before_cursor_execute)
+
+
+@pytest.fixture
+def crear_usuario(session):
+    """Factoría de usuarios ya confirmados (por defecto Ana, cliente)."""
+    def crear(**campos):
+        usuario = Usuario(**{'nombre': 'Ana', 'apellido': 'A', 'email': 'ana@example.com', 'password_hash': 'x',
+                             **campos})
+        session.add(usuario)
+        session.commit()
+        return usuario
+
+    return crear
+
+
+@pytest.fixture
+def usuario(crear_usuario):
+    return crear_usuario()
+
+
+@pytest.fixture
+def crear_pedido(session, usuario):
+    """Factoría de pedidos de `usuario`, con sus líneas `items=[(plato, cantidad)]`.
+
+    El pedido queda en la sesión (con flush, sin commit).
+    """
+    usuario_id = usuario.id
+
+    def crear(total='10', items=(), **campos):
+        pedido = Pedido(**{'usuario_id': usuario_id, 'restaurante_id': 1, 'subtotal': Decimal(total),
+                           'total': Decimal(total), 'metodo_pago': 'efectivo', **campos})
+        session.add(pedido)
+        session.flush()
+        session.add_all([
+            PedidoItem(pedido_id=pedido.id, menu_item_id=plato.id, nombre_item=plato.nombre, cantidad=cantidad,
+                       precio_unitario=plato.precio, subtotal=plato.precio * cantidad)
+            for plato, cantidad in items
+        ])
+        return pedido
+
+    return crear
@@ -0,0 +1,94 @@
+"""
+Endpoints del catálogo: cuerpo JSON precodificado, ETag estable y 304 con
+`If-None-Match`, tanto en Flask como en FastAPI.
+"""
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from flask import Flask
+from sqlalchemy.pool import StaticPool
+
+from app.models import db, Categoria, MenuItem
+from app.routes.api_routes import api_bp
+from app.routes.main import main_bp
+from app.utils.menu_cache import menu_cache
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.dependencies import get_session
+from fastapi_app.routers import menu as menu_router
+
+
+@pytest.fixture(autouse=True)
+def _cache_limpia():
+    menu_cache.invalidar()
+    yield
+    menu_cache.invalidar()
+
+
+def _poblar(session):
+    entradas = Categoria(nombre='Entradas', orden=1)
+    session.add(entradas)
+    session.flush()
+    session.add(MenuItem(restaurante_id=1, categoria_id=entradas.id, nombre='Sopa', precio=Decimal('5')))
+    session.commit()
+
+
+@pytest.fixture
+def flask_client():
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        SQLALCHEMY_ENGINE_OPTIONS={'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}},
+    )
+    db.init_app(app)
+    app.register_blueprint(main_bp)
+    app.register_blueprint(api_bp)
+    with app.app_context():
+        db.create_all()
+        _poblar(db.session)
+        yield app.test_client()
+
+
+@pytest.mark.parametrize('url', ['/api/menu', '/api/menu/items', '/api/servicios'])
+def test_flask_etag_y_304(flask_client, url):
+    primera = flask_client.get(url)
+    assert primera.status_code == 200
+    etag = primera.headers['ETag']
+
+    segunda = flask_client.get(url)
+    assert segunda.headers['ETag'] == etag
+    assert segunda.data == primera.data
+
+    no_modificado = flask_client.get(url, headers={'If-None-Match': etag})
+    assert no_modificado.status_code == 304
+    assert no_modificado.data == b''
+
+
+def test_flask_etag_cambia_tras_commit(flask_client):
+    etag = flask_client.get('/api/menu/items').headers['ETag']
+
+    db.session.add(MenuItem(restaurante_id=1, nombre='Jugo', precio=Decimal('3')))
+    db.session.commit()
+
+    respuesta = flask_client.get('/api/menu/items', headers={'If-None-Match': etag})
+    assert respuesta.status_code == 200
+    assert respuesta.headers['ETag'] != etag
+    assert len(respuesta.get_json()) == 2
+
+
+def test_fastapi_menu_etag_y_304(session):
+    _poblar(session)
+    app = FastAPI()
+    app.include_router(menu_router.router, prefix='/api/v1')
+    app.dependency_overrides[get_session] = lambda: SyncSessionAdapter(session)
+    client = TestClient(app)
+
+    primera = client.get('/api/v1/menu')
+    assert primera.status_code == 200
+    assert primera.json()[0]['nombre'] == 'Sopa'
+    assert primera.json()[0]['precio'] == '5.00'
+
+    etag = primera.headers['etag']
+    assert client.get('/api/v1/menu', headers={'If-None-Match': f'W/{etag}'}).status_code == 304
+    assert client.get('/api/v1/menu?destacado=true', headers={'If-None-Match': etag}).status_code == 200
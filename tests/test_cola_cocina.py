@@ -0,0 +1,77 @@
+"""
+Cola de cocina: snapshot inicial, deltas por versión (agregados, cambios y
+retiros) y recarga sólo de los pedidos tocados por un commit.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models import MenuItem
+from app.utils.cola_cocina import ColaCocina, cola_cocina
+
+
+@pytest.fixture
+def plato(session):
+    plato = MenuItem(restaurante_id=1, nombre='Sopa', precio=Decimal('5'))
+    session.add(plato)
+    session.flush()
+    return plato
+
+
+@pytest.fixture
+def pedido(crear_pedido, plato):
+    """Factoría de pedidos de mesa con una sopa, `minutos` después de las 12:00."""
+    def crear(codigo, minutos, **campos):
+        return crear_pedido('5', items=[(plato, 1)], codigo_pedido=codigo, tipo_servicio='mesa',
+                            fecha_pedido=datetime(2026, 1, 1, 12) + timedelta(minutes=minutos), **campos)
+
+    return crear
+
+
+def test_snapshot_y_deltas(session, sql_counter, plato, pedido):
+    segundo = pedido('B', minutos=5)
+    primero = pedido('A', minutos=1)
+    pedido('P', minutos=2, estado='entregado')
+    session.commit()
+    cola = ColaCocina(ttl=3600)
+
+    inicial = cola.cambios(session)
+    assert inicial['completo'] is True
+    assert [t['codigo_pedido'] for t in inicial['tickets']] == ['A', 'B']
+    assert inicial['tickets'][0]['items'] == [{'menu_item_id': plato.id, 'nombre_item': 'Sopa', 'cantidad': 1}]
+    version = inicial['version']
+
+    # Sin cambios: respuesta vacía y sin consultas
+    sql_counter.clear()
+    assert cola.cambios(session, version) == {'version': version, 'completo': False, 'tickets': [], 'retirados': []}
+    assert sql_counter == []
+
+    primero.estado = 'preparando'
+    segundo.estado = 'entregado'
+    tercero = pedido('C', minutos=9)
+    session.commit()
+    cola.marcar([primero.id, segundo.id, tercero.id])
+
+    delta = cola.cambios(session, version)
+    assert delta['completo'] is False
+    assert [(t['codigo_pedido'], t['estado']) for t in delta['tickets']] == [('A', 'preparando'), ('C', 'pendiente')]
+    assert delta['retirados'] == [segundo.id]
+
+    # Una versión desconocida (otro worker, reinicio) recibe la cola completa
+    otra = cola.cambios(session, 'otraepoca.3')
+    assert otra['completo'] is True
+    assert [t['codigo_pedido'] for t in otra['tickets']] == ['A', 'C']
+
+
+def test_commit_marca_pedidos(session, pedido):
+    pedido = pedido('A', minutos=1)
+    session.commit()
+    cola_cocina.invalidar()
+    version = cola_cocina.cambios(session)['version']
+
+    pedido.estado = 'cancelado'
+    session.commit()
+
+    assert cola_cocina.cambios(session, version)['retirados'] == [pedido.id]
+    cola_cocina.invalidar()
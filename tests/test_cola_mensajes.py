@@ -0,0 +1,90 @@
+"""
+Cola de mensajes de Socket.IO con el broker local: un commit en un proceso
+sin servidor (como la API FastAPI) llega a los clientes de la sala en el
+servidor Socket.IO de otro worker.
+"""
+import json
+import threading
+import time
+
+import pytest
+import socketio
+
+from app.models import Mesa
+from app.socket_events import registrar_despachador
+from app.utils import eventos
+from app.utils.cola_mensajes import BrokerLocal, EmisorEnHilo, GestorLocal, crear_gestor
+
+
+@pytest.fixture
+def broker():
+    broker = BrokerLocal('local://:prueba@127.0.0.1:0').iniciar()
+    yield broker
+    broker.cerrar()
+
+
+def _esperar(condicion, segundos=5):
+    limite = time.monotonic() + segundos
+    while not condicion() and time.monotonic() < limite:
+        time.sleep(0.02)
+    return condicion()
+
+
+def _servidor(url, enviados):
+    """Servidor Socket.IO con un cliente simulado en las salas `mesas` y `cocina`."""
+    servidor = socketio.Server(async_mode='threading', client_manager=GestorLocal(url, channel='boodfood'))
+    # Paquete EVENT ya codificado: '2["nombre", datos]'
+    servidor._send_eio_packet = lambda eio_sid, pkt: enviados.append((eio_sid, json.loads(pkt.data[1:])))
+    servidor.manager.initialize()
+    sid = servidor.manager.connect('eio-1', '/')
+    servidor.manager.enter_room(sid, '/', 'mesas')
+    return servidor
+
+
+def test_crear_gestor_por_esquema():
+    assert isinstance(crear_gestor('local://127.0.0.1:6380'), GestorLocal)
+    assert isinstance(crear_gestor('redis://localhost:6379/0', write_only=True), socketio.RedisManager)
+
+
+def test_commit_de_otro_proceso_llega_a_la_sala(session, broker):
+    enviados = []
+    _servidor(broker.url, enviados)
+    assert _esperar(lambda: len(broker._suscriptores) == 1)
+
+    despachador = registrar_despachador(GestorLocal(broker.url, channel='boodfood', write_only=True))
+    try:
+        # Otro canal en el mismo broker no se mezcla
+        GestorLocal(broker.url, channel='otro', write_only=True).emit('ajeno', {}, to='mesas')
+        mesa = Mesa(numero=3, capacidad=4)
+        session.add(mesa)
+        session.commit()
+    finally:
+        eventos.desuscribir(despachador)
+
+    assert _esperar(lambda: enviados)
+    time.sleep(0.1)
+    assert len(enviados) == 1
+    eio_sid, (nombre, evento) = enviados[0]
+    assert eio_sid == 'eio-1' and nombre == 'mesa_actualizada'
+    assert evento['id'] == mesa.id and evento['accion'] == 'creado'
+
+
+def test_emisor_en_hilo_no_bloquea_y_conserva_el_orden():
+    liberar = threading.Event()
+    emitidos = []
+
+    class GestorLento:
+        def emit(self, evento, datos, to=None):
+            liberar.wait(5)
+            emitidos.append((evento, threading.current_thread().name))
+
+    emisor = EmisorEnHilo(GestorLento())
+    inicio = time.monotonic()
+    for n in range(3):
+        emisor.emit(f'evento_{n}', {}, to='mesas')
+    assert time.monotonic() - inicio < 1 and emitidos == []
+
+    liberar.set()
+    emisor.cerrar()
+    assert [evento for evento, _ in emitidos] == ['evento_0', 'evento_1', 'evento_2']
+    assert all(hilo.startswith('socketio-pub') for _, hilo in emitidos)
@@ -0,0 +1,100 @@
+"""
+Índice de disponibilidad de reservas: franjas por mesa con hora y
+duración, una consulta por fecha e invalidación al confirmar cambios.
+"""
+from datetime import date, time
+
+import pytest
+from sqlalchemy import insert
+
+from app.models import Reserva
+from app.utils.disponibilidad_reservas import DisponibilidadReservas, disponibilidad_reservas
+
+FECHA = date(2026, 5, 8)
+
+
+@pytest.fixture(autouse=True)
+def _indice_limpio():
+    disponibilidad_reservas.invalidar()
+    yield
+    disponibilidad_reservas.invalidar()
+
+
+def _reserva(usuario_id, mesa, hora, duracion=None, estado='pendiente', fecha=FECHA):
+    return Reserva(usuario_id=usuario_id, restaurante_id=1, fecha=fecha, hora=hora, numero_personas=2,
+                   mesa_asignada=mesa, duracion_estimada=duracion, estado=estado)
+
+
+def test_franjas_con_hora_y_duracion(session, sql_counter, usuario):
+    session.add_all([
+        _reserva(usuario.id, '1', time(12, 0)),             # 12:00-14:00 (duración por defecto)
+        _reserva(usuario.id, '2', time(19, 30), 3),         # 19:30-22:30
+        _reserva(usuario.id, '3', time(13, 0), 1),          # 13:00-14:00
+        _reserva(usuario.id, '4', time(12, 0), estado='cancelada'),
+        _reserva(usuario.id, '5', time(12, 0), fecha=date(2026, 5, 9)),
+    ])
+    session.commit()
+    # Reserva antigua solapada con la anterior (12:00-16:00), de antes del
+    # bloqueo de franjas: se inserta sin pasar por el flush
+    session.execute(insert(Reserva.__table__).values(
+        usuario_id=usuario.id, restaurante_id=1, fecha=FECHA, hora=time(12, 0), numero_personas=2,
+        mesa_asignada='3', duracion_estimada=4, estado='pendiente'))
+    session.commit()
+    indice = DisponibilidadReservas(ttl=60)
+
+    sql_counter.clear()
+    assert indice.mesas_reservadas(session, FECHA) == {'1', '2', '3'}
+    assert indice.mesas_reservadas(session, FECHA, time(14, 0)) == {'3'}
+    assert indice.mesas_reservadas(session, FECHA, time(11, 0), 1) == set()
+    assert indice.mesas_reservadas(session, FECHA, time(11, 0), 1.5) == {'1', '3'}
+    assert indice.mesas_reservadas(session, FECHA, time(21, 0)) == {'2'}
+    assert indice.mesa_libre(session, FECHA, 1, time(14, 0))
+    assert not indice.mesa_libre(session, FECHA, 3, time(15, 30))
+    # Una sola consulta para todas las preguntas sobre la fecha
+    assert len(sql_counter) == 1 and indice.construcciones == 1
+
+
+def test_commit_invalida_solo_las_fechas_afectadas(session, usuario):
+    otra = date(2026, 5, 9)
+    reserva = _reserva(usuario.id, '7', time(20, 0))
+    session.add_all([reserva, _reserva(usuario.id, '8', time(20, 0), fecha=otra)])
+    session.commit()
+
+    assert disponibilidad_reservas.mesas_reservadas(session, FECHA, time(20, 30)) == {'7'}
+    assert disponibilidad_reservas.mesas_reservadas(session, otra, time(20, 30)) == {'8'}
+    construcciones = disponibilidad_reservas.construcciones
+
+    # Cancelar libera la franja en cuanto se confirma; la otra fecha se conserva
+    reserva = session.get(Reserva, reserva.id)
+    reserva.estado = 'cancelada'
+    session.flush()
+    assert disponibilidad_reservas.mesas_reservadas(session, FECHA, time(20, 30)) == {'7'}
+    session.commit()
+    assert disponibilidad_reservas.mesas_reservadas(session, FECHA, time(20, 30)) == set()
+    assert disponibilidad_reservas.mesas_reservadas(session, otra, time(20, 30)) == {'8'}
+    assert disponibilidad_reservas.construcciones == construcciones + 1
+
+    # Un rollback no invalida nada
+    session.add(_reserva(usuario.id, '9', time(20, 0)))
+    session.flush()
+    session.rollback()
+    assert disponibilidad_reservas.mesas_reservadas(session, FECHA, time(20, 30)) == set()
+    assert disponibilidad_reservas.construcciones == construcciones + 1
+
+
+def test_reservas_que_pasan_de_medianoche(session, usuario):
+    siguiente = date(2026, 5, 9)
+    reserva = _reserva(usuario.id, '6', time(23, 0), 2)   # 23:00-01:00
+    session.add(reserva)
+    session.commit()
+
+    assert disponibilidad_reservas.mesas_reservadas(session, siguiente, time(0, 0), 1) == {'6'}
+    assert disponibilidad_reservas.mesa_libre(session, siguiente, 6, time(1, 0))
+    assert not disponibilidad_reservas.mesa_libre(session, FECHA, 6, time(22, 0), 4)
+    assert disponibilidad_reservas.mesas_reservadas(session, FECHA, time(23, 30), 1) == {'6'}
+
+    # Acortarla libera la madrugada del día siguiente
+    reserva = session.get(Reserva, reserva.id)
+    reserva.duracion_estimada = 1
+    session.commit()
+    assert disponibilidad_reservas.mesa_libre(session, siguiente, 6, time(0, 0))
@@ -0,0 +1,131 @@
+"""
+Estadísticas del dashboard: mismos valores y forma JSON que el cálculo en
+Python, con un número fijo de consultas sin importar el historial, y un
+solo cálculo compartido entre peticiones hasta que cambian los datos.
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models import MenuItem, Pedido, Mesa, Reserva, Inventario
+from app.utils import estadisticas
+from app.utils.estadisticas import EstadisticasDashboard, calcular_dashboard_stats
+from app.utils.ocupacion_mesas import ocupacion_mesas
+
+HOY = date(2025, 3, 10)
+
+
+@pytest.fixture(autouse=True)
+def _indice_limpio():
+    ocupacion_mesas.invalidar()
+    yield
+    ocupacion_mesas.invalidar()
+
+
+@pytest.fixture
+def poblar(session, usuario, crear_pedido):
+    def poblar(dias_historial=0):
+        mesa = Mesa(numero=1, capacidad=4)
+        pizza = MenuItem(restaurante_id=1, nombre='Pizza', precio=Decimal('20'))
+        sopa = MenuItem(restaurante_id=1, nombre='Sopa', precio=Decimal('5'))
+        session.add_all([mesa, pizza, sopa])
+        session.flush()
+
+        def pedido(dia, total, estado='entregado', **campos):
+            return crear_pedido(total, estado=estado, **campos,
+                                fecha_pedido=datetime.combine(dia, datetime.min.time()) + timedelta(hours=13))
+
+        pedido(HOY, '20', estado='pendiente', mesa_id=mesa.id, items=[(pizza, 1)])
+        pedido(HOY, '5', items=[(sopa, 1)])
+        pedido(HOY - timedelta(days=2), '40', items=[(pizza, 2)])
+        pedido(HOY - timedelta(days=20), '100')  # mes anterior
+        for i in range(dias_historial):
+            pedido(HOY - timedelta(days=60 + i), '1')
+        session.add_all([
+            Reserva(usuario_id=usuario.id, restaurante_id=1, fecha=HOY, hora=datetime(2025, 1, 1, 20).time(), numero_personas=2),
+            Inventario(nombre='Harina', cantidad=1, unidad='kg', stock_minimo=5),
+        ])
+        session.commit()
+
+    return poblar
+
+
+def test_dashboard_stats_valores(session, poblar):
+    poblar()
+    stats = calcular_dashboard_stats(session, hoy=HOY)
+
+    assert stats['pedidos_hoy'] == 2
+    assert stats['ventas_hoy'] == 25.0
+    assert stats['reservas_hoy'] == 1
+    assert stats['mesas_ocupadas'] == 1
+    assert stats['total_mesas'] == 1
+    assert stats['pedidos_pendientes'] == 1
+    assert stats['total_usuarios'] == 1
+    assert stats['inventario_bajo'] == 1
+    assert stats['pedidos_mes'] == 3
+    assert stats['ventas_mes'] == 65.0
+    assert stats['estados_pedidos'] == {'pendiente': 1, 'entregado': 3}
+    assert stats['ventas_por_dia'] == {
+        (HOY - timedelta(days=i)).isoformat(): v
+        for i, v in enumerate([25.0, 0.0, 40.0, 0.0, 0.0, 0.0, 0.0])
+    }
+    assert stats['top_productos'] == [{'nombre': 'Pizza', 'cantidad': 3}, {'nombre': 'Sopa', 'cantidad': 1}]
+
+
+def test_dashboard_stats_consultas_constantes(session, sql_counter, poblar):
+    poblar(dias_historial=30)
+    ocupacion_mesas.sincronizar(session)
+
+    sql_counter.clear()
+    calcular_dashboard_stats(session, hoy=HOY)
+    assert len(sql_counter) == 6
+
+
+def test_single_flight(monkeypatch):
+    llamadas = []
+
+    def calculo_lento(session, hoy=None):
+        llamadas.append(hoy)
+        time.sleep(0.2)
+        return {'pedidos_hoy': len(llamadas)}
+
+    monkeypatch.setattr(estadisticas, 'calcular_dashboard_stats', calculo_lento)
+    proveedor = EstadisticasDashboard(ttl=60, minimo=0)
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(proveedor.obtener(None, hoy=HOY))) for _ in range(10)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    # Diez pestañas a la vez: un cálculo
+    assert len(llamadas) == 1
+    assert resultados == [{'pedidos_hoy': 1}] * 10
+
+
+def test_recalcula_tras_cambios(session, sql_counter, poblar):
+    poblar()
+    proveedor = EstadisticasDashboard(ttl=60, minimo=0)
+    assert proveedor.obtener(session, hoy=HOY)['pedidos_pendientes'] == 1
+
+    # Sin cambios: se sirve sin consultar
+    sql_counter.clear()
+    proveedor.obtener(session, hoy=HOY)
+    assert sql_counter == []
+
+    pedido = session.query(Pedido).filter_by(estado='pendiente').one()
+    pedido.estado = 'entregado'
+    session.commit()
+    proveedor.marcar()
+    assert proveedor.obtener(session, hoy=HOY)['pedidos_pendientes'] == 0
+    assert proveedor.calculos == 2
+
+    # Un commit marca el singleton a través del bus de eventos
+    estadisticas.estadisticas_dashboard.obtener(session, hoy=HOY)
+    pedido.estado = 'pendiente'
+    session.commit()
+    assert estadisticas.estadisticas_dashboard._obsoleto
+    estadisticas.estadisticas_dashboard.invalidar()
@@ -0,0 +1,67 @@
+"""
+Bus de eventos de dominio: un evento compacto por objeto y transacción,
+entregado sólo tras el commit, y su reparto a las salas de Socket.IO.
+"""
+import pytest
+
+from app import socket_events
+from app.models import Mesa
+from app.utils import eventos
+
+
+@pytest.fixture
+def recibidos():
+    lista = []
+    eventos.suscribir(lista.append)
+    yield lista
+    eventos.desuscribir(lista.append)
+
+
+def _pedido(session, crear_pedido):
+    mesa = Mesa(numero=4, capacidad=2)
+    session.add(mesa)
+    session.flush()
+    return crear_pedido('5', codigo_pedido='PED1', mesa_id=mesa.id), mesa
+
+
+def test_eventos_tras_commit(session, crear_pedido, recibidos):
+    pedido, mesa = _pedido(session, crear_pedido)
+    pedido.estado = 'preparando'
+    session.flush()
+    assert recibidos == []
+
+    session.commit()
+    por_entidad = {e['entidad']: e for e in recibidos}
+    assert set(por_entidad) == {'pedido', 'mesa'}
+    # Creado y modificado en la misma transacción: un solo evento "creado"
+    assert por_entidad['pedido']['accion'] == 'creado'
+    assert por_entidad['pedido']['estado'] == 'preparando'
+    assert por_entidad['pedido']['mesa_id'] == mesa.id
+
+    recibidos.clear()
+    pedido.estado = 'entregado'
+    session.commit()
+    assert recibidos == [{
+        'entidad': 'pedido', 'accion': 'actualizado', 'id': pedido.id, 'codigo_pedido': 'PED1',
+        'estado': 'entregado', 'tipo_servicio': 'mesa', 'mesa_id': mesa.id,
+        'usuario_id': pedido.usuario_id, 'cambios': ['estado'],
+    }]
+
+
+def test_rollback_no_publica(session, crear_pedido, recibidos):
+    _pedido(session, crear_pedido)
+    session.rollback()
+    assert recibidos == []
+
+
+def test_despacho_a_salas(monkeypatch):
+    emitidos = []
+    monkeypatch.setattr(socket_events.socketio, 'emit', lambda *a, **k: emitidos.append((a, k)))
+
+    socket_events.despachar_evento({'entidad': 'pedido', 'accion': 'actualizado', 'id': 1, 'mesa_id': 7})
+    socket_events.despachar_evento({'entidad': 'mesa', 'accion': 'actualizado', 'id': 3})
+
+    assert emitidos[0][0][0] == 'pedido_actualizado'
+    assert emitidos[0][1]['to'] == ['cocina', 'caja', 'admin', 'mesa_7']
+    assert emitidos[1][0][0] == 'mesa_actualizada'
+    assert emitidos[1][1]['to'] == ['mesas', 'admin', 'mesa_3']
@@ -0,0 +1,95 @@
+"""
+Modo `FASTAPI_ASYNC_DB`: los routers funcionan de punta a punta sobre un
+`AsyncSession` (aiosqlite), incluidos los listeners de sesión de `Pedido`.
+"""
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.models import db, Mesa, MenuItem, Usuario, VentaDiaria
+from app.utils.menu_cache import menu_cache
+from app.utils.ocupacion_mesas import ocupacion_mesas
+from config.config import Config
+from fastapi_app import database
+from fastapi_app.dependencies import create_access_token
+from fastapi_app.routers import menu, mesas, pedidos
+
+# Driver asyncio de SQLite, sólo necesario para estas pruebas
+pytest.importorskip('aiosqlite')
+
+
+@pytest.fixture
+def sync_engine(tmp_path, monkeypatch):
+    ruta = tmp_path / 'async.db'
+    engine = create_engine(f'sqlite:///{ruta}')
+    db.metadata.create_all(engine)
+
+    monkeypatch.setattr(Config, 'FASTAPI_ASYNC_DB', True)
+    database.configurar_async_engine(f'sqlite+aiosqlite:///{ruta}', poolclass=NullPool)
+    ocupacion_mesas.invalidar()
+    menu_cache.invalidar()
+    yield engine
+    database._engine = database._session_factory = None
+    ocupacion_mesas.invalidar()
+    menu_cache.invalidar()
+    engine.dispose()
+
+
+@pytest.fixture
+def client(sync_engine):
+    app = FastAPI()
+    for modulo in (menu, mesas, pedidos):
+        app.include_router(modulo.router, prefix='/api/v1')
+    return TestClient(app)
+
+
+def _poblar(engine):
+    with Session(engine) as s:
+        usuario = Usuario(nombre='Ana', apellido='A', email='ana@example.com', password_hash='x', rol='admin')
+        s.add_all([usuario, Mesa(numero=1, capacidad=4), MenuItem(restaurante_id=1, nombre='Sopa', precio=Decimal('5'))])
+        s.commit()
+        return usuario.id
+
+
+def test_usa_async_session(sync_engine):
+    assert database.usar_async_db()
+    assert database.async_session_factory().class_.__name__ == 'AsyncSession'
+
+
+def test_flujo_pedido_async(client, sync_engine):
+    usuario_id = _poblar(sync_engine)
+    auth = {'Authorization': f'Bearer {create_access_token({"user_id": usuario_id})}'}
+
+    assert client.get('/api/v1/menu').json()[0]['nombre'] == 'Sopa'
+
+    creado = client.post('/api/v1/pedidos', headers=auth, json={
+        'tipo_servicio': 'mesa', 'mesa_id': 1, 'metodo_pago': 'efectivo',
+        'items': [{'menu_item_id': 1, 'cantidad': 2, 'precio_unitario': '5.00'}],
+    })
+    assert creado.status_code == 201, creado.text
+    pedido_id = creado.json()['id']
+
+    assert client.get('/api/v1/mesas').json()[0]['ocupada'] is True
+
+    listado = client.get('/api/v1/pedidos', headers=auth).json()
+    assert [p['id'] for p in listado] == [pedido_id]
+    assert listado[0]['items'][0]['cantidad'] == 2
+
+    actualizado = client.put(f'/api/v1/pedidos/{pedido_id}', headers=auth, json={'estado': 'entregado'})
+    assert actualizado.json()['estado'] == 'entregado'
+    assert client.get('/api/v1/mesas').json()[0]['ocupada'] is False
+
+    # El rollup de ventas se mantuvo en la misma transacción asíncrona
+    with Session(sync_engine) as s:
+        filas = s.execute(select(VentaDiaria.estado, VentaDiaria.cantidad)).all()
+    assert dict(filas) == {'pendiente': 0, 'entregado': 1}
+
+
+def test_async_database_url():
+    assert database.async_database_url('mysql+pymysql://u:p@h:3306/bd') == 'mysql+aiomysql://u:p@h:3306/bd'
+    assert database.async_database_url('sqlite:///x.db') == 'sqlite+aiosqlite:///x.db'
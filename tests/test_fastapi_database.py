@@ -0,0 +1,58 @@
+"""
+La API FastAPI arranca y atiende peticiones con su propio engine de
+SQLAlchemy, sin construir la app Flask ni empujar un `app_context`.
+"""
+import flask
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models import db, Mesa
+from app.utils.ocupacion_mesas import ocupacion_mesas
+from fastapi_app import create_fastapi_app, database
+from fastapi_app.dependencies import get_db
+
+
+@pytest.fixture
+def engine():
+    engine = database.configurar_engine(
+        'sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False}
+    )
+    db.metadata.create_all(engine)
+    ocupacion_mesas.invalidar()
+    yield engine
+    database._sync_engine = database._sync_session_factory = None
+    ocupacion_mesas.invalidar()
+
+
+def test_get_db_no_usa_flask(engine):
+    dependencia = get_db()
+    session = next(dependencia)
+    assert isinstance(session, Session)
+    assert session.get_bind() is engine
+    assert not flask.has_app_context()
+    dependencia.close()
+
+
+def test_arranque_y_peticion_sin_flask(engine, monkeypatch):
+    import app.app as flask_factory
+    monkeypatch.setattr(flask_factory, 'create_app', lambda *a, **k: pytest.fail('no debe crear la app Flask'))
+
+    with Session(engine) as s:
+        s.add(Mesa(numero=7, capacidad=2))
+        s.commit()
+
+    with TestClient(create_fastapi_app()) as client:
+        respuesta = client.get('/api/v1/mesas')
+
+    assert respuesta.status_code == 200
+    assert [m['numero'] for m in respuesta.json()] == [7]
+    # El lifespan cierra el engine al apagar
+    assert database._sync_engine is None
+
+
+def test_engine_perezoso():
+    database._sync_engine = database._sync_session_factory = None
+    create_fastapi_app()
+    assert database._sync_engine is None
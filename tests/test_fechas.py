@@ -0,0 +1,60 @@
+"""
+Días locales (America/Bogota) como rangos UTC: límites de día, filtros
+sin `DATE()` sobre la columna y la migración de índices.
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import inspect
+
+from app.utils import ventas_diarias
+from app.utils.fechas import dia_local, rango_utc
+from migrations import versiones
+
+HOY = date(2026, 3, 10)
+
+
+def test_dia_local_en_utc():
+    # Bogotá es UTC-5 todo el año
+    assert rango_utc(HOY) == (datetime(2026, 3, 10, 5), datetime(2026, 3, 11, 5))
+    assert rango_utc(HOY, HOY + timedelta(days=7))[1] == datetime(2026, 3, 17, 5)
+    assert dia_local(datetime(2026, 3, 11, 4, 59)) == HOY
+    assert dia_local(datetime(2026, 3, 11, 5, 0)) == HOY + timedelta(days=1)
+    assert dia_local('2026-03-10') == HOY
+
+
+def test_pedido_de_la_noche_cuenta_en_su_dia_local(session, sql_counter, crear_pedido):
+    # 21:30 del día anterior en Bogotá: ya es día 9 en UTC
+    crear_pedido('10', fecha_pedido=datetime(2026, 3, 10, 2, 30))
+    # 22:00 de hoy en Bogotá, día siguiente en UTC
+    crear_pedido('25', fecha_pedido=datetime(2026, 3, 11, 3, 0))
+    session.commit()
+
+    sql_counter.clear()
+    por_dia = ventas_diarias.agregar(session, HOY - timedelta(days=1), HOY + timedelta(days=1), ('fecha',), hoy=HOY)
+    assert por_dia == {(HOY - timedelta(days=1),): (1, 10.0), (HOY,): (1, 25.0)}
+    assert not any('date(' in sentencia.lower() for sentencia in sql_counter)
+
+    ventas_diarias.reconstruir(session)
+    session.commit()
+    por_dia = ventas_diarias.agregar(session, HOY - timedelta(days=1), HOY + timedelta(days=1), ('fecha',),
+                                     hoy=HOY + timedelta(days=1))
+    assert por_dia == {(HOY - timedelta(days=1),): (1, 10.0), (HOY,): (1, 25.0)}
+
+
+def test_migracion_crea_los_indices(engine):
+    migraciones = versiones()
+    assert [m.revision for m in migraciones][0] == '0001'
+    with engine.begin() as conexion:
+        for migracion in reversed(migraciones):
+            migracion.downgrade(conexion)
+    assert 'ix_pedidos_estado_fecha_pedido' not in {i['name'] for i in inspect(engine).get_indexes('pedidos')}
+
+    # Se puede aplicar dos veces (p. ej. sobre una base creada con create_all)
+    for _ in range(2):
+        with engine.begin() as conexion:
+            for migracion in migraciones:
+                migracion.upgrade(conexion)
+    indices = {i['name']: i['column_names'] for i in inspect(engine).get_indexes('pedidos')}
+    assert indices['ix_pedidos_estado_fecha_pedido'] == ['estado', 'fecha_pedido']
+    assert indices['ix_pedidos_mesa_id_estado'] == ['mesa_id', 'estado']
+    assert 'ix_reservas_usuario_id_created_at' in {i['name'] for i in inspect(engine).get_indexes('reservas')}
@@ -0,0 +1,138 @@
+"""
+Bloqueo de franjas de reserva: inserción única de todas las franjas,
+liberación al cancelar, 409 en la API y reservas simultáneas de la misma
+mesa (sólo una gana).
+"""
+import threading
+from datetime import date, time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.models import Reserva, ReservaFranja, Usuario, db
+from app.utils.franjas_reserva import MesaOcupada, franjas, reconstruir
+from app.utils.principales import principales
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.dependencies import create_access_token, get_session
+from fastapi_app.routers import reservas as reservas_router
+
+FECHA = date(2026, 6, 13)
+
+
+def _reserva(usuario_id, mesa, hora, duracion=None):
+    return Reserva(usuario_id=usuario_id, restaurante_id=1, fecha=FECHA, hora=hora, numero_personas=4,
+                   mesa_asignada=mesa, duracion_estimada=duracion, estado='pendiente')
+
+
+def test_franjas_de_una_reserva():
+    assert franjas(time(20, 0)) == range(40, 44)
+    assert franjas(time(20, 10), 1) == range(40, 43)
+
+
+def test_reserva_que_pasa_de_medianoche_choca_con_el_dia_siguiente(session, usuario):
+    tarde = _reserva(usuario.id, '6', time(23, 0), 2)
+    session.add(tarde)
+    session.commit()
+    franjas_siguiente = session.scalars(select(ReservaFranja.franja).where(
+        ReservaFranja.reserva_id == tarde.id, ReservaFranja.fecha == date(2026, 6, 14))).all()
+    assert sorted(franjas_siguiente) == [0, 1]
+
+    temprano = _reserva(usuario.id, '6', time(0, 0))
+    temprano.fecha = date(2026, 6, 14)
+    session.add(temprano)
+    with pytest.raises(MesaOcupada):
+        session.commit()
+    session.rollback()
+
+    temprano = _reserva(usuario.id, '6', time(1, 0))
+    temprano.fecha = date(2026, 6, 14)
+    session.add(temprano)
+    session.commit()
+    # Las dos franjas de la víspera y las cuatro de la 01:00
+    assert reconstruir(session, date(2026, 6, 14)) == (6, [])
+
+
+def test_ocupa_libera_y_rechaza_solapes(session, sql_counter, usuario):
+    sql_counter.clear()
+    evento = _reserva(usuario.id, '4, 5', time(19, 0), 2)
+    session.add(evento)
+    session.commit()
+    # Dos mesas x cuatro franjas en un único INSERT
+    inserts = [s for s in sql_counter if s.startswith('INSERT INTO reserva_franjas')]
+    assert len(inserts) == 1
+    assert session.scalar(select(ReservaFranja).where(ReservaFranja.mesa == '5').limit(1)).reserva_id == evento.id
+
+    session.add(_reserva(usuario.id, '5', time(20, 30)))
+    with pytest.raises(MesaOcupada):
+        session.commit()
+    session.rollback()
+
+    # Justo al terminar el evento sí hay sitio; cancelar libera las franjas
+    session.add(_reserva(usuario.id, '5', time(21, 0)))
+    session.commit()
+    evento = session.get(Reserva, evento.id)
+    evento.estado = 'cancelada'
+    session.commit()
+    session.add(_reserva(usuario.id, '4', time(19, 30)))
+    session.commit()
+    assert session.query(ReservaFranja).count() == 8
+
+    filas, conflictos = reconstruir(session)
+    assert (filas, conflictos) == (8, [])
+
+
+def test_api_responde_409(session, usuario):
+    principales.invalidar()
+    app = FastAPI()
+    app.include_router(reservas_router.router, prefix='/api/v1')
+    app.dependency_overrides[get_session] = lambda: SyncSessionAdapter(session)
+    client = TestClient(app)
+    auth = {'Authorization': f'Bearer {create_access_token({"user_id": usuario.id, "rol": "cliente"})}'}
+    cuerpo = {'fecha_reserva': '2026-06-13 20:00', 'numero_personas': 4, 'mesa_asignada': '7'}
+
+    assert client.post('/api/v1/reservas', json=cuerpo, headers=auth).status_code == 201
+    respuesta = client.post('/api/v1/reservas', json={**cuerpo, 'fecha_reserva': '2026-06-13 21:30'}, headers=auth)
+    assert respuesta.status_code == 409
+    assert 'mesa 7' in respuesta.json()['detail']
+    assert client.post('/api/v1/reservas', json={**cuerpo, 'mesa_asignada': '8'}, headers=auth).status_code == 201
+
+
+def test_reservas_simultaneas_misma_mesa(tmp_path):
+    # SQLite en archivo: cada hilo con su conexión y su transacción
+    engine = create_engine(f'sqlite:///{tmp_path / "reservas.db"}', connect_args={'timeout': 30})
+    db.metadata.create_all(engine)
+    with Session(engine) as session:
+        usuario = Usuario(nombre='Ana', apellido='A', email='ana@example.com', password_hash='x')
+        session.add(usuario)
+        session.commit()
+        usuario_id = usuario.id
+
+    hilos_n = 8
+    barrera = threading.Barrier(hilos_n)
+    resultados = []
+
+    def reservar(i):
+        with Session(engine) as session:
+            # Horas distintas pero solapadas con todas las demás
+            session.add(_reserva(usuario_id, '12', time(20, 0 if i % 2 else 30)))
+            barrera.wait()
+            try:
+                session.commit()
+                resultados.append('ok')
+            except MesaOcupada:
+                session.rollback()
+                resultados.append('409')
+
+    hilos = [threading.Thread(target=reservar, args=(i,)) for i in range(hilos_n)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert sorted(resultados) == ['409'] * (hilos_n - 1) + ['ok']
+    with Session(engine) as session:
+        assert session.query(Reserva).count() == 1
+    engine.dispose()
@@ -0,0 +1,106 @@
+"""
+Descuentos de inventario concurrentes: varios hilos crean pedidos sobre los
+mismos ingredientes y el stock nunca queda negativo ni pierde descuentos.
+
+Corre sobre un SQLite en archivo; si se define `BOODFOOD_TEST_MYSQL_URL`
+(p. ej. `mysql+pymysql://u:p@localhost/boodfood_test`) también sobre MySQL.
+"""
+import os
+import threading
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.models import db, Inventario, InventarioMovimiento, MenuItem, Receta
+from app.utils import inventario, stock_pedido
+
+HILOS = 8
+PEDIDOS_POR_HILO = 15
+STOCK_INICIAL = Decimal('40')
+
+
+@pytest.fixture(params=['sqlite', 'mysql'])
+def engine_concurrente(request, tmp_path):
+    if request.param == 'sqlite':
+        engine = create_engine(f'sqlite:///{tmp_path / "stock.db"}', connect_args={'timeout': 30})
+    else:
+        url = os.environ.get('BOODFOOD_TEST_MYSQL_URL')
+        if not url:
+            pytest.skip('BOODFOOD_TEST_MYSQL_URL no definido')
+        engine = create_engine(url, pool_size=HILOS)
+    db.metadata.create_all(engine)
+    yield engine
+    db.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def _poblar(engine):
+    with Session(engine) as s:
+        harina = Inventario(nombre='Harina', cantidad=STOCK_INICIAL, unidad='kg')
+        queso = Inventario(nombre='Queso', cantidad=STOCK_INICIAL, unidad='kg')
+        pizza = MenuItem(restaurante_id=1, nombre='Pizza', precio=Decimal('20'))
+        s.add_all([harina, queso, pizza])
+        s.flush()
+        s.add_all([
+            Receta(menu_item_id=pizza.id, inventario_id=harina.id, cantidad_usada=Decimal('1')),
+            Receta(menu_item_id=pizza.id, inventario_id=queso.id, cantidad_usada=Decimal('0.5')),
+        ])
+        s.commit()
+        return pizza.id, harina.id, queso.id
+
+
+def test_sin_stock_negativo_ni_descuentos_perdidos(engine_concurrente):
+    engine = engine_concurrente
+    pizza_id, harina_id, queso_id = _poblar(engine)
+    confirmados, errores = [], []
+    barrera = threading.Barrier(HILOS)
+
+    def cocinar():
+        barrera.wait()
+        for _ in range(PEDIDOS_POR_HILO):
+            with Session(engine) as s:
+                try:
+                    menu_item = stock_pedido.cargar_menu_items(s, [pizza_id])[pizza_id]
+                    plan = stock_pedido.planificar(s, [(menu_item, 1)])
+                    stock_pedido.aplicar(s, plan, usuario_id=None, codigo_pedido='PED')
+                    s.commit()
+                    confirmados.append(1)
+                except stock_pedido.StockInsuficiente:
+                    s.rollback()
+                except Exception as exc:  # pragma: no cover - se reporta abajo
+                    s.rollback()
+                    errores.append(exc)
+
+    hilos = [threading.Thread(target=cocinar) for _ in range(HILOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert errores == []
+    with Session(engine) as s:
+        harina = s.get(Inventario, harina_id).cantidad
+        queso = s.get(Inventario, queso_id).cantidad
+        salidas = s.scalar(select(func.count()).select_from(InventarioMovimiento))
+
+    # 40 kg de harina alcanzan exactamente para 40 pizzas
+    assert len(confirmados) == 40
+    assert harina == Decimal('0')
+    assert queso == STOCK_INICIAL - Decimal('0.5') * len(confirmados)
+    assert salidas == 2 * len(confirmados)
+
+
+def test_descontar_informa_faltantes(session):
+    harina = Inventario(nombre='Harina', cantidad=Decimal('2'), unidad='kg')
+    queso = Inventario(nombre='Queso', cantidad=Decimal('1'), unidad='kg')
+    session.add_all([harina, queso])
+    session.commit()
+
+    assert inventario.descontar(session, {harina.id: Decimal('1.5'), queso.id: Decimal('3')}) == [queso.id]
+    assert harina.cantidad == Decimal('0.5')
+    assert queso.cantidad == Decimal('1')
+
+    assert inventario.reponer(session, queso.id, Decimal('2'))
+    assert queso.cantidad == Decimal('3')
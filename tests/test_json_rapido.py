@@ -0,0 +1,83 @@
+"""
+Codificación JSON rápida: tipos nativos (Decimal, fechas), proveedor de
+Flask y modo sin `response_model` del listado de pedidos, que debe dar el
+mismo cuerpo que la ruta validada.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from flask import Flask, jsonify
+from pydantic import TypeAdapter
+
+from app.models import MenuItem
+from app.utils import json_rapido
+from app.utils.principales import principales
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.dependencies import create_access_token, get_session
+from fastapi_app.routers import pedidos as pedidos_router
+from fastapi_app.schemas import PedidoResponse
+
+
+def test_tipos_nativos():
+    datos = {
+        'precio': Decimal('12.50'),
+        'fecha': date(2026, 1, 31),
+        'hora': time(20, 15),
+        'creado': datetime(2026, 1, 31, 20, 15, 0, 123000),
+        'nombre': 'Piña colada',
+        1: 'clave numérica',
+    }
+    assert json_rapido.loads(json_rapido.dumps(datos)) == {
+        'precio': '12.50',
+        'fecha': '2026-01-31',
+        'hora': '20:15:00',
+        'creado': '2026-01-31T20:15:00.123000',
+        'nombre': 'Piña colada',
+        '1': 'clave numérica',
+    }
+    assert 'Piña'.encode('utf-8') in json_rapido.dumps(datos)
+
+
+def test_proveedor_flask():
+    app = Flask(__name__)
+    app.json = json_rapido.ProveedorJSON(app)
+    with app.app_context():
+        respuesta = jsonify({'total': Decimal('3.10'), 'fecha': datetime(2026, 2, 1, 9, 30)})
+    assert respuesta.mimetype == 'application/json'
+    assert respuesta.get_data() == b'{"fecha":"2026-02-01T09:30:00","total":"3.10"}\n'
+    assert app.json.loads(b'{"a":[1,2]}') == {'a': [1, 2]}
+
+
+@pytest.fixture
+def usuario(crear_usuario):
+    return crear_usuario(rol='admin')
+
+
+def test_listado_pedidos_sin_response_model(session, usuario, crear_pedido):
+    plato = MenuItem(restaurante_id=1, nombre='Arepa', precio=Decimal('7.25'))
+    session.add(plato)
+    session.flush()
+    for i in range(3):
+        crear_pedido('14.50', items=[(plato, 2)], codigo_pedido=f'PED{i}', estado='pendiente', tipo_servicio='mesa',
+                     fecha_pedido=datetime(2026, 3, 1, 12, i, 5, 250000))
+    session.commit()
+    principales.invalidar()
+
+    app = FastAPI()
+    app.include_router(pedidos_router.router, prefix='/api/v1')
+    app.dependency_overrides[get_session] = lambda: SyncSessionAdapter(session)
+    client = TestClient(app)
+    auth = {'Authorization': f'Bearer {create_access_token({"user_id": usuario.id, "rol": "admin"})}'}
+
+    respuesta = client.get('/api/v1/pedidos?limit=2', headers=auth)
+    assert respuesta.status_code == 200
+    assert respuesta.headers['X-Next-Cursor']
+    # Mismo cuerpo que habría producido la validación con `PedidoResponse`
+    validado = TypeAdapter(List[PedidoResponse]).dump_json(
+        TypeAdapter(List[PedidoResponse]).validate_json(respuesta.content))
+    assert respuesta.content == validado
+    assert respuesta.json()[0]['items'][0]['precio_unitario'] == '7.25'
@@ -0,0 +1,81 @@
+"""
+Caché del menú público: aciertos sin consultas, invalidación explícita y
+objetos legibles fuera de la sesión que los cargó.
+"""
+from decimal import Decimal
+
+from app.models import Categoria, MenuItem
+from app.utils.menu_cache import MenuCache
+
+
+def _poblar(session):
+    entradas = Categoria(nombre='Entradas', orden=1)
+    session.add(entradas)
+    session.flush()
+    session.add_all([
+        MenuItem(restaurante_id=1, categoria_id=entradas.id, nombre='Sopa', precio=Decimal('5'), destacado=True),
+        MenuItem(restaurante_id=1, categoria_id=entradas.id, nombre='Pan', precio=Decimal('2')),
+        MenuItem(restaurante_id=1, nombre='Agotado', precio=Decimal('1'), disponible=False),
+    ])
+    session.commit()
+
+
+def test_aciertos_no_consultan(session, sql_counter):
+    _poblar(session)
+    cache = MenuCache(ttl=60)
+
+    primera = cache.items(session, disponible=True)
+    sql_counter.clear()
+    segunda = cache.items(session, disponible=True)
+
+    assert sql_counter == []
+    assert [i.nombre for i in segunda] == [i.nombre for i in primera] == ['Pan', 'Sopa']
+    assert [i.nombre for i in cache.items(session, disponible=True, destacado=True)] == ['Sopa']
+    assert cache.estadisticas() == {'hits': 1, 'misses': 2, 'hit_ratio': 0.3333, 'size': 2, 'ttl': 60}
+
+
+def test_invalidar_recarga_cambios(session):
+    _poblar(session)
+    cache = MenuCache(ttl=60)
+    assert len(cache.items(session, disponible=True)) == 2
+
+    session.add(MenuItem(restaurante_id=1, nombre='Jugo', precio=Decimal('3')))
+    session.commit()
+    assert len(cache.items(session, disponible=True)) == 2
+
+    cache.invalidar()
+    assert len(cache.items(session, disponible=True)) == 3
+    assert cache.estadisticas()['size'] == 1
+
+
+def test_carga_previa_a_invalidar_no_se_guarda():
+    cache = MenuCache(ttl=60)
+
+    def cargar_viejo():
+        # Un commit invalida la caché mientras se lee el menú
+        cache.invalidar()
+        return 'viejo'
+
+    assert cache.obtener('clave', cargar_viejo) == 'viejo'
+    assert cache.estadisticas()['size'] == 0
+    assert cache.obtener('clave', lambda: 'nuevo') == 'nuevo'
+    assert cache.obtener('clave', lambda: 'otro') == 'nuevo'
+
+
+def test_ttl_vencido_recarga(session):
+    _poblar(session)
+    cache = MenuCache(ttl=0)
+    cache.categorias(session)
+    cache.categorias(session)
+    assert cache.estadisticas()['misses'] == 2
+
+
+def test_objetos_desacoplados_de_la_sesion(session):
+    _poblar(session)
+    cache = MenuCache(ttl=60)
+    items = cache.items(session, disponible=True)
+
+    # La sesión de la petición no se ve afectada y los items se leen tras cerrarla
+    assert not any(item in session for item in items)
+    session.close()
+    assert items[1].to_dict()['precio'] == 5.0
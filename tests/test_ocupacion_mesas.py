@@ -0,0 +1,76 @@
+"""
+Índice de ocupación de mesas: una consulta agregada por resincronización y
+actualización incremental al confirmar transiciones de `Pedido`.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import Mesa
+from app.utils.ocupacion_mesas import ocupacion_mesas
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.services.mesas_service import obtener_mesas
+
+
+@pytest.fixture(autouse=True)
+def _indice_limpio():
+    ocupacion_mesas.invalidar()
+    yield
+    ocupacion_mesas.invalidar()
+
+
+@pytest.fixture
+def datos(session, usuario, crear_usuario):
+    beto = crear_usuario(nombre='Beto', apellido='B', email='beto@example.com')
+    mesas = [Mesa(numero=n, capacidad=4) for n in range(1, 11)]
+    session.add_all(mesas)
+    session.commit()
+    return SimpleNamespace(ana=usuario.id, beto=beto.id, mesas=[m.id for m in mesas])
+
+
+def test_obtener_mesas_no_consulta_por_mesa(session, sql_counter, datos, crear_pedido):
+    crear_pedido(mesa_id=datos.mesas[0])
+    crear_pedido(usuario_id=datos.beto, mesa_id=datos.mesas[3], estado='preparando')
+    session.commit()
+
+    sql_counter.clear()
+    mesas = asyncio.run(obtener_mesas(SyncSessionAdapter(session)))
+
+    assert {m['id'] for m in mesas if m['ocupada']} == {datos.mesas[0], datos.mesas[3]}
+    # Listado de mesas + una resincronización agregada
+    assert len(sql_counter) == 2
+
+    sql_counter.clear()
+    asyncio.run(obtener_mesas(SyncSessionAdapter(session)))
+    assert len(sql_counter) == 1
+
+
+def test_transiciones_actualizan_el_indice_al_confirmar(session, datos, crear_pedido):
+    mesa = datos.mesas[1]
+    assert not ocupacion_mesas.esta_ocupada(session, mesa)
+
+    pedido = crear_pedido(mesa_id=mesa)
+    assert not ocupacion_mesas.esta_ocupada(session, mesa)  # aún sin commit
+    session.commit()
+    assert ocupacion_mesas.esta_ocupada(session, mesa)
+
+    pedido.estado = 'entregado'
+    session.commit()
+    assert not ocupacion_mesas.esta_ocupada(session, mesa)
+
+
+def test_rollback_no_modifica_el_indice(session, datos, crear_pedido):
+    ocupacion_mesas.sincronizar(session)
+    crear_pedido(mesa_id=datos.mesas[2])
+    session.rollback()
+    assert not ocupacion_mesas.esta_ocupada(session, datos.mesas[2])
+
+
+def test_excluir_pedidos_del_propio_usuario(session, datos, crear_pedido):
+    crear_pedido(mesa_id=datos.mesas[4])
+    session.commit()
+
+    assert datos.mesas[4] in ocupacion_mesas.mesas_ocupadas(session)
+    assert datos.mesas[4] not in ocupacion_mesas.mesas_ocupadas(session, excluir_usuario_id=datos.ana)
+    assert datos.mesas[4] in ocupacion_mesas.mesas_ocupadas(session, excluir_usuario_id=datos.beto)
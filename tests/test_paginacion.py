@@ -0,0 +1,126 @@
+"""
+Paginación por cursor: recorrido completo sin repetidos con fechas
+empatadas, proyección de columnas, total bajo pedido y cabeceras en Flask
+y FastAPI.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from flask import Flask
+from sqlalchemy import select
+
+from app.models import Pedido, Usuario
+from app.utils.paginacion import Parametros, ParametrosInvalidos, leer_parametros, pagina_json, paginar
+from app.utils.principales import principales
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.dependencies import create_access_token, get_session
+from fastapi_app.routers import usuarios as usuarios_router
+
+ORDEN = [(Pedido.fecha_pedido, True), (Pedido.id, True)]
+
+
+@pytest.fixture
+def usuario(crear_usuario):
+    return crear_usuario(password_hash='secreto', rol='admin')
+
+
+@pytest.fixture
+def pedidos(session, crear_pedido):
+    # Fechas repetidas: el id desempata
+    pedidos = [crear_pedido(i, subtotal=Decimal('1'), fecha_pedido=datetime(2026, 1, 1 + i // 3)) for i in range(7)]
+    session.commit()
+    return pedidos
+
+
+def test_recorrido_por_cursor(session, sql_counter, pedidos):
+    esperado = [p.id for p in session.scalars(select(Pedido).order_by(Pedido.fecha_pedido.desc(), Pedido.id.desc()))]
+
+    vistos, cursor = [], None
+    while True:
+        pagina = paginar(session, select(Pedido), Pedido, ORDEN, Parametros(3, cursor, None, False))
+        vistos += [p.id for p in pagina.items]
+        cursor = pagina.siguiente
+        if cursor is None:
+            break
+    assert vistos == esperado
+
+    sql_counter.clear()
+    pagina = paginar(session, select(Pedido).where(Pedido.total >= 2), Pedido, ORDEN, Parametros(2, None, ['id', 'total'], True))
+    assert pagina.total == 5
+    assert pagina.items == [{'id': esperado[0], 'total': 6.0}, {'id': esperado[1], 'total': 5.0}]
+    # Sólo las columnas pedidas (más las del orden)
+    assert len(sql_counter) == 2 and 'metodo_pago' not in sql_counter[-1]
+
+
+@pytest.mark.parametrize('descendente', [True, False])
+def test_recorrido_con_fechas_nulas(session, crear_pedido, descendente):
+    fechas = [datetime(2026, 1, 1), None, datetime(2026, 1, 2), None, datetime(2026, 1, 3)]
+    for fecha in fechas:
+        # Sin fecha, como las filas anteriores al valor por defecto
+        crear_pedido().fecha_pedido = fecha
+    session.commit()
+    orden = [(Pedido.fecha_pedido, descendente), (Pedido.id, descendente)]
+    columnas = [c.desc() if descendente else c.asc() for c in (Pedido.fecha_pedido, Pedido.id)]
+    esperado = [p.id for p in session.scalars(select(Pedido).order_by(*columnas))]
+
+    vistos, cursor = [], None
+    while True:
+        pagina = paginar(session, select(Pedido), Pedido, orden, Parametros(1, cursor, None, False))
+        vistos += [p.id for p in pagina.items]
+        cursor = pagina.siguiente
+        if cursor is None:
+            break
+    assert len(esperado) == 5
+    assert vistos == esperado
+
+
+def test_parametros_invalidos(session, pedidos):
+    with pytest.raises(ParametrosInvalidos):
+        paginar(session, select(Usuario), Usuario, [(Usuario.id, False)], Parametros(5, None, ['password_hash'], False))
+    with pytest.raises(ParametrosInvalidos):
+        paginar(session, select(Pedido), Pedido, ORDEN, Parametros(5, 'no-es-un-cursor', None, False))
+    with pytest.raises(ParametrosInvalidos):
+        leer_parametros({'limit': 'mucho'})
+    assert leer_parametros({'limit': '5000'}).limite == 1000
+    assert leer_parametros({}).limite == 300
+
+
+def test_pagina_json_flask(session, pedidos, crear_usuario):
+    crear_usuario(nombre='Luis', apellido='L', email='luis@example.com')
+    app = Flask(__name__)
+    with app.test_request_context('/?limit=1&count=1&fields=id,email'):
+        respuesta = pagina_json(session, select(Usuario), Usuario, [(Usuario.id, False)], Usuario.to_dict)
+    assert respuesta.get_json() == [{'id': 1, 'email': 'ana@example.com'}]
+    assert respuesta.headers['X-Total-Count'] == '2'
+    assert respuesta.headers['X-Next-Cursor']
+
+    # Sólo columnas que `to_dict()` ya expone
+    for campos in ('direccion', 'id,fecha_nacimiento,ultima_sesion', 'password_hash'):
+        with app.test_request_context(f'/?fields={campos}'):
+            respuesta, estado = pagina_json(session, select(Usuario), Usuario, [(Usuario.id, False)], Usuario.to_dict)
+        assert estado == 400
+
+
+def test_listado_fastapi(session, usuario, pedidos, crear_usuario):
+    for i in range(3):
+        crear_usuario(nombre=f'U{i}', apellido='U', email=f'u{i}@example.com')
+    principales.invalidar()
+    app = FastAPI()
+    app.include_router(usuarios_router.router, prefix='/api/v1')
+    app.dependency_overrides[get_session] = lambda: SyncSessionAdapter(session)
+    client = TestClient(app)
+    auth = {'Authorization': f'Bearer {create_access_token({"user_id": usuario.id, "rol": "admin"})}'}
+
+    primera = client.get('/api/v1/usuarios?limit=3', headers=auth)
+    assert primera.status_code == 200
+    assert [u['email'] for u in primera.json()] == ['u2@example.com', 'u1@example.com', 'u0@example.com']
+    cursor = primera.headers['X-Next-Cursor']
+
+    segunda = client.get(f'/api/v1/usuarios?limit=3&cursor={cursor}&fields=id,email', headers=auth)
+    assert segunda.json() == [{'id': usuario.id, 'email': 'ana@example.com'}]
+    assert 'X-Next-Cursor' not in segunda.headers
+
+    assert client.get('/api/v1/usuarios?fields=password_hash', headers=auth).status_code == 400
@@ -0,0 +1,89 @@
+"""
+bcrypt fuera del event loop: el loop sigue respondiendo durante una
+tormenta de logins y, con la cola llena, la API responde 503.
+"""
+import asyncio
+import threading
+import time
+
+import bcrypt
+import pytest
+from fastapi.testclient import TestClient
+
+from fastapi_app import create_fastapi_app
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.dependencies import get_session
+from fastapi_app.hashing import HasherSaturado, PasswordHasher, password_hasher
+
+
+async def _lag_maximo(verificaciones):
+    """Máximo retraso de un `sleep(1 ms)` mientras corren las verificaciones."""
+    maximo = 0.0
+    tarea = asyncio.ensure_future(asyncio.gather(*verificaciones))
+    while not tarea.done():
+        inicio = time.perf_counter()
+        await asyncio.sleep(0.001)
+        maximo = max(maximo, time.perf_counter() - inicio)
+    await tarea
+    return maximo
+
+
+def test_loop_no_se_bloquea():
+    hashed = bcrypt.hashpw(b'clave', bcrypt.gensalt(rounds=8))
+    hasher = PasswordHasher(max_workers=2, max_pendientes=20, rounds=8)
+
+    async def en_loop():
+        return bcrypt.checkpw(b'clave', hashed)
+
+    try:
+        lag_pool = asyncio.run(_lag_maximo([hasher.verificar('clave', hashed) for _ in range(10)]))
+        lag_loop = asyncio.run(_lag_maximo([en_loop() for _ in range(10)]))
+    finally:
+        hasher.cerrar()
+
+    assert lag_pool < lag_loop / 2
+    assert hasher.pendientes == 0
+
+
+def test_hash_y_verificar():
+    hasher = PasswordHasher(max_workers=1, max_pendientes=2, rounds=4)
+
+    async def flujo():
+        hashed = await hasher.hash('secreta')
+        return hashed, await hasher.verificar('secreta', hashed), await hasher.verificar('otra', hashed)
+
+    try:
+        hashed, ok, mal = asyncio.run(flujo())
+    finally:
+        hasher.cerrar()
+    assert hashed.startswith('$2b$04$')
+    assert ok is True and mal is False
+
+
+def test_cola_llena():
+    hasher = PasswordHasher(max_workers=1, max_pendientes=1, rounds=4)
+    liberar = threading.Event()
+
+    async def flujo():
+        ocupado = hasher._enviar(liberar.wait)
+        with pytest.raises(HasherSaturado):
+            await hasher.hash('x')
+        liberar.set()
+        await ocupado
+        return await hasher.hash('x')
+
+    try:
+        assert asyncio.run(flujo()).startswith('$2b$')
+    finally:
+        hasher.cerrar()
+
+
+def test_login_saturado_responde_503(session, usuario, monkeypatch):
+    monkeypatch.setattr(password_hasher, 'max_pendientes', 0)
+
+    app = create_fastapi_app()
+    app.dependency_overrides[get_session] = lambda: SyncSessionAdapter(session)
+    respuesta = TestClient(app).post('/api/v1/auth/login', json={'email': 'ana@example.com', 'password': 'x'})
+
+    assert respuesta.status_code == 503
+    assert respuesta.headers['retry-after'] == '1'
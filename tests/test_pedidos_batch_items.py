@@ -0,0 +1,56 @@
+"""
+El listado de pedidos de la API debe cargar los items de toda la página en
+una sola consulta, sin importar cuántos pedidos devuelva (sin N+1).
+"""
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import MenuItem
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.services.pedidos_service import obtener_pedidos
+
+
+@pytest.fixture
+def usuario(crear_usuario):
+    return crear_usuario(apellido='Test', rol='admin')
+
+
+@pytest.fixture
+def poblar(session, usuario, crear_pedido):
+    def poblar(n_pedidos=20, items_por_pedido=3):
+        menu = [MenuItem(restaurante_id=1, nombre=f'Plato {i}', precio=Decimal('10.00')) for i in range(items_por_pedido)]
+        session.add_all(menu)
+        session.flush()
+        for n in range(n_pedidos):
+            crear_pedido('30.00', items=[(m, 1) for m in menu], codigo_pedido=f'PED{n:05d}')
+        session.commit()
+        usuario_id = usuario.id
+        session.expunge_all()
+        return usuario_id
+
+    return poblar
+
+
+def test_obtener_pedidos_usa_consultas_constantes(session, sql_counter, poblar):
+    poblar(n_pedidos=20, items_por_pedido=3)
+    admin = SimpleNamespace(id=1, rol='admin')
+
+    sql_counter.clear()
+    pedidos = asyncio.run(obtener_pedidos(SyncSessionAdapter(session), admin, limit=100))
+
+    assert len(pedidos) == 20
+    assert all(len(p['items']) == 3 for p in pedidos)
+    # Una consulta para los pedidos y una para todos sus items
+    assert len(sql_counter) == 2, sql_counter
+
+
+def test_obtener_pedidos_filtra_por_usuario(session, sql_counter, poblar):
+    usuario_id = poblar(n_pedidos=5, items_por_pedido=2)
+    otro = SimpleNamespace(id=usuario_id + 1, rol='cliente')
+
+    sql_counter.clear()
+    assert asyncio.run(obtener_pedidos(SyncSessionAdapter(session), otro)) == []
+    assert len(sql_counter) == 1
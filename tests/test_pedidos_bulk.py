@@ -0,0 +1,68 @@
+"""
+Creación de pedidos en la API: platos en una consulta, items en un solo
+INSERT, precios del servidor, sin refresh, y `POST /pedidos/batch`.
+"""
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.models import MenuItem, Pedido, PedidoItem
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.dependencies import create_access_token, get_session
+from fastapi_app.routers import pedidos as pedidos_router
+from fastapi_app.schemas import PedidoCreate
+from fastapi_app.services.pedidos_service import crear_pedido
+
+
+def _platos(session, n_platos=10):
+    platos = [MenuItem(restaurante_id=1, nombre=f'Plato {i}', precio=Decimal('4.50')) for i in range(n_platos)]
+    session.add_all(platos)
+    session.commit()
+    return [p.id for p in platos]
+
+
+def test_consultas_constantes_y_precio_del_servidor(session, sql_counter, usuario):
+    platos = _platos(session)
+    current_user = SimpleNamespace(id=usuario.id, telefono=None, nombre='Ana', apellido='A')
+    pedido_data = PedidoCreate(tipo_servicio='piscina', items=[
+        {'menu_item_id': i, 'cantidad': 2, 'precio_unitario': '0.01'} for i in platos
+    ] + [{'menu_item_id': platos[0], 'cantidad': 1}])
+    sql_counter.clear()
+
+    res = asyncio.run(crear_pedido(SyncSessionAdapter(session), pedido_data, current_user))
+
+    inserts = [s for s in sql_counter if s.startswith('INSERT INTO pedido_items')]
+    selects = [s for s in sql_counter if s.startswith('SELECT') and 'menu_items' in s]
+    assert len(inserts) == 1 and len(selects) == 1
+    assert res['total'] == Decimal('4.50') * 21
+    assert res['items'][0]['cantidad'] == 3
+    assert {i['precio_unitario'] for i in res['items']} == {Decimal('4.50')}
+    # Sin refresh: nada vuelve a leer el pedido después de insertar sus items
+    tras_insert = sql_counter[sql_counter.index(inserts[0]) + 1:]
+    assert not [s for s in tras_insert if s.startswith('SELECT')]
+    assert session.scalar(select(PedidoItem.cantidad).where(PedidoItem.menu_item_id == platos[0])) == 3
+
+
+def test_batch_todo_o_nada(session, usuario):
+    platos = _platos(session, n_platos=2)
+    app = FastAPI()
+    app.include_router(pedidos_router.router, prefix='/api/v1')
+    app.dependency_overrides[get_session] = lambda: SyncSessionAdapter(session)
+    client = TestClient(app)
+    auth = {'Authorization': f'Bearer {create_access_token({"user_id": usuario.id})}'}
+
+    def pedido(*ids):
+        return {'tipo_servicio': 'piscina', 'items': [{'menu_item_id': i, 'cantidad': 1} for i in ids]}
+
+    creados = client.post('/api/v1/pedidos/batch', headers=auth, json={'pedidos': [pedido(platos[0]), pedido(*platos)]})
+    assert creados.status_code == 201, creados.text
+    assert [len(p['items']) for p in creados.json()] == [1, 2]
+    assert [p['total'] for p in creados.json()] == ['4.50', '9.00']
+
+    fallido = client.post('/api/v1/pedidos/batch', headers=auth, json={'pedidos': [pedido(platos[0]), pedido(999)]})
+    assert fallido.status_code == 400
+    assert session.scalar(select(Pedido.id).order_by(Pedido.id.desc())) == creados.json()[1]['id']
@@ -0,0 +1,126 @@
+"""
+Planes de las consultas frecuentes: ninguna recorre una tabla completa,
+ni con el esquema de `create_all` ni con el que dejan las migraciones
+sobre tablas existentes.
+"""
+import asyncio
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import inspect
+
+from app.models import Inventario, MenuItem, Mesa, Pedido, Receta, Reserva
+from app.utils import estadisticas, stock_pedido, ventas_diarias
+from app.utils.disponibilidad_reservas import DisponibilidadReservas
+from app.utils.ocupacion_mesas import OcupacionMesas
+from app.utils.paginacion import Parametros
+from app.utils.planes_consulta import capturar, recorridos_completos
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.repositories import mesas_repo, pedidos_repo, reservas_repo, usuarios_repo
+from migrations import actualizar, aplicadas, indice_clave_ajena, revertir, versiones
+
+HOY = date(2026, 3, 10)
+
+
+@pytest.fixture
+def datos(session, usuario, crear_pedido):
+    harina = Inventario(nombre='Harina', cantidad=Decimal('10'), unidad='kg')
+    plato = MenuItem(restaurante_id=1, nombre='Plato', precio=Decimal('10'))
+    mesa = Mesa(numero=1, capacidad=4)
+    session.add_all([harina, plato, mesa])
+    session.flush()
+    crear_pedido(items=[(plato, 1)], mesa_id=mesa.id, fecha_pedido=datetime(2026, 3, 10, 18))
+    session.add_all([
+        Receta(menu_item_id=plato.id, inventario_id=harina.id, cantidad_usada=Decimal('0.5')),
+        Reserva(usuario_id=usuario.id, restaurante_id=1, fecha=HOY, hora=time(20, 0), numero_personas=2,
+                mesa_asignada='1'),
+    ])
+    session.commit()
+    return usuario.id, plato.id, mesa
+
+
+def _consultas_frecuentes(session, usuario_id, plato_id, mesa):
+    db = SyncSessionAdapter(session)
+    parametros = Parametros(50, None, None, False)
+
+    async def repositorios():
+        await pedidos_repo.pagina_pedidos(db, parametros, usuario_id=usuario_id, with_items=True)
+        await pedidos_repo.pagina_pedidos(db, parametros, estado='pendiente')
+        await pedidos_repo.get_pedido_items(db, 1)
+        await pedidos_repo.find_mesas_ocupadas(db, [mesa.id], usuario_id + 1)
+        await mesas_repo.has_active_pedido(db, mesa)
+        await reservas_repo.pagina_reservas(db, parametros, usuario_id=usuario_id)
+        await usuarios_repo.find_by_email(db, 'ana@example.com')
+
+    asyncio.run(repositorios())
+    stock_pedido.planificar(session, [(session.get(MenuItem, plato_id), 1)])
+    ventas_diarias.agregar(session, HOY - timedelta(days=30), HOY + timedelta(days=1), ('fecha',), hoy=HOY)
+    estadisticas.top_productos(session, HOY - timedelta(days=30))
+    DisponibilidadReservas(ttl=0).mesas_reservadas(session, HOY)
+    OcupacionMesas(ttl=0).sincronizar(session)
+
+
+@pytest.fixture(params=['create_all', 'migraciones'])
+def esquema(request, engine):
+    if request.param == 'migraciones':
+        # Tablas de antes de los índices: los añaden las migraciones
+        with engine.begin() as conexion:
+            for migracion in reversed(versiones()):
+                migracion.downgrade(conexion)
+        actualizar(engine)
+    return engine
+
+
+def test_consultas_frecuentes_usan_indices(esquema, session, datos):
+    with capturar(esquema) as consultas:
+        _consultas_frecuentes(session, *datos)
+    assert len(consultas) >= 12
+
+    with esquema.connect() as conexion:
+        completos = {
+            sentencia: tablas
+            for sentencia, parametros in consultas
+            if (tablas := recorridos_completos(conexion, sentencia, parametros))
+        }
+    assert completos == {}
+
+
+def test_detecta_recorrido_completo(session, engine):
+    with capturar(engine) as consultas:
+        session.query(Pedido).filter(Pedido.direccion_entrega == 'x').all()
+    with engine.connect() as conexion:
+        assert recorridos_completos(conexion, *consultas[0]) == ['pedidos']
+
+
+def test_revisiones_registradas(engine):
+    revisiones = [m.revision for m in versiones()]
+    assert [m.revision for m in actualizar(engine)] == revisiones
+    assert actualizar(engine) == []
+
+    assert [m.revision for m in revertir(engine, revisiones[0])] == revisiones[:0:-1]
+    with engine.connect() as conexion:
+        assert aplicadas(conexion) == {revisiones[0]}
+    assert 'ix_reservas_fecha' not in {i['name'] for i in inspect(engine).get_indexes('reservas')}
+
+    assert [m.revision for m in actualizar(engine)] == revisiones[1:]
+    assert 'ix_reservas_fecha' in {i['name'] for i in inspect(engine).get_indexes('reservas')}
+
+
+def test_indices_que_respaldan_claves_ajenas(engine):
+    """Los índices cuyo borrado dejaría sin índice una clave ajena (MySQL)."""
+    actualizar(engine)
+    respaldan = {}
+    with engine.connect() as conexion:
+        for migracion in versiones():
+            for tabla, nombre, columnas in migracion.INDICES:
+                necesario = indice_clave_ajena(conexion, tabla, nombre, columnas)
+                if necesario is not None:
+                    respaldan[nombre] = necesario[1]
+    assert respaldan == {
+        'ix_pedidos_mesa_id_estado': ['mesa_id'],
+        'ix_reservas_usuario_id_created_at': ['usuario_id'],
+        'ix_pedidos_usuario_id_fecha_pedido': ['usuario_id'],
+        'ix_pedido_items_menu_item_id': ['menu_item_id'],
+        'ix_recetas_menu_item_id': ['menu_item_id'],
+    }
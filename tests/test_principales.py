@@ -0,0 +1,85 @@
+"""
+Caché de usuarios autenticados: `get_current_user` no consulta la BD en un
+acierto, los cambios de rol la invalidan y `require_admin` rechaza a partir
+de los claims del token.
+"""
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.principales import CachePrincipales, principales
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.dependencies import create_access_token, get_current_user, get_session, require_admin
+
+
+@pytest.fixture(autouse=True)
+def _cache_limpia():
+    principales.invalidar()
+    yield
+    principales.invalidar()
+
+
+@pytest.fixture
+def client(session):
+    app = FastAPI()
+
+    @app.get('/yo')
+    async def yo(current_user=Depends(get_current_user)):
+        return {'id': current_user.id, 'rol': current_user.rol}
+
+    @app.get('/admin')
+    async def admin(current_user=Depends(require_admin)):
+        return {'id': current_user.id}
+
+    app.dependency_overrides[get_session] = lambda: SyncSessionAdapter(session)
+    return TestClient(app)
+
+
+def _auth(usuario, **claims):
+    token = create_access_token({'user_id': usuario.id, **claims})
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_acierto_no_consulta(client, session, sql_counter, usuario):
+    auth = _auth(usuario)
+
+    assert client.get('/yo', headers=auth).json() == {'id': usuario.id, 'rol': 'cliente'}
+    sql_counter.clear()
+    assert client.get('/yo', headers=auth).status_code == 200
+    assert sql_counter == []
+
+
+def test_cambio_de_rol_invalida(client, session, usuario):
+    auth = _auth(usuario)
+    assert client.get('/admin', headers=auth).status_code == 403
+
+    usuario.rol = 'admin'
+    session.commit()
+    assert client.get('/admin', headers=auth).status_code == 200
+
+    usuario.activo = False
+    session.commit()
+    assert client.get('/yo', headers=auth).status_code == 403
+
+
+def test_require_admin_desde_claims(client, session, sql_counter, crear_usuario):
+    usuario = crear_usuario(rol='admin')
+    auth, usuario_id = _auth(usuario, rol='cliente'), usuario.id
+    sql_counter.clear()
+
+    assert client.get('/admin', headers=auth).status_code == 403
+    assert sql_counter == []
+    assert principales.obtener(usuario_id) is None
+
+
+def test_lru_acotada(crear_usuario):
+    cache = CachePrincipales(ttl=60, max_entradas=2)
+    a, b, c = (crear_usuario(email=f'{rol}@example.com', rol=rol) for rol in ('cliente', 'mesero', 'admin'))
+    cache.guardar(a)
+    cache.guardar(b)
+    cache.obtener(a.id)
+    cache.guardar(c)
+
+    assert cache.obtener(b.id) is None
+    assert cache.obtener(a.id).rol == 'cliente'
+    assert cache.estadisticas()['size'] == 2
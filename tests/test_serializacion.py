@@ -0,0 +1,59 @@
+"""
+Formas de serialización: la consulta carga de antemano lo que recorre el
+`to_dict` (dos consultas para 50 pedidos con 4 líneas) y el modo estricto
+lanza `CargaPerezosa` si falta una relación.
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.models import MenuItem, Pedido, PedidoItem
+from app.utils.serializacion import PEDIDO, CargaPerezosa, Forma, sin_cargas_perezosas
+
+
+@pytest.fixture
+def poblar(session, crear_pedido):
+    def poblar(n_pedidos=50, n_lineas=4):
+        platos = [MenuItem(restaurante_id=1, nombre=f'Plato {i}', precio=Decimal('10')) for i in range(n_lineas)]
+        session.add_all(platos)
+        session.flush()
+        for _ in range(n_pedidos):
+            crear_pedido('40', items=[(plato, 1) for plato in platos])
+        session.commit()
+        session.expunge_all()
+
+    return poblar
+
+
+def test_forma_carga_todo_en_dos_consultas(session, sql_counter, poblar):
+    poblar()
+    esperado = [pedido.to_dict() for pedido in session.scalars(select(Pedido).order_by(Pedido.id))]
+    session.expunge_all()
+
+    sql_counter.clear()
+    with sin_cargas_perezosas():
+        pedidos = session.scalars(PEDIDO.consulta(select(Pedido).order_by(Pedido.id))).all()
+        resultado = PEDIDO.lista(pedidos)
+    # Pedidos, y en otra consulta sus items con el plato unido
+    assert len(sql_counter) == 2
+    assert resultado == esperado
+    assert resultado[0]['items'][0]['menu_item']['nombre'] == 'Plato 0'
+
+
+def test_modo_estricto_detecta_relacion_no_declarada(session, poblar):
+    poblar(n_pedidos=1)
+    sin_platos = Forma(Pedido, items=Forma(PedidoItem))
+    pedidos = session.scalars(sin_platos.consulta(select(Pedido))).all()
+
+    with sin_cargas_perezosas(), pytest.raises(CargaPerezosa, match='menu_item'):
+        sin_platos.lista(pedidos)
+    # Fuera del modo estricto se sigue serializando (con la carga perezosa)
+    assert sin_platos.lista(pedidos)[0]['items'][0]['menu_item']['nombre'] == 'Plato 0'
+
+
+def test_forma_valida_las_relaciones():
+    with pytest.raises(ValueError):
+        Forma(Pedido, lineas=Forma(PedidoItem))
+    with pytest.raises(ValueError):
+        Forma(Pedido, items=Forma(MenuItem))
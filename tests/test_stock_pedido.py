@@ -0,0 +1,63 @@
+"""
+Plan de stock de un pedido: platos, recetas e inventario en tres consultas
+sin importar el tamaño del carrito, con lo requerido sumado por ingrediente.
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Inventario, InventarioMovimiento, MenuItem, Receta
+from app.utils import stock_pedido
+
+
+def _poblar(session, n_platos=10):
+    harina = Inventario(nombre='Harina', cantidad=Decimal('10'), unidad='kg')
+    queso = Inventario(nombre='Queso', cantidad=Decimal('3'), unidad='kg')
+    platos = [MenuItem(restaurante_id=1, nombre=f'Plato {i}', precio=Decimal('10')) for i in range(n_platos)]
+    session.add_all([harina, queso, *platos])
+    session.flush()
+    for plato in platos:
+        session.add_all([
+            Receta(menu_item_id=plato.id, inventario_id=harina.id, cantidad_usada=Decimal('0.50')),
+            Receta(menu_item_id=plato.id, inventario_id=queso.id, cantidad_usada=Decimal('0.25')),
+        ])
+    session.commit()
+    return harina.id, queso.id, [p.id for p in platos]
+
+
+def test_tres_consultas_para_todo_el_carrito(session, sql_counter):
+    harina_id, queso_id, platos = _poblar(session)
+    sql_counter.clear()
+
+    menu_items = stock_pedido.cargar_menu_items(session, platos)
+    plan = stock_pedido.planificar(session, [(menu_items[i], 1) for i in platos])
+
+    assert len(sql_counter) == 3
+    assert plan.requerido == {harina_id: Decimal('5.00'), queso_id: Decimal('2.50')}
+    assert len(plan.consumos) == 20
+
+
+def test_aplicar_descuenta_y_registra_movimientos(session):
+    harina_id, queso_id, platos = _poblar(session, n_platos=2)
+    menu_items = stock_pedido.cargar_menu_items(session, platos)
+    plan = stock_pedido.planificar(session, [(menu_items[platos[0]], 2), (menu_items[platos[1]], 4)])
+
+    stock_pedido.aplicar(session, plan, usuario_id=None, codigo_pedido='PED1')
+    session.commit()
+
+    assert session.get(Inventario, harina_id).cantidad == Decimal('7.00')
+    assert session.get(Inventario, queso_id).cantidad == Decimal('1.50')
+    notas = session.scalars(select(InventarioMovimiento.notas).order_by(InventarioMovimiento.id)).all()
+    assert notas == ['Pedido PED1 - Plato 0 x2'] * 2 + ['Pedido PED1 - Plato 1 x4'] * 2
+
+
+def test_stock_acumulado_insuficiente(session):
+    _, _, platos = _poblar(session, n_platos=3)
+    menu_items = stock_pedido.cargar_menu_items(session, platos)
+
+    # 1.25 kg de queso por línea: alcanza para las dos primeras, no para la tercera
+    with pytest.raises(stock_pedido.StockInsuficiente) as exc:
+        stock_pedido.planificar(session, [(menu_items[i], 5) for i in platos])
+
+    assert str(exc.value) == 'Stock insuficiente de "Queso" para el plato "Plato 2"'
@@ -0,0 +1,91 @@
+"""
+Stream SSE de la API: filtro por tema y usuario, repetición desde
+Last-Event-ID, heartbeat, descarte de clientes lentos y permisos por rol.
+"""
+import asyncio
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.principales import Principal, principales
+from fastapi_app.database import SyncSessionAdapter
+from fastapi_app.dependencies import create_access_token, get_session
+from fastapi_app.routers import stream as stream_router
+from fastapi_app.stream import CanalEventos, canal_eventos, filtro_para
+
+
+def test_canal_filtra_repite_y_descarta_lentos():
+    async def escenario():
+        canal = CanalEventos(max_buffer=3, max_pendientes=2)
+        cliente = Principal(7, 'cliente', True, 'Ana', 'A', 'ana@example.com', None)
+        suscripcion, perdidos = canal.suscribir({'pedidos'}, filtro_para(cliente))
+        assert perdidos == []
+
+        # Publicado desde otro hilo (p. ej. un commit fuera del event loop)
+        hilo = threading.Thread(target=canal.publicar, args=('pedidos', {'id': 1, 'usuario_id': 7}))
+        hilo.start()
+        hilo.join()
+        canal.publicar('pedidos', {'id': 2, 'usuario_id': 8})
+        canal.publicar('mesas', {'id': 3})
+        propio = await asyncio.wait_for(suscripcion.cola.get(), 1)
+        assert propio.datos['id'] == 1 and suscripcion.cola.empty()
+
+        # Reconexión: sólo lo posterior al último id visto
+        _, perdidos = canal.suscribir({'pedidos', 'mesas'}, desde=propio.id)
+        assert [m.datos['id'] for m in perdidos] == [2, 3]
+        # Id fuera del buffer o de otro proceso: recargar todo
+        canal.publicar('mesas', {'id': 4})
+        canal.publicar('mesas', {'id': 5})
+        assert canal.suscribir({'mesas'}, desde=propio.id)[1] is None
+        assert canal.suscribir({'mesas'}, desde='otraepoca.1')[1] is None
+
+        # Cliente lento: se corta en vez de acumular mensajes
+        for i in range(3):
+            canal.publicar('pedidos', {'id': 10 + i, 'usuario_id': 7})
+        assert suscripcion.descartada and await suscripcion.cola.get() is None
+        canal.desuscribir(suscripcion)
+        assert canal.descartadas == 1
+
+    asyncio.run(escenario())
+
+
+def _cliente(session, crear_usuario, rol):
+    usuario = crear_usuario(email=f'{rol}@example.com', rol=rol)
+    principales.invalidar()
+    app = FastAPI()
+    app.include_router(stream_router.router, prefix='/api/v1')
+    app.dependency_overrides[get_session] = lambda: SyncSessionAdapter(session)
+    return TestClient(app), create_access_token({'user_id': usuario.id, 'rol': rol})
+
+
+def test_permisos_por_rol(session, crear_usuario):
+    client, token = _cliente(session, crear_usuario, 'cocinero')
+    assert client.get('/api/v1/stream?topics=pedidos,mesas', headers={'Authorization': f'Bearer {token}'}).status_code == 403
+    assert client.get(f'/api/v1/stream?topics=facturas&token={token}').status_code == 400
+    assert client.get('/api/v1/stream?topics=pedidos').status_code == 401
+
+
+def test_stream_repite_desde_last_event_id():
+    class Peticion:
+        async def is_disconnected(self):
+            return False
+
+    async def escenario():
+        visto = canal_eventos.publicar('pedidos', {'entidad': 'pedido', 'id': 1})
+        canal_eventos.publicar_evento({'entidad': 'mesa', 'accion': 'actualizado', 'id': 5, 'disponible': False})
+        canal_eventos.publicar_evento({'entidad': 'reserva', 'accion': 'creado', 'id': 9})
+        suscripcion, perdidos = canal_eventos.suscribir({'mesas', 'pedidos'}, desde=visto.id)
+
+        trozos = []
+        async for trozo in stream_router._emitir(Peticion(), suscripcion, perdidos, heartbeat=0.05):
+            trozos.append(trozo)
+            if trozo.startswith(': ping'):
+                canal_eventos.cerrar()
+        return trozos
+
+    trozos = asyncio.run(escenario())
+    assert trozos[0] == 'retry: 3000\n\n'
+    assert trozos[1].startswith('id: ') and '\nevent: mesas\ndata: {"entidad":"mesa"' in trozos[1]
+    assert trozos[2:] == [': ping\n\n']
+    assert canal_eventos.suscripciones == 0
@@ -0,0 +1,72 @@
+"""
+Rollup `ventas_diarias`: el mantenimiento incremental coincide con una
+reconstrucción completa y las lecturas combinan rollup + día en curso.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select
+
+import pytest
+
+from app.models import VentaDiaria
+from app.utils import ventas_diarias
+
+HOY = date(2025, 3, 10)
+
+
+@pytest.fixture
+def pedido(crear_pedido):
+    """Factoría de pedidos a las 12:00 (UTC) de `dia`."""
+    def crear(dia, total, estado='pendiente', metodo_pago='efectivo'):
+        return crear_pedido(total, estado=estado, metodo_pago=metodo_pago,
+                            fecha_pedido=datetime.combine(dia, datetime.min.time()) + timedelta(hours=12))
+
+    return crear
+
+
+def _rollup(session):
+    filas = session.execute(select(VentaDiaria).order_by(
+        VentaDiaria.fecha, VentaDiaria.estado, VentaDiaria.metodo_pago, VentaDiaria.tipo_servicio
+    )).scalars().all()
+    return [
+        (f.fecha, f.estado, f.metodo_pago, f.tipo_servicio, f.cantidad, Decimal(f.total))
+        for f in filas if f.cantidad
+    ]
+
+
+def test_incremental_coincide_con_reconstruccion(session, pedido):
+    ayer = HOY - timedelta(days=1)
+    pedidos = [
+        pedido(ayer, '10'),
+        pedido(ayer, '15', metodo_pago='tarjeta'),
+        pedido(HOY - timedelta(days=5), '30'),
+    ]
+    session.commit()
+
+    # Cambio de estado tras el commit (atributos expirados) y borrado
+    pedidos[0].estado = 'entregado'
+    session.commit()
+    session.delete(pedidos[2])
+    session.commit()
+
+    incremental = _rollup(session)
+    assert (ayer, 'entregado', 'efectivo', 'mesa', 1, Decimal('10')) in incremental
+    assert all(fila[0] != HOY - timedelta(days=5) for fila in incremental)
+
+    ventas_diarias.reconstruir(session)
+    session.commit()
+    assert _rollup(session) == incremental
+
+
+def test_agregar_combina_rollup_y_hoy(session, pedido):
+    pedido(HOY - timedelta(days=2), '40', estado='entregado')
+    pedido(HOY, '5', estado='entregado')
+    pedido(HOY, '20')
+    session.commit()
+
+    por_estado = ventas_diarias.agregar(session, HOY - timedelta(days=7), HOY + timedelta(days=1), ('estado',), hoy=HOY)
+    assert por_estado == {('entregado',): (2, 45.0), ('pendiente',): (1, 20.0)}
+
+    solo_hoy = ventas_diarias.agregar(session, HOY, HOY + timedelta(days=1), (), hoy=HOY)
+    assert solo_hoy == {(): (2, 25.0)}